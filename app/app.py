@@ -5,7 +5,7 @@ from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchan
 from app.plaid_service import create_and_store_link_token, get_access_token, save_access_token, get_saved_access_tokens, get_institution_info, get_access_token_by_item_id, fire_sandbox_webhook, get_item, create_plaid_client, get_item_details
 from app.financial_data.handlers.financial_data_handler import FinancialDataHandler
 from app.db_schema import generate_db_schema
-from app.financial_data.db_operations.query_operations import execute_query, CustomJSONEncoder
+from app.financial_data.db_operations.query_operations import execute_query, fetch_query, CustomJSONEncoder
 import psycopg2
 import psycopg2.extras
 from io import BytesIO
@@ -15,6 +15,12 @@ import hmac
 import hashlib
 from app.config import Config
 from app.financial_data.utils.db_connection import get_db_connection
+from app.financial_data.utils.migrations import apply_migrations
+from app.financial_data.utils.partitions import maintain_partitions, maintain_api_call_log
+from app.financial_data.utils.subscriptions import refresh_subscription_activity
+from app.utils.response_cache import bump_data_version
+from app.utils.compression import compress_response
+from app.utils.json_response import columnar, json_response, ndjson_response, wants_columnar, wants_ndjson
 import calendar
 from dateutil.relativedelta import relativedelta
 from psycopg2.extras import RealDictCursor
@@ -35,6 +41,7 @@ from plaid.model.country_code import CountryCode
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # Change this to a secure random key
 app.json_encoder = CustomJSONEncoder
+app.after_request(compress_response)
 
 # Add logging configuration
 logging.basicConfig(level=logging.DEBUG)
@@ -45,6 +52,71 @@ app.register_blueprint(analytics_bp)
 app.register_blueprint(transactions_bp, url_prefix='/transactions')
 app.register_blueprint(misc_bp)
 
+def run_startup_migrations(max_retries=5, retry_delay=2):
+    """Apply pending schema migrations, waiting for the database to come up"""
+    for attempt in range(max_retries):
+        try:
+            applied = apply_migrations()
+            if applied:
+                app.logger.info(f"Applied migrations: {applied}")
+            return True
+        except Exception as e:
+            if attempt < max_retries - 1:
+                app.logger.warning(f"Migrations not applied yet ({str(e)}), retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
+                retry_delay *= 2
+                continue
+            app.logger.error(f"Error applying database migrations: {str(e)}")
+    return False
+
+def run_maintenance():
+    """Partition upkeep and retention, the Plaid API call log and subscription activity"""
+    detached = maintain_partitions(
+        retention_months=Config.PARTITION_RETENTION_MONTHS,
+        drop=Config.PARTITION_RETENTION_DROP
+    )
+    if detached:
+        app.logger.info(f"Partitions past retention: {detached}")
+        bump_data_version()
+    dropped = maintain_api_call_log(retention_days=Config.API_CALL_RETENTION_DAYS)
+    if dropped:
+        app.logger.info(f"Dropped Plaid API call partitions: {dropped}")
+    if refresh_subscription_activity():
+        bump_data_version()
+
+def start_maintenance_thread(interval=Config.MAINTENANCE_INTERVAL_SECONDS):
+    """Run maintenance now and then every interval seconds in a daemon thread"""
+    def loop():
+        while True:
+            try:
+                run_maintenance()
+            except Exception as e:
+                app.logger.error(f"Error during database maintenance: {str(e)}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='db-maintenance', daemon=True)
+    thread.start()
+    return thread
+
+_startup_lock = threading.Lock()
+_started = False
+
+def startup():
+    """Apply migrations and start the maintenance thread, once per process.
+
+    Runs from the __main__ block, and before the first request when the app is served some
+    other way (flask run), so importing the module has no side effects.
+    """
+    global _started
+    with _startup_lock:
+        if _started:
+            return
+        _started = True
+    if run_startup_migrations():
+        start_maintenance_thread()
+
+app.before_first_request(startup)
+
 def get_access_token_by_institution_id(institution_id):
     conn = get_db_connection()
     cur = conn.cursor()
@@ -255,6 +327,7 @@ def remove_institution(institution_id=None):
             cur.execute("DELETE FROM institutions WHERE id = %s", (institution_id,))
             
             cur.execute("COMMIT")
+            bump_data_version()
             session['last_removal_time'] = time.time()
             return jsonify({'success': True}), 200
             
@@ -279,6 +352,16 @@ def data():
 def run_query():
     query = request.json.get('query')
     try:
+        if wants_ndjson():
+            # Streamed through a server-side cursor, so only read queries are accepted
+            return ndjson_response(query)
+        
+        # fetch_query never commits, so a write run from the console is rolled back and
+        # leaves the cached responses valid
+        if wants_columnar():
+            columns, rows = fetch_query(query, numeric_as_float=True)
+            return json_response({'success': True, 'data': columnar(columns, rows)})
+        
         results = execute_query(query)
         return jsonify({
             'success': True,
@@ -794,5 +877,6 @@ def create_update_link_token(institution_id):
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    startup()
     app.run(host='0.0.0.0', port=8000)
 
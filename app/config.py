@@ -22,6 +22,30 @@ class Config:
     LINK_TOKEN = os.environ.get('LINK_TOKEN')
     PLAID_WEBHOOK_SECRET = os.getenv('PLAID_WEBHOOK_SECRET')
     APP_URL = os.getenv('APP_URL', 'http://localhost:8000')
+    # Number of prior months averaged for the daily spend curve (overridable per request with avg_months)
+    DAILY_AVG_MONTHS = int(os.getenv('DAILY_AVG_MONTHS', '4'))
+    # Months of transactions/account_history partitions to keep attached (0 keeps everything)
+    PARTITION_RETENTION_MONTHS = int(os.getenv('PARTITION_RETENTION_MONTHS', '0'))
+    # Drop partitions past retention instead of leaving them as detached tables
+    PARTITION_RETENTION_DROP = os.getenv('PARTITION_RETENTION_DROP', 'false').lower() == 'true'
+    # Days of raw plaid_api_calls kept; older days survive only as hourly rollups (0 keeps everything)
+    API_CALL_RETENTION_DAYS = int(os.getenv('API_CALL_RETENTION_DAYS', '30'))
+    # Seconds between partition, retention and rollup maintenance runs
+    MAINTENANCE_INTERVAL_SECONDS = int(os.getenv('MAINTENANCE_INTERVAL_SECONDS', '3600'))
+    # Memory cap for cached analytics responses (0 disables the cache)
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    # Rows fetched per round trip by the server-side cursors behind streamed (NDJSON) responses
+    STREAM_ITERSIZE = int(os.getenv('STREAM_ITERSIZE', '2000'))
+    # /api/cashflow window: from CASHFLOW_START_DATE (YYYY-MM-DD) if set, otherwise the last
+    # CASHFLOW_MONTHS calendar months, through the latest transaction
+    CASHFLOW_START_DATE = os.getenv('CASHFLOW_START_DATE') or None
+    CASHFLOW_MONTHS = int(os.getenv('CASHFLOW_MONTHS', '12'))
+    # gzip level (1-9) for text responses; 0 disables response compression
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+    # brotli quality (0-11), used when the client accepts br
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+    # Buffered responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
 
     @classmethod
     def print_config(cls):
@@ -1,5 +1,6 @@
 from psycopg2.extras import execute_values
 from app.financial_data.utils.db_connection import get_db_connection
+from app.financial_data.utils.partitions import ensure_partitions
 import numpy as np
 
 def save_accounts_to_db(accounts_dfs, conn=None, cur=None):
@@ -56,6 +57,7 @@ def save_accounts_to_db(accounts_dfs, conn=None, cur=None):
         print(base_accounts.columns.tolist())
         
         # Insert into account_history
+        ensure_partitions(cur, 'account_history', base_accounts['pull_date'].tolist())
         execute_values(cur, """
             INSERT INTO account_history (
                 {}
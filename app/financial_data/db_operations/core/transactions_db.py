@@ -1,6 +1,22 @@
 from app.financial_data.utils.db_connection import get_db_connection
+from app.financial_data.utils.partitions import ensure_partitions
 from psycopg2.extras import execute_values
 
+def delete_redated_transactions(cur, keys):
+    """Delete stored copies of (transaction_id, date) keys whose date has changed.
+
+    transactions is partitioned by date, so an upsert on (transaction_id, date) can't move a
+    row to another month; the stale copy is removed and the upsert inserts the new one.
+    """
+    if not keys:
+        return
+    execute_values(cur, """
+        DELETE FROM transactions t
+        USING (VALUES %s) AS v(transaction_id, date)
+        WHERE t.transaction_id = v.transaction_id
+        AND t.date <> v.date::date
+    """, keys)
+
 def save_transactions_to_db(transactions_df, conn=None, cur=None):
     """Save transactions data to the database"""
     should_close = False
@@ -30,16 +46,27 @@ def save_transactions_to_db(transactions_df, conn=None, cur=None):
                 axis=1
             )
             
+            # Select columns by name so the insert matches the column list below
+            columns = [
+                'transaction_id', 'account_id', 'amount', 'date', 'name',
+                'merchant_name', 'category', 'group_name', 'payment_channel',
+                'authorized_datetime', 'pending', 'pending_transaction_id', 'pull_date'
+            ]
+            records = transactions_df['transactions'].reindex(columns=columns)
+            records = records.astype(object).where(records.notna(), None)
+            
+            ensure_partitions(cur, 'transactions', records['date'].tolist())
+            delete_redated_transactions(cur, list(records[['transaction_id', 'date']].itertuples(index=False, name=None)))
+            
             query = """
                 INSERT INTO transactions (
                     transaction_id, account_id, amount, date, name, 
                     merchant_name, category, group_name, payment_channel, 
                     authorized_datetime, pending, pending_transaction_id, pull_date
                 ) VALUES %s
-                ON CONFLICT (transaction_id) DO UPDATE SET
+                ON CONFLICT (transaction_id, date) DO UPDATE SET
                     account_id = EXCLUDED.account_id,
                     amount = EXCLUDED.amount,
-                    date = EXCLUDED.date,
                     name = EXCLUDED.name,
                     merchant_name = EXCLUDED.merchant_name,
                     category = EXCLUDED.category,
@@ -49,11 +76,14 @@ def save_transactions_to_db(transactions_df, conn=None, cur=None):
                     pending = EXCLUDED.pending,
                     pending_transaction_id = EXCLUDED.pending_transaction_id,
                     pull_date = EXCLUDED.pull_date
+                RETURNING transaction_id
             """
             
-            execute_values(cur, query, [tuple(x) for x in transactions_df['transactions'].values])
+            saved = execute_values(cur, query, [tuple(x) for x in records.values], fetch=True)
             
-            saved = cur.fetchall()
+            # Callers passing their own connection own the transaction
+            if should_close:
+                conn.commit()
             return len(saved)
             
         return 0
@@ -1,8 +1,8 @@
-from psycopg2.extras import DictCursor
 from decimal import Decimal
 from datetime import datetime, date
 import json
 from app.financial_data.utils.db_connection import get_db_connection
+from app.utils.json_response import decimals_as_floats
 from flask import jsonify
 import psycopg2
 
@@ -14,38 +14,40 @@ class CustomJSONEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super(CustomJSONEncoder, self).default(obj)
 
-def execute_query(query):
+def _plain_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def fetch_query(query, numeric_as_float=False):
+    """Run query and return (column names, row tuples) without converting any values.
+
+    numeric_as_float returns NUMERIC columns as floats instead of Decimal.
+    """
     conn = None
     cur = None
     try:
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
+        cur = conn.cursor()
+        if numeric_as_float:
+            decimals_as_floats(cur)
         
         cur.execute(query)
         results = cur.fetchall()
         
-        # Get column names from cursor description
         columns = [desc[0] for desc in cur.description] if cur.description else []
+        return columns, results
         
-        # Convert results to list of dicts with proper serialization
-        data = []
-        for row in results:
-            row_dict = {}
-            for i, col in enumerate(columns):
-                value = row[i]
-                if isinstance(value, Decimal):
-                    value = str(value)
-                elif isinstance(value, (datetime, date)):
-                    value = value.isoformat()
-                row_dict[col] = value
-            data.append(row_dict)
-            
-        return data
-        
-    except Exception as e:
-        raise e
     finally:
         if cur:
             cur.close()
         if conn:
-            conn.close() 
\ No newline at end of file
+            conn.close()
+
+def execute_query(query):
+    columns, rows = fetch_query(query)
+    
+    # Convert results to list of dicts with proper serialization
+    return [dict(zip(columns, map(_plain_value, row))) for row in rows] 
\ No newline at end of file
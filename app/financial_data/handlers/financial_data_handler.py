@@ -10,10 +10,12 @@ from app.plaid_service import (
     save_cursor, create_plaid_client, delete_cursor, get_initial_transactions, get_item_details
 )
 from ..processors.core.transactions_processor import process_transactions
-from ..db_operations.core.transactions_db import save_transactions_to_db
+from ..db_operations.core.transactions_db import save_transactions_to_db, delete_redated_transactions
 from ..db_operations.query_operations import execute_query
 from app.config import Config
 from app.financial_data.utils.db_connection import get_db_connection
+from app.financial_data.utils.partitions import ensure_partitions
+from app.utils.response_cache import bump_data_version
 from psycopg2.extras import execute_values
 import logging
 from plaid.model.transactions_get_request import TransactionsGetRequest
@@ -431,6 +433,8 @@ class FinancialDataHandler:
             results['error'] = str(e)
             return results
         finally:
+            # Whatever was committed before a failure is visible too
+            bump_data_version()
             if should_close and conn:
                 conn.close()
 
@@ -480,6 +484,7 @@ class FinancialDataHandler:
             if transactions_response.next_cursor:
                 save_cursor(transactions_response.next_cursor, institution_id)
             
+            bump_data_version()
             return results
             
         except Exception as e:
@@ -533,24 +538,36 @@ class FinancialDataHandler:
                     saved_group,    # Now includes Amazon Store Card logic
                     transaction.payment_channel,
                     transaction.authorized_datetime,
-                    datetime.now().date()
+                    datetime.now().date(),
+                    getattr(transaction, 'pending', False),
+                    getattr(transaction, 'pending_transaction_id', None)
                 ))
             
+            # Transactions Plaid no longer reports (mostly expired pending ones)
+            removed_ids = [t.transaction_id for t in (getattr(transactions_response, 'removed', None) or [])]
+            if removed_ids:
+                cur.execute("DELETE FROM transactions WHERE transaction_id = ANY(%s)", (removed_ids,))
+            
             if values:
+                ensure_partitions(cur, 'transactions', [row[3] for row in values])
+                delete_redated_transactions(cur, [(row[0], row[3]) for row in values])
+                
                 execute_values(cur, """
                     INSERT INTO transactions (
                         transaction_id, account_id, amount, date, name,
                         category, merchant_name, group_name, payment_channel,
-                        authorized_datetime, pull_date
+                        authorized_datetime, pull_date, pending, pending_transaction_id
                     ) VALUES %s
-                    ON CONFLICT (transaction_id) DO UPDATE SET
+                    ON CONFLICT (transaction_id, date) DO UPDATE SET
                         amount = EXCLUDED.amount,
                         category = EXCLUDED.category,
                         merchant_name = EXCLUDED.merchant_name,
                         group_name = EXCLUDED.group_name,
                         payment_channel = EXCLUDED.payment_channel,
                         authorized_datetime = EXCLUDED.authorized_datetime,
-                        pull_date = EXCLUDED.pull_date
+                        pull_date = EXCLUDED.pull_date,
+                        pending = EXCLUDED.pending,
+                        pending_transaction_id = EXCLUDED.pending_transaction_id
                 """, values)
                 
                 # Update any existing Amazon Store Card transactions
@@ -563,6 +580,7 @@ class FinancialDataHandler:
                 """)
                 
             conn.commit()
+            bump_data_version()
             return True
             
         except Exception as e:
@@ -685,15 +703,9 @@ class FinancialDataHandler:
                 WHERE institution_id = %s
             """, (institution_id,))
             
-            # Delete cursor
+            # Delete cursor (current_accounts rows go with the account history via trigger)
             cur.execute("DELETE FROM institution_cursors WHERE institution_id = %s", (institution_id,))
             
-            # Delete accounts
-            cur.execute("""
-                DELETE FROM accounts 
-                WHERE institution_id = %s
-            """, (institution_id,))
-            
             # Finally delete access token
             cur.execute("""
                 DELETE FROM access_tokens 
@@ -701,6 +713,7 @@ class FinancialDataHandler:
             """, (institution_id,))
             
             cur.execute("COMMIT")
+            bump_data_version()
             
         except Exception as e:
             cur.execute("ROLLBACK")
@@ -731,6 +744,7 @@ class FinancialDataHandler:
             """, (institution_id, current_pull_date))
             
             cur.execute("COMMIT")
+            bump_data_version()
             
         except Exception as cleanup_error:
             logger.error(f"Error during cleanup: {cleanup_error}")
@@ -1,5 +1,6 @@
 from datetime import datetime
 import pandas as pd
+from app.financial_data.utils.db_connection import get_db_connection
 
 def process_transactions(transactions_data):
     if not transactions_data:
@@ -0,0 +1,125 @@
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+
+# Filter values meaning "don't filter on this"
+ALL_VALUES = (None, 'all')
+
+
+def parse_month(month):
+    """'YYYY-MM' -> first day of that month; None or 'all' -> None. Raises ValueError otherwise."""
+    if month in ALL_VALUES:
+        return None
+    return datetime.strptime(month, '%Y-%m').date()
+
+
+def parse_date_param(value):
+    """ISO date or datetime query parameter (JavaScript toISOString() included) -> date"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+
+
+def month_range(month_start):
+    """Half-open [first day, first day of next month) range of month_start's month"""
+    month_start = month_start.replace(day=1)
+    return month_start, month_start + relativedelta(months=1)
+
+
+def trailing_months(months, today=None):
+    """Half-open range covering the last `months` calendar months, the current one included"""
+    this_month = (today or date.today()).replace(day=1)
+    return this_month - relativedelta(months=months - 1), this_month + relativedelta(months=1)
+
+
+class AnalyticsFilter:
+    """Parameterized predicates over one table alias, built to match the analytics indexes.
+
+    Dates are always compared as half-open ranges on the bare column (never TO_CHAR, date_trunc
+    or BETWEEN on timestamps), so partition pruning and the date indexes apply. Works for
+    stg_transactions/transactions (date, amount) and for the rollups (pass date_column='month'
+    or 'day' and flow_column='flow'). Every method returns the filter so calls can be chained.
+
+    With named=True placeholders are %(f_N)s and params is a dict, for queries that use
+    named parameters elsewhere.
+    """
+
+    def __init__(self, alias='t', date_column='date', amount_column='amount', flow_column=None, named=False):
+        self.alias = alias
+        self.date_column = date_column
+        self.amount_column = amount_column
+        self.flow_column = flow_column
+        self.named = named
+        self.conditions = []
+        self._params = {} if named else []
+
+    def _placeholder(self, value):
+        if self.named:
+            name = f"f_{len(self._params)}"
+            self._params[name] = value
+            return f"%({name})s"
+        self._params.append(value)
+        return "%s"
+
+    def column(self, name):
+        return f"{self.alias}.{name}" if self.alias else name
+
+    def add(self, condition, *values):
+        """Add a raw condition; each {} in condition becomes a placeholder for the next value"""
+        self.conditions.append(condition.format(*(self._placeholder(v) for v in values)))
+        return self
+
+    def date_range(self, start=None, end=None):
+        """start <= date < end; either bound may be None"""
+        if start is not None:
+            self.add(f"{self.column(self.date_column)} >= {{}}", start)
+        if end is not None:
+            self.add(f"{self.column(self.date_column)} < {{}}", end)
+        return self
+
+    def month(self, month):
+        """Restrict to one 'YYYY-MM' month (or a date in it); 'all' and None are no-ops"""
+        month_start = parse_month(month) if isinstance(month, str) or month is None else month
+        if month_start is not None:
+            self.date_range(*month_range(month_start))
+        return self
+
+    def equals(self, column, value):
+        """column = value, unless value is 'all' or None"""
+        if value not in ALL_VALUES:
+            self.add(f"{self.column(column)} = {{}}", value)
+        return self
+
+    def account(self, account_id):
+        return self.equals('account_id', account_id)
+
+    def direction(self, direction):
+        """'expense' (positive amounts), 'income' (negative amounts) or 'both'"""
+        if direction not in ('expense', 'income', 'both'):
+            raise ValueError(f"Unsupported direction: {direction}")
+        if self.flow_column:
+            if direction == 'both':
+                self.conditions.append(f"{self.column(self.flow_column)} IN ('expense', 'income')")
+            else:
+                self.add(f"{self.column(self.flow_column)} = {{}}", direction)
+        elif direction == 'expense':
+            self.conditions.append(f"{self.column(self.amount_column)} > 0")
+        elif direction == 'income':
+            self.conditions.append(f"{self.column(self.amount_column)} < 0")
+        else:
+            self.conditions.append(f"{self.column(self.amount_column)} <> 0")
+        return self
+
+    def exclude_transfers(self, column='is_transfer'):
+        """Drop transfers; column is is_transfer, or is_group_transfer for group analytics"""
+        self.conditions.append(f"NOT {self.column(column)}")
+        return self
+
+    def where(self):
+        """'WHERE ...' clause, or '' when there are no conditions"""
+        return f"WHERE {' AND '.join(self.conditions)}" if self.conditions else ""
+
+    def and_(self):
+        """' AND ...' for appending to an existing WHERE or JOIN condition"""
+        return "".join(f" AND {condition}" for condition in self.conditions)
+
+    @property
+    def params(self):
+        return dict(self._params) if self.named else tuple(self._params)
@@ -0,0 +1,48 @@
+import math
+
+# Time series charts are downsampled to this many points by default, and at most MAX_POINTS
+DEFAULT_POINTS = 300
+MAX_POINTS = 2000
+
+# SQL buckets per requested point, so LTTB still has peaks and troughs to pick from
+BUCKET_OVERSAMPLE = 4
+
+
+def bucket_days(start, end, points):
+    """Width in days of the SQL buckets for the half-open range [start, end) at `points` points"""
+    span = max((end - start).days, 1)
+    return max(1, math.ceil(span / (points * BUCKET_OVERSAMPLE)))
+
+
+def lttb(xs, ys, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps out of (xs, ys), sorted by x.
+
+    The first and last points are always kept. Every bucket in between keeps the point forming
+    the largest triangle with the previously kept point and the average of the next bucket, so
+    spikes and dips survive downsampling. Series of threshold points or fewer are returned whole.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        max_area = -1
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                a = j
+        kept.append(a)
+
+    kept.append(n - 1)
+    return kept
@@ -0,0 +1,88 @@
+import hashlib
+import re
+from pathlib import Path
+from app.financial_data.utils.db_connection import get_db_connection
+
+# Versioned schema changes live in app/migrations as NNNN_description.sql
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / 'migrations'
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+
+# Arbitrary key for pg_advisory_lock so concurrent app starts apply migrations once
+MIGRATION_LOCK_ID = 720280001
+
+
+def get_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Return (version, name, path) for every migration file, ordered by version"""
+    migrations = []
+    for path in Path(migrations_dir).glob('*.sql'):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        migrations.append((int(match.group(1)), match.group(2), path))
+
+    versions = [version for version, _, _ in migrations]
+    duplicates = {version for version in versions if versions.count(version) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate migration versions: {sorted(duplicates)}")
+
+    return sorted(migrations)
+
+
+def apply_migrations(conn=None, cur=None, migrations_dir=MIGRATIONS_DIR):
+    """Apply pending migrations in order, each in its own transaction. Returns applied versions."""
+    should_close = False
+    if conn is None or cur is None:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        should_close = True
+
+    applied_now = []
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                checksum VARCHAR(64) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+        cur.execute("SELECT version, checksum FROM schema_migrations")
+        applied = dict(cur.fetchall())
+
+        for version, name, path in get_migrations(migrations_dir):
+            sql = path.read_text()
+            checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+            if version in applied:
+                if applied[version] != checksum:
+                    print(f"Warning: migration {path.name} changed after it was applied")
+                continue
+
+            try:
+                cur.execute(sql)
+                cur.execute("""
+                    INSERT INTO schema_migrations (version, name, checksum)
+                    VALUES (%s, %s, %s)
+                """, (version, name, checksum))
+                conn.commit()
+                applied_now.append(version)
+                print(f"✓ Applied migration {path.name}")
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Error applying migration {path.name}: {e}")
+                raise
+
+        return applied_now
+
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+        if should_close:
+            cur.close()
+            conn.close()
@@ -0,0 +1,65 @@
+import base64
+from datetime import date
+
+# Page size bounds for keyset-paginated transaction lists
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+def encode_cursor(row_date, transaction_id):
+    """Opaque cursor for the row a page ended on"""
+    raw = f"{row_date.isoformat()}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(date, transaction_id) from encode_cursor(); raises ValueError for anything else"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        row_date, transaction_id = raw.split('|', 1)
+        return date.fromisoformat(row_date), transaction_id
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_params(args):
+    """(limit, after) from limit/cursor query parameters.
+
+    limit is None when the caller asked for neither, meaning the full list. after is the
+    decoded cursor, or None for the first page. Raises ValueError for a bad cursor.
+    """
+    limit = args.get('limit', type=int)
+    cursor = args.get('cursor')
+    if limit is None and not cursor:
+        return None, None
+    limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def keyset(filters, after, date_column='date', id_column='transaction_id'):
+    """Restrict an AnalyticsFilter to rows after the cursor in (date DESC, transaction_id DESC) order.
+
+    The row comparison is answered from a (date, transaction_id) index scanned backwards.
+    """
+    if after is not None:
+        filters.add(
+            f"({filters.column(date_column)}, {filters.column(id_column)}) < ({{}}, {{}})",
+            *after
+        )
+    return filters
+
+
+def limit_sql(limit):
+    """LIMIT fetching one row past the page, so page() can tell whether another follows"""
+    return f"LIMIT {int(limit) + 1}" if limit is not None else ""
+
+
+def page(rows, limit, key):
+    """Trim rows fetched with LIMIT limit + 1 to one page; returns (rows, next_cursor).
+
+    key maps a row to its (date, transaction_id).
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
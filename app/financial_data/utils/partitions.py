@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from app.financial_data.utils.db_connection import get_db_connection
+
+# Tables range-partitioned by month in migration 0005, with their partition key
+PARTITIONED_TABLES = {
+    'transactions': 'date',
+    'account_history': 'pull_date',
+}
+
+# Empty partitions kept ahead of the current month so new rows never land in the default partition
+PARTITION_MONTHS_AHEAD = 3
+
+# plaid_api_calls is partitioned by day (migration 0007); days of partitions created ahead
+API_CALL_PARTITION_DAYS_AHEAD = 7
+
+# Arbitrary key for pg_try_advisory_xact_lock so only one process runs API log upkeep at a time
+API_CALL_MAINTENANCE_LOCK_ID = 720340001
+
+
+def ensure_partitions(cur, table, dates):
+    """Create any missing monthly partitions of table covering the given dates"""
+    dates = [d for d in dates if d is not None and d == d]  # d == d drops NaT/NaN
+    if not dates:
+        return
+    cur.execute(
+        "SELECT ensure_monthly_partitions(%s::regclass, %s::date, %s::date)",
+        (table, min(dates), max(dates))
+    )
+
+
+def maintain_partitions(conn=None, cur=None, retention_months=0, drop=False):
+    """Create partitions for the coming months and detach those older than retention_months.
+
+    retention_months of 0 keeps everything. Detached partitions are left as standalone
+    tables unless drop is set. Returns the names of detached partitions.
+    """
+    should_close = False
+    if conn is None or cur is None:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        should_close = True
+
+    detached = []
+    try:
+        this_month = date.today().replace(day=1)
+        for table in PARTITIONED_TABLES:
+            ensure_partitions(cur, table, [this_month, this_month + relativedelta(months=PARTITION_MONTHS_AHEAD)])
+
+        if retention_months:
+            cutoff = this_month - relativedelta(months=retention_months)
+            for table in PARTITIONED_TABLES:
+                cur.execute("SELECT detach_monthly_partitions(%s::regclass, %s, %s)", (table, cutoff, drop))
+                detached.extend(row[0] for row in cur.fetchall())
+
+            # Detaching bypasses the sync triggers, so drop derived rows whose source is gone
+            cur.execute("""
+                DELETE FROM stg_transactions s
+                WHERE s.date < %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM transactions t
+                    WHERE t.transaction_id = s.transaction_id AND t.date = s.date
+                )
+            """, (cutoff,))
+
+        conn.commit()
+        return detached
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if should_close:
+            cur.close()
+            conn.close()
+
+
+def maintain_api_call_log(conn=None, cur=None, retention_days=30):
+    """Roll plaid_api_calls up by hour, create upcoming daily partitions and drop expired ones.
+
+    Expired calls in the default partition (history older than the daily partitions) are
+    deleted too. retention_days of 0 keeps every raw call. Returns the names of dropped
+    partitions.
+    """
+    should_close = False
+    if conn is None or cur is None:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        should_close = True
+
+    dropped = []
+    try:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (API_CALL_MAINTENANCE_LOCK_ID,))
+        if not cur.fetchone()[0]:
+            conn.rollback()
+            return dropped
+
+        today = date.today()
+        cur.execute(
+            "SELECT ensure_range_partitions('plaid_api_calls'::regclass, %s, %s, 'day')",
+            (today, today + timedelta(days=API_CALL_PARTITION_DAYS_AHEAD))
+        )
+
+        # Calls are logged when they finish, so the hour before the last rolled-up one can still change
+        cur.execute("SELECT MAX(hour) - INTERVAL '1 hour' FROM plaid_api_call_rollups")
+        rollup_from = cur.fetchone()[0]
+        cur.execute(
+            "SELECT rollup_plaid_api_calls(COALESCE(%s, '-infinity'::timestamp), 'infinity')",
+            (rollup_from,)
+        )
+
+        # Raw partitions are only dropped after their hours have been rolled up above
+        if retention_days:
+            cutoff = today - timedelta(days=retention_days)
+            cur.execute(
+                "SELECT detach_range_partitions('plaid_api_calls'::regclass, %s, 'day', TRUE)",
+                (cutoff,)
+            )
+            dropped.extend(row[0] for row in cur.fetchall())
+            cur.execute("DELETE FROM plaid_api_calls_default WHERE request_timestamp < %s", (cutoff,))
+
+        conn.commit()
+        return dropped
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if should_close:
+            cur.close()
+            conn.close()
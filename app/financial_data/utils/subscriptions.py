@@ -0,0 +1,28 @@
+from app.financial_data.utils.db_connection import get_db_connection
+
+
+def refresh_subscription_activity(conn=None, cur=None):
+    """Update subscriptions.is_active for grace periods that started or ended since the last run.
+
+    The triggers from migration 0012 keep every other column current on write; only the active
+    flag changes with the date alone. Returns the number of subscriptions changed.
+    """
+    should_close = False
+    if conn is None or cur is None:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        should_close = True
+
+    try:
+        cur.execute("SELECT refresh_subscription_activity()")
+        changed = cur.fetchone()[0]
+        conn.commit()
+        return changed
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if should_close:
+            cur.close()
+            conn.close()
@@ -1,8 +1,16 @@
 -- First drop any existing tables (in correct order)
+DROP TABLE IF EXISTS schema_migrations CASCADE;
+-- Tables created by app/migrations
+DROP TABLE IF EXISTS monthly_rollups CASCADE;
+DROP TABLE IF EXISTS daily_rollups CASCADE;
+DROP TABLE IF EXISTS current_accounts CASCADE;
+DROP TABLE IF EXISTS plaid_api_call_rollups CASCADE;
 DROP TABLE IF EXISTS plaid_api_calls CASCADE;
 DROP TABLE IF EXISTS access_tokens CASCADE;
 DROP TABLE IF EXISTS institution_cursors CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
+DROP TABLE IF EXISTS stg_transactions CASCADE;
+DROP TYPE IF EXISTS transaction_group_key CASCADE;
 DROP TABLE IF EXISTS group_mappings CASCADE;
 DROP TABLE IF EXISTS category_mappings CASCADE;
 DROP TABLE IF EXISTS account_history CASCADE;
@@ -242,9 +250,55 @@ FROM account_history
 WHERE type = 'loan'
 ORDER BY account_id, pull_date DESC;
 
--- Then add the stg_transactions view
-CREATE OR REPLACE VIEW stg_transactions AS 
-WITH transaction_groups AS (
+-- stg_transactions is a real table holding the de-duplicated, posted transactions.
+-- It is kept in sync by statement triggers on transactions that recompute only the
+-- (account_id, amount, name) groups touched by each write.
+CREATE TABLE stg_transactions (
+    transaction_id VARCHAR(255) PRIMARY KEY,
+    account_id VARCHAR(255),
+    amount DECIMAL(12,2),
+    date DATE,
+    name VARCHAR(255),
+    merchant_name VARCHAR(255),
+    category VARCHAR(255),
+    group_name VARCHAR(255),
+    payment_channel VARCHAR(50),
+    authorized_datetime TIMESTAMP,
+    pull_date DATE
+);
+
+CREATE INDEX idx_transactions_group_key ON transactions (account_id, amount, name);
+CREATE INDEX idx_stg_transactions_group_key ON stg_transactions (account_id, amount, name);
+
+CREATE TYPE transaction_group_key AS (
+    account_id VARCHAR(255),
+    amount DECIMAL(12,2),
+    name VARCHAR(255)
+);
+
+-- Groups are matched with = so the (account_id, amount, name) indexes are used. Keys with a
+-- NULL part, which = never matches, are matched separately with IS NOT DISTINCT FROM, so
+-- those rows are grouped like the window partitions group them.
+CREATE OR REPLACE FUNCTION refresh_stg_transactions(p_keys transaction_group_key[])
+RETURNS void AS $$
+BEGIN
+    DELETE FROM stg_transactions s
+    USING unnest(p_keys) k
+    WHERE s.account_id = k.account_id
+    AND s.amount = k.amount
+    AND s.name = k.name;
+
+    DELETE FROM stg_transactions s
+    USING unnest(p_keys) k
+    WHERE (k.account_id IS NULL OR k.amount IS NULL OR k.name IS NULL)
+    AND s.account_id IS NOT DISTINCT FROM k.account_id
+    AND s.amount IS NOT DISTINCT FROM k.amount
+    AND s.name IS NOT DISTINCT FROM k.name;
+
+    INSERT INTO stg_transactions (
+        transaction_id, account_id, amount, "date", name, merchant_name,
+        category, group_name, payment_channel, authorized_datetime, pull_date
+    )
     SELECT 
         transaction_id,
         account_id,
@@ -256,34 +310,92 @@ WITH transaction_groups AS (
         group_name,
         payment_channel,
         authorized_datetime,
-        pull_date,
-        (MAX("date") OVER (PARTITION BY account_id, amount, name) - 
-         MIN("date") OVER (PARTITION BY account_id, amount, name)) as date_diff,
-        ROW_NUMBER() OVER (
-            PARTITION BY account_id, amount, name 
-            ORDER BY "date"
-        ) as row_num
-    FROM transactions
-    WHERE pending = FALSE 
-    AND (pending_transaction_id IS NULL OR pending_transaction_id = '')
-)
-SELECT 
-    transaction_id,
-    account_id,
-    amount,
-    "date",
-    name,
-    merchant_name,
-    category,
-    group_name,
-    payment_channel,
-    authorized_datetime,
-    pull_date
-FROM transaction_groups
-WHERE 
-    (date_diff > 3 OR date_diff IS NULL)
-    OR 
-    (date_diff <= 3 AND row_num = 1);
+        pull_date
+    FROM (
+        SELECT 
+            t.*,
+            (MAX(t."date") OVER w - MIN(t."date") OVER w) as date_diff,
+            ROW_NUMBER() OVER (
+                PARTITION BY t.account_id, t.amount, t.name 
+                ORDER BY t."date", t.transaction_id
+            ) as row_num
+        FROM (
+            SELECT t.*
+            FROM transactions t
+            JOIN (SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)) k
+                ON t.account_id = k.account_id
+                AND t.amount = k.amount
+                AND t.name = k.name
+            UNION ALL
+            SELECT t.*
+            FROM transactions t
+            JOIN (
+                SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)
+                WHERE account_id IS NULL OR amount IS NULL OR name IS NULL
+            ) k
+                ON t.account_id IS NOT DISTINCT FROM k.account_id
+                AND t.amount IS NOT DISTINCT FROM k.amount
+                AND t.name IS NOT DISTINCT FROM k.name
+        ) t
+        WHERE t.pending = FALSE 
+        AND (t.pending_transaction_id IS NULL OR t.pending_transaction_id = '')
+        WINDOW w AS (PARTITION BY t.account_id, t.amount, t.name)
+    ) transaction_groups
+    WHERE 
+        -- Keep rows that aren't part of a duplicate group within 3 days
+        (date_diff > 3 OR date_diff IS NULL)
+        OR 
+        -- For duplicate groups within 3 days, keep only the first occurrence
+        (date_diff <= 3 AND row_num = 1);
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION sync_stg_transactions()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_stg_transactions(ARRAY(
+            SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM new_rows
+        ));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_stg_transactions(ARRAY(
+            SELECT ROW(account_id, amount, name)::transaction_group_key FROM old_rows
+            UNION
+            SELECT ROW(account_id, amount, name)::transaction_group_key FROM new_rows
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_stg_transactions(ARRAY(
+            SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM old_rows
+        ));
+    ELSE
+        TRUNCATE stg_transactions;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER sync_stg_transactions_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_truncate
+    AFTER TRUNCATE ON transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
 
 -- Add trigger to automatically update updated_at
 CREATE OR REPLACE FUNCTION update_items_updated_at()
@@ -0,0 +1,35 @@
+-- Indexes for the analytics and ingest queries.
+-- Compare plans before/after with `python -m benchmarks.explain`, which loads a
+-- synthetic 100k transaction history.
+
+-- transactions: ingest upserts, per-account deletes and name-based bulk edits
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_name ON transactions (name);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category);
+CREATE INDEX IF NOT EXISTS idx_transactions_group_name ON transactions (group_name);
+CREATE INDEX IF NOT EXISTS idx_transactions_pending ON transactions (transaction_id) WHERE pending = TRUE;
+CREATE INDEX IF NOT EXISTS idx_transactions_pending_transaction_id
+    ON transactions (pending_transaction_id)
+    WHERE pending_transaction_id IS NOT NULL;
+
+-- stg_transactions: every analytics endpoint filters it by date range, then category or group
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_date ON stg_transactions (date);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_category_date ON stg_transactions (category, date);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_group_date ON stg_transactions (group_name, date);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_account_date ON stg_transactions (account_id, date);
+
+-- account_history: latest snapshot per account and per-institution deletes
+CREATE INDEX IF NOT EXISTS idx_account_history_account_pull_date
+    ON account_history (account_id, pull_date DESC, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_account_history_institution ON account_history (institution_id);
+
+-- plaid_api_calls: deleted by access token when an institution is removed
+CREATE INDEX IF NOT EXISTS idx_plaid_api_calls_access_token_id ON plaid_api_calls (access_token_id);
+
+-- items: looked up by institution on every metadata and balance request
+CREATE INDEX IF NOT EXISTS idx_items_institution ON items (institution_id, updated_at DESC);
+
+ANALYZE transactions;
+ANALYZE stg_transactions;
+ANALYZE account_history;
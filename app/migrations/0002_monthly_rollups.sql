@@ -0,0 +1,109 @@
+-- Monthly aggregates of stg_transactions for the analytics endpoints.
+-- NULL category/group/account are stored as '' so they can be part of the primary key.
+-- flow is 'expense' for amount > 0 and 'income' otherwise.
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    month DATE NOT NULL,
+    account_id VARCHAR(255) NOT NULL DEFAULT '',
+    category VARCHAR(255) NOT NULL DEFAULT '',
+    group_name VARCHAR(255) NOT NULL DEFAULT '',
+    flow VARCHAR(10) NOT NULL,
+    total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, account_id, category, group_name, flow)
+);
+
+-- stg_transactions is rewritten by refresh_stg_transactions() as delete + insert, so
+-- adding new rows and subtracting old rows keeps the rollups exact, including re-categorization.
+CREATE OR REPLACE FUNCTION sync_monthly_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE monthly_rollups;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO monthly_rollups AS r (month, account_id, category, group_name, flow, total, txn_count)
+        SELECT
+            DATE_TRUNC('month', "date")::date,
+            COALESCE(account_id, ''),
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            SUM(amount),
+            COUNT(*)
+        FROM new_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (month, account_id, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO monthly_rollups AS r (month, account_id, category, group_name, flow, total, txn_count)
+        SELECT
+            DATE_TRUNC('month', "date")::date,
+            COALESCE(account_id, ''),
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            -SUM(amount),
+            -COUNT(*)
+        FROM old_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (month, account_id, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+
+        DELETE FROM monthly_rollups WHERE txn_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_monthly_rollups_insert ON stg_transactions;
+CREATE TRIGGER sync_monthly_rollups_insert
+    AFTER INSERT ON stg_transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_monthly_rollups();
+
+DROP TRIGGER IF EXISTS sync_monthly_rollups_update ON stg_transactions;
+CREATE TRIGGER sync_monthly_rollups_update
+    AFTER UPDATE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_monthly_rollups();
+
+DROP TRIGGER IF EXISTS sync_monthly_rollups_delete ON stg_transactions;
+CREATE TRIGGER sync_monthly_rollups_delete
+    AFTER DELETE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_monthly_rollups();
+
+DROP TRIGGER IF EXISTS sync_monthly_rollups_truncate ON stg_transactions;
+CREATE TRIGGER sync_monthly_rollups_truncate
+    AFTER TRUNCATE ON stg_transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_monthly_rollups();
+
+-- Backfill from the current history
+TRUNCATE monthly_rollups;
+INSERT INTO monthly_rollups (month, account_id, category, group_name, flow, total, txn_count)
+SELECT
+    DATE_TRUNC('month', "date")::date,
+    COALESCE(account_id, ''),
+    COALESCE(category, ''),
+    COALESCE(group_name, ''),
+    CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+    SUM(amount),
+    COUNT(*)
+FROM stg_transactions
+WHERE "date" IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5;
+
+ANALYZE monthly_rollups;
@@ -0,0 +1,105 @@
+-- Daily aggregates of stg_transactions for the cumulative spend curves.
+-- Same layout and maintenance as monthly_rollups (0002), keyed by day instead of month.
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day DATE NOT NULL,
+    category VARCHAR(255) NOT NULL DEFAULT '',
+    group_name VARCHAR(255) NOT NULL DEFAULT '',
+    flow VARCHAR(10) NOT NULL,
+    total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category, group_name, flow)
+);
+
+-- The curves read a date range for one flow, optionally narrowed to a category or group
+CREATE INDEX IF NOT EXISTS idx_daily_rollups_flow_day ON daily_rollups (flow, day);
+
+CREATE OR REPLACE FUNCTION sync_daily_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE daily_rollups;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO daily_rollups AS r (day, category, group_name, flow, total, txn_count)
+        SELECT
+            "date",
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            SUM(amount),
+            COUNT(*)
+        FROM new_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO daily_rollups AS r (day, category, group_name, flow, total, txn_count)
+        SELECT
+            "date",
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            -SUM(amount),
+            -COUNT(*)
+        FROM old_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+
+        DELETE FROM daily_rollups WHERE txn_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_daily_rollups_insert ON stg_transactions;
+CREATE TRIGGER sync_daily_rollups_insert
+    AFTER INSERT ON stg_transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_daily_rollups();
+
+DROP TRIGGER IF EXISTS sync_daily_rollups_update ON stg_transactions;
+CREATE TRIGGER sync_daily_rollups_update
+    AFTER UPDATE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_daily_rollups();
+
+DROP TRIGGER IF EXISTS sync_daily_rollups_delete ON stg_transactions;
+CREATE TRIGGER sync_daily_rollups_delete
+    AFTER DELETE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_daily_rollups();
+
+DROP TRIGGER IF EXISTS sync_daily_rollups_truncate ON stg_transactions;
+CREATE TRIGGER sync_daily_rollups_truncate
+    AFTER TRUNCATE ON stg_transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_daily_rollups();
+
+-- Backfill from the current history
+TRUNCATE daily_rollups;
+INSERT INTO daily_rollups (day, category, group_name, flow, total, txn_count)
+SELECT
+    "date",
+    COALESCE(category, ''),
+    COALESCE(group_name, ''),
+    CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+    SUM(amount),
+    COUNT(*)
+FROM stg_transactions
+WHERE "date" IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+
+ANALYZE daily_rollups;
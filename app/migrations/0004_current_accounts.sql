@@ -0,0 +1,237 @@
+-- Latest snapshot per account, kept in sync with account_history by statement triggers
+-- so account lookups are primary-key reads instead of DISTINCT ON scans of the history.
+-- balance_limit carries forward the most recent non-null limit, which the credit_accounts
+-- view used to backfill with a correlated subquery per row.
+CREATE TABLE IF NOT EXISTS current_accounts (
+    account_id VARCHAR(255) PRIMARY KEY,
+    history_id INTEGER NOT NULL,
+    account_name VARCHAR(255),
+    institution_id VARCHAR(255),
+    type VARCHAR(50),
+    subtype VARCHAR(50),
+    mask VARCHAR(20),
+    verification_status VARCHAR(50),
+    currency VARCHAR(3),
+    balance_current DECIMAL(12,2),
+    balance_available DECIMAL(12,2),
+    balance_limit DECIMAL(12,2),
+    last_statement_issue_date DATE,
+    last_statement_balance DECIMAL(12,2),
+    last_payment_amount DECIMAL(12,2),
+    last_payment_date DATE,
+    last_statement_date DATE,
+    minimum_payment_amount DECIMAL(12,2),
+    next_payment_due_date DATE,
+    apr_percentage DECIMAL(5,2),
+    apr_type VARCHAR(50),
+    balance_subject_to_apr DECIMAL(12,2),
+    interest_charge_amount DECIMAL(12,2),
+    created_at TIMESTAMP,
+    pull_date DATE
+);
+
+CREATE INDEX IF NOT EXISTS idx_current_accounts_institution ON current_accounts (institution_id);
+CREATE INDEX IF NOT EXISTS idx_current_accounts_type ON current_accounts (type);
+
+-- Re-derive the current row of the given accounts from account_history
+CREATE OR REPLACE FUNCTION refresh_current_accounts(p_account_ids VARCHAR[])
+RETURNS void AS $$
+BEGIN
+    DELETE FROM current_accounts c
+    WHERE c.account_id = ANY(p_account_ids)
+    AND NOT EXISTS (
+        SELECT 1 FROM account_history ah WHERE ah.account_id = c.account_id
+    );
+
+    INSERT INTO current_accounts (
+        account_id, history_id, account_name, institution_id, type, subtype, mask,
+        verification_status, currency, balance_current, balance_available, balance_limit,
+        last_statement_issue_date, last_statement_balance, last_payment_amount, last_payment_date,
+        last_statement_date, minimum_payment_amount, next_payment_due_date, apr_percentage,
+        apr_type, balance_subject_to_apr, interest_charge_amount, created_at, pull_date
+    )
+    SELECT
+        latest.account_id, latest.history_id, latest.account_name, latest.institution_id,
+        latest.type, latest.subtype, latest.mask, latest.verification_status, latest.currency,
+        latest.balance_current, latest.balance_available,
+        COALESCE(
+            latest.balance_limit,
+            (
+                SELECT ah.balance_limit
+                FROM account_history ah
+                WHERE ah.account_id = latest.account_id
+                AND ah.balance_limit IS NOT NULL
+                ORDER BY ah.pull_date DESC, ah.created_at DESC
+                LIMIT 1
+            )
+        ),
+        latest.last_statement_issue_date, latest.last_statement_balance, latest.last_payment_amount,
+        latest.last_payment_date, latest.last_statement_date, latest.minimum_payment_amount,
+        latest.next_payment_due_date, latest.apr_percentage, latest.apr_type,
+        latest.balance_subject_to_apr, latest.interest_charge_amount, latest.created_at, latest.pull_date
+    FROM (
+        SELECT DISTINCT ON (account_id) *
+        FROM account_history
+        WHERE account_id = ANY(p_account_ids)
+        ORDER BY account_id, pull_date DESC, created_at DESC, history_id DESC
+    ) latest
+    ON CONFLICT (account_id) DO UPDATE SET
+        history_id = EXCLUDED.history_id,
+        account_name = EXCLUDED.account_name,
+        institution_id = EXCLUDED.institution_id,
+        type = EXCLUDED.type,
+        subtype = EXCLUDED.subtype,
+        mask = EXCLUDED.mask,
+        verification_status = EXCLUDED.verification_status,
+        currency = EXCLUDED.currency,
+        balance_current = EXCLUDED.balance_current,
+        balance_available = EXCLUDED.balance_available,
+        balance_limit = EXCLUDED.balance_limit,
+        last_statement_issue_date = EXCLUDED.last_statement_issue_date,
+        last_statement_balance = EXCLUDED.last_statement_balance,
+        last_payment_amount = EXCLUDED.last_payment_amount,
+        last_payment_date = EXCLUDED.last_payment_date,
+        last_statement_date = EXCLUDED.last_statement_date,
+        minimum_payment_amount = EXCLUDED.minimum_payment_amount,
+        next_payment_due_date = EXCLUDED.next_payment_due_date,
+        apr_percentage = EXCLUDED.apr_percentage,
+        apr_type = EXCLUDED.apr_type,
+        balance_subject_to_apr = EXCLUDED.balance_subject_to_apr,
+        interest_charge_amount = EXCLUDED.interest_charge_amount,
+        created_at = EXCLUDED.created_at,
+        pull_date = EXCLUDED.pull_date;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION sync_current_accounts()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected VARCHAR[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT account_id) INTO affected
+        FROM new_rows WHERE account_id IS NOT NULL;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT account_id) INTO affected
+        FROM (
+            SELECT account_id FROM new_rows
+            UNION
+            SELECT account_id FROM old_rows
+        ) changed
+        WHERE account_id IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT account_id) INTO affected
+        FROM old_rows WHERE account_id IS NOT NULL;
+    ELSE
+        TRUNCATE current_accounts;
+        RETURN NULL;
+    END IF;
+
+    IF affected IS NOT NULL THEN
+        PERFORM refresh_current_accounts(affected);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_current_accounts_insert ON account_history;
+CREATE TRIGGER sync_current_accounts_insert
+    AFTER INSERT ON account_history
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+DROP TRIGGER IF EXISTS sync_current_accounts_update ON account_history;
+CREATE TRIGGER sync_current_accounts_update
+    AFTER UPDATE ON account_history
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+DROP TRIGGER IF EXISTS sync_current_accounts_delete ON account_history;
+CREATE TRIGGER sync_current_accounts_delete
+    AFTER DELETE ON account_history
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+DROP TRIGGER IF EXISTS sync_current_accounts_truncate ON account_history;
+CREATE TRIGGER sync_current_accounts_truncate
+    AFTER TRUNCATE ON account_history
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+-- Backfill from the current history
+TRUNCATE current_accounts;
+SELECT refresh_current_accounts(ARRAY(
+    SELECT DISTINCT account_id FROM account_history WHERE account_id IS NOT NULL
+)::VARCHAR[]);
+
+-- The account views keep their columns but now read the latest-state table
+DROP VIEW IF EXISTS accounts;
+CREATE VIEW accounts AS
+SELECT
+    account_id,
+    account_name,
+    institution_id,
+    type,
+    subtype,
+    mask,
+    verification_status,
+    currency,
+    pull_date
+FROM current_accounts;
+
+DROP VIEW IF EXISTS depository_accounts;
+CREATE VIEW depository_accounts AS
+SELECT
+    account_id,
+    balance_current,
+    balance_available,
+    pull_date
+FROM current_accounts
+WHERE type = 'depository';
+
+DROP VIEW IF EXISTS credit_accounts;
+CREATE VIEW credit_accounts AS
+SELECT
+    account_id,
+    account_name,
+    balance_current,
+    balance_available,
+    balance_limit,
+    last_statement_balance,
+    last_statement_date,
+    minimum_payment_amount,
+    next_payment_due_date,
+    last_payment_date,
+    last_payment_amount,
+    last_statement_issue_date,
+    apr_percentage,
+    apr_type,
+    balance_subject_to_apr,
+    interest_charge_amount,
+    pull_date,
+    created_at
+FROM current_accounts
+WHERE type = 'credit';
+
+DROP VIEW IF EXISTS investment_accounts;
+CREATE VIEW investment_accounts AS
+SELECT
+    account_id,
+    balance_current::numeric,
+    pull_date::date
+FROM current_accounts
+WHERE type = 'investment';
+
+DROP VIEW IF EXISTS loan_accounts;
+CREATE VIEW loan_accounts AS
+SELECT
+    account_id,
+    balance_current::numeric,
+    pull_date::date
+FROM current_accounts
+WHERE type = 'loan';
+
+ANALYZE current_accounts;
@@ -0,0 +1,270 @@
+-- Monthly range partitioning for transactions (by date) and account_history (by pull_date).
+-- Partitions are named <table>_pYYYYMM. Rows for a month without a partition land in
+-- <table>_default and are moved out when that month's partition is created.
+-- app/financial_data/utils/partitions.py creates partitions ahead of writes and applies retention.
+
+-- Create the monthly partitions of p_parent covering p_from through p_to (inclusive months)
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(p_parent regclass, p_from date, p_to date)
+RETURNS void AS $$
+DECLARE
+    parent_name TEXT;
+    key_column TEXT;
+    default_name TEXT;
+    partition_name TEXT;
+    month_start DATE;
+BEGIN
+    SELECT c.relname, a.attname
+    INTO parent_name, key_column
+    FROM pg_partitioned_table p
+    JOIN pg_class c ON c.oid = p.partrelid
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = p_parent;
+
+    IF parent_name IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', p_parent;
+    END IF;
+
+    default_name := parent_name || '_default';
+    month_start := date_trunc('month', p_from)::date;
+
+    WHILE month_start <= p_to LOOP
+        partition_name := parent_name || '_p' || to_char(month_start, 'YYYYMM');
+
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Serialize concurrent writers creating the same partition
+            PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent_name);
+
+                -- Attaching fails while the default partition holds rows for this range,
+                -- so move them into the new table first
+                IF to_regclass(default_name) IS NOT NULL THEN
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING *) '
+                        'INSERT INTO %I SELECT * FROM moved',
+                        default_name, key_column, key_column, partition_name
+                    ) USING month_start, (month_start + INTERVAL '1 month')::date;
+                END IF;
+
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent_name, partition_name, month_start, (month_start + INTERVAL '1 month')::date
+                );
+            END IF;
+        END IF;
+
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+-- Detach (and optionally drop) monthly partitions of p_parent that end on or before p_before.
+-- Returns the names of the affected partitions. The default partition is never touched.
+CREATE OR REPLACE FUNCTION detach_monthly_partitions(p_parent regclass, p_before date, p_drop boolean DEFAULT FALSE)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    child RECORD;
+BEGIN
+    FOR child IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = p_parent
+        AND c.relname ~ '_p[0-9]{6}$'
+        AND (to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month')::date <= p_before
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %s DETACH PARTITION %I', p_parent, child.relname);
+        IF p_drop THEN
+            EXECUTE format('DROP TABLE %I', child.relname);
+        END IF;
+        RETURN NEXT child.relname;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+-- transactions -------------------------------------------------------------
+
+ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+ALTER TABLE transactions_unpartitioned RENAME CONSTRAINT transactions_pkey TO transactions_unpartitioned_pkey;
+DROP TRIGGER IF EXISTS sync_stg_transactions_insert ON transactions_unpartitioned;
+DROP TRIGGER IF EXISTS sync_stg_transactions_update ON transactions_unpartitioned;
+DROP TRIGGER IF EXISTS sync_stg_transactions_delete ON transactions_unpartitioned;
+DROP TRIGGER IF EXISTS sync_stg_transactions_truncate ON transactions_unpartitioned;
+
+-- The partition key has to be part of the primary key
+CREATE TABLE transactions (
+    transaction_id VARCHAR(255) NOT NULL,
+    account_id VARCHAR(255),
+    amount DECIMAL(12,2),
+    date DATE NOT NULL,
+    name VARCHAR(255),
+    category VARCHAR(255),
+    group_name VARCHAR(255),
+    merchant_name VARCHAR(255),
+    payment_channel VARCHAR(50),
+    authorized_datetime TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    pull_date DATE DEFAULT CURRENT_DATE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    pending BOOLEAN DEFAULT FALSE,
+    pending_transaction_id VARCHAR(255),
+    PRIMARY KEY (transaction_id, date)
+) PARTITION BY RANGE (date);
+
+CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
+SELECT ensure_monthly_partitions(
+    'transactions',
+    COALESCE((SELECT MIN(date) FROM transactions_unpartitioned), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '3 months')::date
+);
+
+-- date is now required; the few rows without one fall back to when they were authorized or pulled.
+-- stg_transactions already reflects this data, so the copy runs before the sync triggers exist.
+INSERT INTO transactions (
+    transaction_id, account_id, amount, date, name, category, group_name, merchant_name,
+    payment_channel, authorized_datetime, created_at, pull_date, updated_at, pending, pending_transaction_id
+)
+SELECT
+    transaction_id, account_id, amount,
+    COALESCE(date, authorized_datetime::date, pull_date, created_at::date, CURRENT_DATE),
+    name, category, group_name, merchant_name, payment_channel, authorized_datetime,
+    created_at, pull_date, updated_at, pending, pending_transaction_id
+FROM transactions_unpartitioned;
+
+DROP TABLE transactions_unpartitioned;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_group_key ON transactions (account_id, amount, name);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_name ON transactions (name);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category);
+CREATE INDEX IF NOT EXISTS idx_transactions_group_name ON transactions (group_name);
+CREATE INDEX IF NOT EXISTS idx_transactions_pending ON transactions (transaction_id) WHERE pending = TRUE;
+CREATE INDEX IF NOT EXISTS idx_transactions_pending_transaction_id
+    ON transactions (pending_transaction_id)
+    WHERE pending_transaction_id IS NOT NULL;
+
+CREATE TRIGGER sync_stg_transactions_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+CREATE TRIGGER sync_stg_transactions_truncate
+    AFTER TRUNCATE ON transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_stg_transactions();
+
+-- account_history ----------------------------------------------------------
+
+ALTER TABLE account_history RENAME TO account_history_unpartitioned;
+ALTER TABLE account_history_unpartitioned RENAME CONSTRAINT account_history_pkey TO account_history_unpartitioned_pkey;
+DROP TRIGGER IF EXISTS sync_current_accounts_insert ON account_history_unpartitioned;
+DROP TRIGGER IF EXISTS sync_current_accounts_update ON account_history_unpartitioned;
+DROP TRIGGER IF EXISTS sync_current_accounts_delete ON account_history_unpartitioned;
+DROP TRIGGER IF EXISTS sync_current_accounts_truncate ON account_history_unpartitioned;
+
+-- Keep the history_id sequence when the old table is dropped
+ALTER SEQUENCE account_history_history_id_seq OWNED BY NONE;
+
+CREATE TABLE account_history (
+    history_id INTEGER NOT NULL DEFAULT nextval('account_history_history_id_seq'),
+    account_id VARCHAR(255),
+    account_name VARCHAR(255),
+    institution_id VARCHAR(255) REFERENCES institutions(id),
+    type VARCHAR(50),
+    subtype VARCHAR(50),
+    mask VARCHAR(20),
+    verification_status VARCHAR(50),
+    currency VARCHAR(3),
+    balance_current DECIMAL(12,2),
+    balance_available DECIMAL(12,2),
+    balance_limit DECIMAL(12,2),
+    last_statement_issue_date DATE,
+    last_statement_balance DECIMAL(12,2),
+    last_payment_amount DECIMAL(12,2),
+    last_payment_date DATE,
+    last_statement_date DATE,
+    minimum_payment_amount DECIMAL(12,2),
+    next_payment_due_date DATE,
+    apr_percentage DECIMAL(5,2),
+    apr_type VARCHAR(50),
+    balance_subject_to_apr DECIMAL(12,2),
+    interest_charge_amount DECIMAL(12,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    pull_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (history_id, pull_date)
+) PARTITION BY RANGE (pull_date);
+
+CREATE TABLE account_history_default PARTITION OF account_history DEFAULT;
+
+SELECT ensure_monthly_partitions(
+    'account_history',
+    COALESCE((SELECT MIN(pull_date) FROM account_history_unpartitioned), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '3 months')::date
+);
+
+-- current_accounts already reflects this data, so the copy runs before the sync triggers exist
+INSERT INTO account_history (
+    history_id, account_id, account_name, institution_id, type, subtype, mask,
+    verification_status, currency, balance_current, balance_available, balance_limit,
+    last_statement_issue_date, last_statement_balance, last_payment_amount, last_payment_date,
+    last_statement_date, minimum_payment_amount, next_payment_due_date, apr_percentage,
+    apr_type, balance_subject_to_apr, interest_charge_amount, created_at, pull_date
+)
+SELECT
+    history_id, account_id, account_name, institution_id, type, subtype, mask,
+    verification_status, currency, balance_current, balance_available, balance_limit,
+    last_statement_issue_date, last_statement_balance, last_payment_amount, last_payment_date,
+    last_statement_date, minimum_payment_amount, next_payment_due_date, apr_percentage,
+    apr_type, balance_subject_to_apr, interest_charge_amount, created_at,
+    COALESCE(pull_date, created_at::date, CURRENT_DATE)
+FROM account_history_unpartitioned;
+
+DROP TABLE account_history_unpartitioned;
+ALTER SEQUENCE account_history_history_id_seq OWNED BY account_history.history_id;
+
+CREATE INDEX IF NOT EXISTS idx_account_history_account_pull_date
+    ON account_history (account_id, pull_date DESC, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_account_history_institution ON account_history (institution_id);
+
+CREATE TRIGGER sync_current_accounts_insert
+    AFTER INSERT ON account_history
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+CREATE TRIGGER sync_current_accounts_update
+    AFTER UPDATE ON account_history
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+CREATE TRIGGER sync_current_accounts_delete
+    AFTER DELETE ON account_history
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+CREATE TRIGGER sync_current_accounts_truncate
+    AFTER TRUNCATE ON account_history
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_current_accounts();
+
+ANALYZE transactions;
+ANALYZE account_history;
@@ -0,0 +1,127 @@
+-- Stored derived columns so the analytics filters are plain column predicates that can use indexes:
+--   is_transfer        category mentions "transfer" (excluded from spend/income analytics)
+--   is_group_transfer  group_name mentions "transfer"
+--   month_start        first day of the transaction's month
+--   base_name          name with trailing "- 1234..." / "#1234..." suffixes removed (subscriptions)
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS is_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(COALESCE(category, '')) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS is_group_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(COALESCE(group_name, '')) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS month_start DATE
+        GENERATED ALWAYS AS (date_trunc('month', "date"::timestamp)::date) STORED,
+    ADD COLUMN IF NOT EXISTS base_name VARCHAR(255)
+        GENERATED ALWAYS AS (REGEXP_REPLACE(name, '\s*-\s*\d+.*$|\s*#\d+.*$', '')) STORED;
+
+ALTER TABLE stg_transactions
+    ADD COLUMN IF NOT EXISTS is_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(COALESCE(category, '')) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS is_group_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(COALESCE(group_name, '')) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS month_start DATE
+        GENERATED ALWAYS AS (date_trunc('month', "date"::timestamp)::date) STORED,
+    ADD COLUMN IF NOT EXISTS base_name VARCHAR(255)
+        GENERATED ALWAYS AS (REGEXP_REPLACE(name, '\s*-\s*\d+.*$|\s*#\d+.*$', '')) STORED;
+
+ALTER TABLE monthly_rollups
+    ADD COLUMN IF NOT EXISTS is_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(category) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS is_group_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(group_name) LIKE '%transfer%') STORED;
+
+ALTER TABLE daily_rollups
+    ADD COLUMN IF NOT EXISTS is_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(category) LIKE '%transfer%') STORED,
+    ADD COLUMN IF NOT EXISTS is_group_transfer BOOLEAN
+        GENERATED ALWAYS AS (LOWER(group_name) LIKE '%transfer%') STORED;
+
+-- Category and group pickers list the non-transfer expense values
+CREATE INDEX IF NOT EXISTS idx_transactions_expense_category
+    ON transactions (category) WHERE amount > 0 AND NOT is_transfer;
+CREATE INDEX IF NOT EXISTS idx_transactions_expense_group
+    ON transactions (group_name) WHERE amount > 0 AND NOT is_group_transfer;
+
+-- Summary lists filter one month, or a date range of non-transfer expenses or income
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_month_start ON stg_transactions (month_start);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_expense_date
+    ON stg_transactions (date) WHERE amount > 0 AND NOT is_transfer;
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_income_date
+    ON stg_transactions (date) WHERE amount < 0 AND NOT is_transfer;
+
+-- Subscription stats group Subs spend by base name
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_subs_base_name
+    ON stg_transactions (base_name, date) WHERE category = 'Subs';
+
+-- New partitions must carry the generated columns, and rows moved out of the default
+-- partition can only be copied through the non-generated columns
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(p_parent regclass, p_from date, p_to date)
+RETURNS void AS $$
+DECLARE
+    parent_name TEXT;
+    key_column TEXT;
+    default_name TEXT;
+    partition_name TEXT;
+    column_list TEXT;
+    month_start DATE;
+BEGIN
+    SELECT c.relname, a.attname
+    INTO parent_name, key_column
+    FROM pg_partitioned_table p
+    JOIN pg_class c ON c.oid = p.partrelid
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = p_parent;
+
+    IF parent_name IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', p_parent;
+    END IF;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+    INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = p_parent
+    AND attnum > 0
+    AND NOT attisdropped
+    AND attgenerated = '';
+
+    default_name := parent_name || '_default';
+    month_start := date_trunc('month', p_from)::date;
+
+    WHILE month_start <= p_to LOOP
+        partition_name := parent_name || '_p' || to_char(month_start, 'YYYYMM');
+
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Serialize concurrent writers creating the same partition
+            PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING GENERATED)',
+                    partition_name, parent_name
+                );
+
+                -- Attaching fails while the default partition holds rows for this range,
+                -- so move them into the new table first
+                IF to_regclass(default_name) IS NOT NULL THEN
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING %s) '
+                        'INSERT INTO %I (%s) SELECT %s FROM moved',
+                        default_name, key_column, key_column, column_list,
+                        partition_name, column_list, column_list
+                    ) USING month_start, (month_start + INTERVAL '1 month')::date;
+                END IF;
+
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent_name, partition_name, month_start, (month_start + INTERVAL '1 month')::date
+                );
+            END IF;
+        END IF;
+
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+ANALYZE transactions;
+ANALYZE stg_transactions;
@@ -0,0 +1,247 @@
+-- plaid_api_calls becomes a log partitioned by day on request_timestamp, rolled up into hourly
+-- aggregates per product/operation. Raw partitions older than API_CALL_RETENTION_DAYS are
+-- dropped by app/financial_data/utils/partitions.py once their hours have been rolled up.
+
+-- Partition helpers generalized over the partition unit ('month' -> <table>_pYYYYMM,
+-- 'day' -> <table>_pYYYYMMDD). The monthly functions from 0005/0006 become wrappers.
+CREATE OR REPLACE FUNCTION ensure_range_partitions(p_parent regclass, p_from date, p_to date, p_unit text)
+RETURNS void AS $$
+DECLARE
+    parent_name TEXT;
+    key_column TEXT;
+    default_name TEXT;
+    partition_name TEXT;
+    column_list TEXT;
+    suffix_format TEXT;
+    step INTERVAL;
+    range_start DATE;
+    range_end DATE;
+BEGIN
+    IF p_unit = 'month' THEN
+        suffix_format := 'YYYYMM';
+        step := INTERVAL '1 month';
+    ELSIF p_unit = 'day' THEN
+        suffix_format := 'YYYYMMDD';
+        step := INTERVAL '1 day';
+    ELSE
+        RAISE EXCEPTION 'Unsupported partition unit: %', p_unit;
+    END IF;
+
+    SELECT c.relname, a.attname
+    INTO parent_name, key_column
+    FROM pg_partitioned_table p
+    JOIN pg_class c ON c.oid = p.partrelid
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = p_parent;
+
+    IF parent_name IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', p_parent;
+    END IF;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+    INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = p_parent
+    AND attnum > 0
+    AND NOT attisdropped
+    AND attgenerated = '';
+
+    default_name := parent_name || '_default';
+    range_start := date_trunc(p_unit, p_from)::date;
+
+    WHILE range_start <= p_to LOOP
+        range_end := (range_start + step)::date;
+        partition_name := parent_name || '_p' || to_char(range_start, suffix_format);
+
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Serialize concurrent writers creating the same partition
+            PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING GENERATED)',
+                    partition_name, parent_name
+                );
+
+                -- Attaching fails while the default partition holds rows for this range,
+                -- so move them into the new table first
+                IF to_regclass(default_name) IS NOT NULL THEN
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING %s) '
+                        'INSERT INTO %I (%s) SELECT %s FROM moved',
+                        default_name, key_column, key_column, column_list,
+                        partition_name, column_list, column_list
+                    ) USING range_start, range_end;
+                END IF;
+
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent_name, partition_name, range_start, range_end
+                );
+            END IF;
+        END IF;
+
+        range_start := range_end;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(p_parent regclass, p_from date, p_to date)
+RETURNS void AS $$
+BEGIN
+    PERFORM ensure_range_partitions(p_parent, p_from, p_to, 'month');
+END;
+$$ language 'plpgsql';
+
+-- Detach (and optionally drop) p_unit partitions of p_parent that end on or before p_before.
+-- Returns the names of the affected partitions. The default partition is never touched.
+CREATE OR REPLACE FUNCTION detach_range_partitions(p_parent regclass, p_before date, p_unit text, p_drop boolean DEFAULT FALSE)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    child RECORD;
+    suffix_format TEXT;
+    suffix_length INTEGER;
+BEGIN
+    IF p_unit = 'month' THEN
+        suffix_format := 'YYYYMM';
+    ELSIF p_unit = 'day' THEN
+        suffix_format := 'YYYYMMDD';
+    ELSE
+        RAISE EXCEPTION 'Unsupported partition unit: %', p_unit;
+    END IF;
+    suffix_length := length(suffix_format);
+
+    FOR child IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = p_parent
+        AND c.relname ~ ('_p[0-9]{' || suffix_length || '}$')
+        AND (to_date(right(c.relname, suffix_length), suffix_format) + ('1 ' || p_unit)::interval)::date <= p_before
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %s DETACH PARTITION %I', p_parent, child.relname);
+        IF p_drop THEN
+            EXECUTE format('DROP TABLE %I', child.relname);
+        END IF;
+        RETURN NEXT child.relname;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION detach_monthly_partitions(p_parent regclass, p_before date, p_drop boolean DEFAULT FALSE)
+RETURNS SETOF TEXT AS $$
+    SELECT detach_range_partitions(p_parent, p_before, 'month', p_drop);
+$$ language 'sql';
+
+-- plaid_api_calls ----------------------------------------------------------
+
+ALTER TABLE plaid_api_calls RENAME TO plaid_api_calls_unpartitioned;
+ALTER TABLE plaid_api_calls_unpartitioned RENAME CONSTRAINT plaid_api_calls_pkey TO plaid_api_calls_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_plaid_api_calls_access_token_id;
+
+-- Keep the id sequence when the old table is dropped
+ALTER SEQUENCE plaid_api_calls_id_seq OWNED BY NONE;
+
+CREATE TABLE plaid_api_calls (
+    id INTEGER NOT NULL DEFAULT nextval('plaid_api_calls_id_seq'),
+    access_token_id INTEGER,
+    product VARCHAR(255),
+    operation VARCHAR(255),
+    institution_id VARCHAR(255),
+    request_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    response_time_ms INTEGER,
+    error_code VARCHAR(255),
+    error_message TEXT,
+    success BOOLEAN,
+    rate_limit_remaining INTEGER,
+    items_retrieved INTEGER,
+    request_id VARCHAR(255),
+    cursor_used TEXT,
+    next_cursor TEXT,
+    has_more BOOLEAN,
+    batch_number INTEGER,
+    total_batches INTEGER,
+    PRIMARY KEY (id, request_timestamp)
+) PARTITION BY RANGE (request_timestamp);
+
+CREATE TABLE plaid_api_calls_default PARTITION OF plaid_api_calls DEFAULT;
+
+-- Daily partitions only cover the default 30 day retention window; older calls go to
+-- plaid_api_calls_default, where they are rolled up below and purged by the maintenance
+-- thread, instead of creating one partition per day of history.
+-- Calls logged before request_timestamp was recorded are stamped with the migration time
+SELECT ensure_range_partitions('plaid_api_calls', CURRENT_DATE - 30, CURRENT_DATE + 7, 'day');
+
+INSERT INTO plaid_api_calls (
+    id, access_token_id, product, operation, institution_id, request_timestamp,
+    response_time_ms, error_code, error_message, success, rate_limit_remaining,
+    items_retrieved, request_id, cursor_used, next_cursor, has_more, batch_number, total_batches
+)
+SELECT
+    id, access_token_id, product, operation, institution_id,
+    COALESCE(request_timestamp, CURRENT_TIMESTAMP::timestamp),
+    response_time_ms, error_code, error_message, success, rate_limit_remaining,
+    items_retrieved, request_id, cursor_used, next_cursor, has_more, batch_number, total_batches
+FROM plaid_api_calls_unpartitioned;
+
+DROP TABLE plaid_api_calls_unpartitioned;
+ALTER SEQUENCE plaid_api_calls_id_seq OWNED BY plaid_api_calls.id;
+
+-- remove_institution deletes a token's calls
+CREATE INDEX IF NOT EXISTS idx_plaid_api_calls_access_token_id ON plaid_api_calls (access_token_id);
+
+-- Hourly rollups -----------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS plaid_api_call_rollups (
+    hour TIMESTAMP NOT NULL,
+    product VARCHAR(255) NOT NULL DEFAULT '',
+    operation VARCHAR(255) NOT NULL DEFAULT '',
+    call_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    p50_response_ms DOUBLE PRECISION,
+    p95_response_ms DOUBLE PRECISION,
+    items_retrieved BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, product, operation)
+);
+
+-- Recompute the hourly rollups for [p_from, p_to). Percentiles can't be maintained as
+-- deltas, so each hour is re-aggregated from the raw log and overwritten.
+CREATE OR REPLACE FUNCTION rollup_plaid_api_calls(p_from timestamp, p_to timestamp)
+RETURNS INTEGER AS $$
+DECLARE
+    rolled INTEGER;
+BEGIN
+    INSERT INTO plaid_api_call_rollups AS r (
+        hour, product, operation, call_count, error_count,
+        p50_response_ms, p95_response_ms, items_retrieved
+    )
+    SELECT
+        date_trunc('hour', request_timestamp),
+        COALESCE(product, ''),
+        COALESCE(operation, ''),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE success IS NOT TRUE),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY response_time_ms),
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY response_time_ms),
+        COALESCE(SUM(items_retrieved), 0)
+    FROM plaid_api_calls
+    WHERE request_timestamp >= date_trunc('hour', p_from)
+    AND request_timestamp < p_to
+    GROUP BY 1, 2, 3
+    ON CONFLICT (hour, product, operation) DO UPDATE SET
+        call_count = EXCLUDED.call_count,
+        error_count = EXCLUDED.error_count,
+        p50_response_ms = EXCLUDED.p50_response_ms,
+        p95_response_ms = EXCLUDED.p95_response_ms,
+        items_retrieved = EXCLUDED.items_retrieved;
+
+    GET DIAGNOSTICS rolled = ROW_COUNT;
+    RETURN rolled;
+END;
+$$ language 'plpgsql';
+
+SELECT rollup_plaid_api_calls('-infinity', 'infinity');
+
+ANALYZE plaid_api_calls;
+ANALYZE plaid_api_call_rollups;
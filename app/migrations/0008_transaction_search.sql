@@ -0,0 +1,14 @@
+-- Trigram indexes for substring (ILIKE '%...%') and fuzzy (%) matching on transaction names.
+-- Used by /transactions/api/transactions/search and the cashflow name patterns.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_name_trgm
+    ON transactions USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_name_trgm
+    ON transactions USING gin (merchant_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_name_trgm
+    ON stg_transactions USING gin (name gin_trgm_ops);
+
+ANALYZE transactions;
+ANALYZE stg_transactions;
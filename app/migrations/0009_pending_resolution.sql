@@ -0,0 +1,149 @@
+-- Resolve pending transactions and near-duplicates when transactions are written, so
+-- stg_transactions is a plain filter: NOT pending AND NOT is_duplicate.
+--   * A posted row carrying pending_transaction_id deletes the pending row it replaces.
+--     The posted row itself is kept. It used to be dropped together with the pending one.
+--   * is_duplicate marks every row but the first of a (account_id, amount, name) group of
+--     posted rows whose dates span 3 days or less. This is the rule stg_transactions applied
+--     with window functions before.
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS is_duplicate BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_posted_date
+    ON transactions (date) WHERE NOT pending AND NOT is_duplicate;
+
+CREATE OR REPLACE FUNCTION refresh_stg_transactions(p_keys transaction_group_key[])
+RETURNS void AS $$
+BEGIN
+    -- The flag update below is accounted for here, not by the sync triggers
+    PERFORM set_config('app.stg_sync_suspended', 'on', true);
+
+    UPDATE transactions t
+    SET is_duplicate = d.dup
+    FROM (
+        SELECT
+            e.transaction_id,
+            e."date",
+            (MAX(e."date") OVER w - MIN(e."date") OVER w) <= 3
+                AND ROW_NUMBER() OVER (
+                    PARTITION BY e.account_id, e.amount, e.name
+                    ORDER BY e."date", e.transaction_id
+                ) > 1 as dup
+        FROM transactions e
+        JOIN (SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)) k
+            ON e.account_id = k.account_id
+            AND e.amount = k.amount
+            AND e.name = k.name
+        WHERE e.pending = FALSE
+        WINDOW w AS (PARTITION BY e.account_id, e.amount, e.name)
+    ) d
+    WHERE t.transaction_id = d.transaction_id
+    AND t."date" = d."date"
+    AND t.is_duplicate IS DISTINCT FROM d.dup;
+
+    PERFORM set_config('app.stg_sync_suspended', 'off', true);
+
+    DELETE FROM stg_transactions s
+    USING unnest(p_keys) k
+    WHERE s.account_id = k.account_id
+    AND s.amount = k.amount
+    AND s.name = k.name;
+
+    INSERT INTO stg_transactions (
+        transaction_id, account_id, amount, "date", name, merchant_name,
+        category, group_name, payment_channel, authorized_datetime, pull_date
+    )
+    SELECT
+        t.transaction_id,
+        t.account_id,
+        t.amount,
+        t."date",
+        t.name,
+        t.merchant_name,
+        t.category,
+        t.group_name,
+        t.payment_channel,
+        t.authorized_datetime,
+        t.pull_date
+    FROM transactions t
+    JOIN (SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)) k
+        ON t.account_id = k.account_id
+        AND t.amount = k.amount
+        AND t.name = k.name
+    WHERE t.pending = FALSE
+    AND NOT t.is_duplicate;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION sync_stg_transactions()
+RETURNS TRIGGER AS $$
+DECLARE
+    keys transaction_group_key[];
+    superseded transaction_group_key[];
+BEGIN
+    -- Writes made by this function or refresh_stg_transactions() are handled by them
+    IF current_setting('app.stg_sync_suspended', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE stg_transactions;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        keys := ARRAY(
+            SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM new_rows
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        keys := ARRAY(
+            SELECT ROW(account_id, amount, name)::transaction_group_key FROM old_rows
+            UNION
+            SELECT ROW(account_id, amount, name)::transaction_group_key FROM new_rows
+        );
+    ELSE
+        keys := ARRAY(
+            SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM old_rows
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        -- Posted rows replace the pending rows they reference
+        PERFORM set_config('app.stg_sync_suspended', 'on', true);
+        WITH removed AS (
+            DELETE FROM transactions t
+            USING new_rows n
+            WHERE n.pending = FALSE
+            AND COALESCE(n.pending_transaction_id, '') <> ''
+            AND t.transaction_id = n.pending_transaction_id
+            AND t.pending = TRUE
+            RETURNING t.account_id, t.amount, t.name
+        )
+        SELECT ARRAY(
+            SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM removed
+        ) INTO superseded;
+        PERFORM set_config('app.stg_sync_suspended', 'off', true);
+
+        keys := keys || superseded;
+    END IF;
+
+    PERFORM refresh_stg_transactions(keys);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Resolve the existing history the same way
+SELECT set_config('app.stg_sync_suspended', 'on', true);
+DELETE FROM transactions p
+USING transactions n
+WHERE n.pending = FALSE
+AND COALESCE(n.pending_transaction_id, '') <> ''
+AND p.transaction_id = n.pending_transaction_id
+AND p.pending = TRUE;
+SELECT set_config('app.stg_sync_suspended', 'off', true);
+
+SELECT refresh_stg_transactions(ARRAY(
+    SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key FROM transactions
+));
+
+ANALYZE transactions;
+ANALYZE stg_transactions;
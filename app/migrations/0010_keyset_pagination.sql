@@ -0,0 +1,22 @@
+-- Transaction lists page by (date, transaction_id) keyset cursors, newest first.
+-- Ending the date indexes in transaction_id lets a page start at the cursor and read
+-- LIMIT rows in index order instead of sorting the whole window for every page.
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_date_id
+    ON stg_transactions (date, transaction_id);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_category_date_id
+    ON stg_transactions (category, date, transaction_id);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_group_date_id
+    ON stg_transactions (group_name, date, transaction_id);
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_expense_date_id
+    ON stg_transactions (date, transaction_id) WHERE amount > 0 AND NOT is_transfer;
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_income_date_id
+    ON stg_transactions (date, transaction_id) WHERE amount < 0 AND NOT is_transfer;
+
+-- The new indexes answer every query the (date) prefixes did
+DROP INDEX IF EXISTS idx_stg_transactions_date;
+DROP INDEX IF EXISTS idx_stg_transactions_category_date;
+DROP INDEX IF EXISTS idx_stg_transactions_group_date;
+DROP INDEX IF EXISTS idx_stg_transactions_expense_date;
+DROP INDEX IF EXISTS idx_stg_transactions_income_date;
+
+ANALYZE stg_transactions;
@@ -0,0 +1,84 @@
+-- Cash-flow classification is stored per transaction instead of being re-derived with ILIKE
+-- chains on every /api/cashflow request:
+--   * inflow   money in: a negative amount that is not a transfer
+--   * outflow  money out: a positive amount whose name contains an outflow pattern and no
+--              exclude pattern from cashflow_rules (case-insensitive substring matches)
+-- stg_transactions.flow_type is set when a row is written and recomputed for every row when
+-- cashflow_rules changes. It is NULL for transactions that are neither.
+
+CREATE TABLE IF NOT EXISTS cashflow_rules (
+    rule_id SERIAL PRIMARY KEY,
+    pattern VARCHAR(255) NOT NULL,
+    exclude BOOLEAN NOT NULL DEFAULT FALSE,
+    UNIQUE (pattern, exclude)
+);
+
+-- The rules /api/cashflow used to hardcode
+INSERT INTO cashflow_rules (pattern, exclude) VALUES
+    ('External Withdrawal', FALSE),
+    ('Zelle To ZIQI', FALSE),
+    ('Check', FALSE),
+    ('MONEYLINE', TRUE),
+    ('WF', TRUE)
+ON CONFLICT (pattern, exclude) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION cashflow_type(p_amount DECIMAL, p_name VARCHAR, p_category VARCHAR)
+RETURNS VARCHAR AS $$
+    SELECT CASE
+        WHEN p_amount < 0 AND LOWER(COALESCE(p_category, '')) NOT LIKE '%transfer%' THEN 'inflow'
+        WHEN p_amount > 0
+            AND EXISTS (
+                SELECT 1 FROM cashflow_rules r
+                WHERE NOT r.exclude AND STRPOS(LOWER(p_name), LOWER(r.pattern)) > 0
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM cashflow_rules r
+                WHERE r.exclude AND STRPOS(LOWER(p_name), LOWER(r.pattern)) > 0
+            )
+        THEN 'outflow'
+    END
+$$ LANGUAGE sql STABLE;
+
+ALTER TABLE stg_transactions ADD COLUMN IF NOT EXISTS flow_type VARCHAR(10);
+
+CREATE OR REPLACE FUNCTION set_stg_flow_type()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.flow_type := cashflow_type(NEW.amount, NEW.name, NEW.category);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS set_stg_flow_type ON stg_transactions;
+CREATE TRIGGER set_stg_flow_type
+    BEFORE INSERT OR UPDATE OF amount, name, category ON stg_transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION set_stg_flow_type();
+
+-- Re-evaluate every transaction whenever the rules change
+CREATE OR REPLACE FUNCTION reclassify_cashflow()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE stg_transactions
+    SET flow_type = cashflow_type(amount, name, category)
+    WHERE flow_type IS DISTINCT FROM cashflow_type(amount, name, category);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS reclassify_cashflow ON cashflow_rules;
+CREATE TRIGGER reclassify_cashflow
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cashflow_rules
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION reclassify_cashflow();
+
+-- Classify the existing history
+UPDATE stg_transactions
+SET flow_type = cashflow_type(amount, name, category)
+WHERE flow_type IS DISTINCT FROM cashflow_type(amount, name, category);
+
+-- /api/cashflow reads one date window of classified rows, newest first
+CREATE INDEX IF NOT EXISTS idx_stg_transactions_cashflow_date
+    ON stg_transactions (date, transaction_id) WHERE flow_type IS NOT NULL;
+
+ANALYZE stg_transactions;
@@ -0,0 +1,178 @@
+-- One row per subscription merchant (stg_transactions.base_name of 'Subs' expense charges), kept
+-- current by statement triggers on stg_transactions so /api/expenses/subs_stats reads a handful
+-- of precomputed rows. A write only recomputes the merchants whose 'Subs' rows it touched.
+--   interval_days  median number of days between consecutive charge dates; NULL after one charge
+--   frequency      interval_days bucketed into Weekly ... Annual, Irregular beyond that
+--   next_expected  last_payment + interval_days
+--   active_until   next_expected plus half an interval of grace (45 days after a single charge)
+--   is_active      active_until has not passed; also refreshed by refresh_subscription_activity()
+--                  from the maintenance thread, since it changes with the date and not the data
+
+CREATE TABLE IF NOT EXISTS subscriptions (
+    base_name VARCHAR(255) PRIMARY KEY,
+    payment_count INTEGER NOT NULL,
+    first_payment DATE NOT NULL,
+    last_payment DATE NOT NULL,
+    last_amount DECIMAL(12,2) NOT NULL,
+    average_amount DECIMAL(12,2) NOT NULL,
+    total_spent DECIMAL(14,2) NOT NULL,
+    interval_days INTEGER,
+    frequency VARCHAR(20) NOT NULL,
+    next_expected DATE,
+    active_until DATE NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_subscriptions_last_payment ON subscriptions (last_payment);
+
+-- Recompute the given merchants from their charges; merchants left without charges are removed
+CREATE OR REPLACE FUNCTION refresh_subscriptions(p_names VARCHAR[])
+RETURNS void AS $$
+BEGIN
+    DELETE FROM subscriptions WHERE base_name = ANY(p_names);
+
+    INSERT INTO subscriptions (
+        base_name, payment_count, first_payment, last_payment, last_amount, average_amount,
+        total_spent, interval_days, frequency, next_expected, active_until, is_active
+    )
+    WITH charges AS (
+        SELECT base_name, date, amount
+        FROM stg_transactions
+        WHERE category = 'Subs' AND amount > 0 AND base_name = ANY(p_names)
+    ),
+    -- Several charges on one day count as one payment date for the interval
+    gaps AS (
+        SELECT base_name, date - LAG(date) OVER (PARTITION BY base_name ORDER BY date) as gap
+        FROM (SELECT DISTINCT base_name, date FROM charges) d
+    ),
+    periods AS (
+        SELECT base_name, ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY gap))::integer as interval_days
+        FROM gaps
+        WHERE gap IS NOT NULL
+        GROUP BY base_name
+    ),
+    totals AS (
+        SELECT
+            base_name,
+            COUNT(*) as payment_count,
+            MIN(date) as first_payment,
+            MAX(date) as last_payment,
+            (ARRAY_AGG(amount ORDER BY date DESC, amount DESC))[1] as last_amount,
+            ROUND(AVG(amount), 2) as average_amount,
+            SUM(amount) as total_spent
+        FROM charges
+        GROUP BY base_name
+    ),
+    detected AS (
+        SELECT
+            t.*,
+            p.interval_days,
+            t.last_payment + p.interval_days as next_expected,
+            COALESCE(t.last_payment + p.interval_days + GREATEST(p.interval_days / 2, 7),
+                     t.last_payment + 45) as active_until
+        FROM totals t
+        LEFT JOIN periods p USING (base_name)
+    )
+    SELECT
+        base_name,
+        payment_count,
+        first_payment,
+        last_payment,
+        last_amount,
+        average_amount,
+        total_spent,
+        interval_days,
+        CASE
+            WHEN interval_days IS NULL THEN 'Unknown'
+            WHEN interval_days <= 10 THEN 'Weekly'
+            WHEN interval_days <= 20 THEN 'Biweekly'
+            WHEN interval_days <= 45 THEN 'Monthly'
+            WHEN interval_days <= 135 THEN 'Quarterly'
+            WHEN interval_days <= 270 THEN 'Semi-Annual'
+            WHEN interval_days <= 400 THEN 'Annual'
+            ELSE 'Irregular'
+        END as frequency,
+        next_expected,
+        active_until,
+        active_until >= CURRENT_DATE as is_active
+    FROM detected;
+END;
+$$ language 'plpgsql';
+
+-- Flip is_active for subscriptions whose grace period started or ended; returns the rows changed
+CREATE OR REPLACE FUNCTION refresh_subscription_activity()
+RETURNS integer AS $$
+    WITH changed AS (
+        UPDATE subscriptions
+        SET is_active = active_until >= CURRENT_DATE,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE is_active IS DISTINCT FROM (active_until >= CURRENT_DATE)
+        RETURNING 1
+    )
+    SELECT COUNT(*)::integer FROM changed
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION sync_subscriptions()
+RETURNS TRIGGER AS $$
+DECLARE
+    names VARCHAR[] := '{}';
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE subscriptions;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        names := names || ARRAY(
+            SELECT DISTINCT base_name FROM new_rows
+            WHERE category = 'Subs' AND base_name IS NOT NULL
+        );
+    END IF;
+    -- Rows recategorized away from 'Subs' or deleted leave their merchant to recompute
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        names := names || ARRAY(
+            SELECT DISTINCT base_name FROM old_rows
+            WHERE category = 'Subs' AND base_name IS NOT NULL
+        );
+    END IF;
+
+    IF cardinality(names) > 0 THEN
+        PERFORM refresh_subscriptions(names);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_subscriptions_insert ON stg_transactions;
+CREATE TRIGGER sync_subscriptions_insert
+    AFTER INSERT ON stg_transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_subscriptions();
+
+DROP TRIGGER IF EXISTS sync_subscriptions_update ON stg_transactions;
+CREATE TRIGGER sync_subscriptions_update
+    AFTER UPDATE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_subscriptions();
+
+DROP TRIGGER IF EXISTS sync_subscriptions_delete ON stg_transactions;
+CREATE TRIGGER sync_subscriptions_delete
+    AFTER DELETE ON stg_transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_subscriptions();
+
+DROP TRIGGER IF EXISTS sync_subscriptions_truncate ON stg_transactions;
+CREATE TRIGGER sync_subscriptions_truncate
+    AFTER TRUNCATE ON stg_transactions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_subscriptions();
+
+-- Detect every existing subscription
+SELECT refresh_subscriptions(ARRAY(
+    SELECT DISTINCT base_name FROM stg_transactions
+    WHERE category = 'Subs' AND base_name IS NOT NULL
+));
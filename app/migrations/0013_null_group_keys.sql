@@ -0,0 +1,103 @@
+-- refresh_stg_transactions() matched (account_id, amount, name) groups with =, which never
+-- matches NULL, so a transaction with a NULL in any of the three never reached stg_transactions
+-- and the stg_transactions view it replaced kept such rows. Groups are still matched with =,
+-- so the group-key indexes are used; keys with a NULL part are matched separately with
+-- IS NOT DISTINCT FROM, grouping those rows like the duplicate window partitions do.
+
+CREATE OR REPLACE FUNCTION refresh_stg_transactions(p_keys transaction_group_key[])
+RETURNS void AS $$
+BEGIN
+    -- The flag update below is accounted for here, not by the sync triggers
+    PERFORM set_config('app.stg_sync_suspended', 'on', true);
+
+    UPDATE transactions t
+    SET is_duplicate = d.dup
+    FROM (
+        SELECT
+            e.transaction_id,
+            e."date",
+            (MAX(e."date") OVER w - MIN(e."date") OVER w) <= 3
+                AND ROW_NUMBER() OVER (
+                    PARTITION BY e.account_id, e.amount, e.name
+                    ORDER BY e."date", e.transaction_id
+                ) > 1 as dup
+        FROM (
+            SELECT e.*
+            FROM transactions e
+            JOIN (SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)) k
+                ON e.account_id = k.account_id
+                AND e.amount = k.amount
+                AND e.name = k.name
+            UNION ALL
+            SELECT e.*
+            FROM transactions e
+            JOIN (
+                SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)
+                WHERE account_id IS NULL OR amount IS NULL OR name IS NULL
+            ) k
+                ON e.account_id IS NOT DISTINCT FROM k.account_id
+                AND e.amount IS NOT DISTINCT FROM k.amount
+                AND e.name IS NOT DISTINCT FROM k.name
+        ) e
+        WHERE e.pending = FALSE
+        WINDOW w AS (PARTITION BY e.account_id, e.amount, e.name)
+    ) d
+    WHERE t.transaction_id = d.transaction_id
+    AND t."date" = d."date"
+    AND t.is_duplicate IS DISTINCT FROM d.dup;
+
+    PERFORM set_config('app.stg_sync_suspended', 'off', true);
+
+    DELETE FROM stg_transactions s
+    USING unnest(p_keys) k
+    WHERE s.account_id = k.account_id
+    AND s.amount = k.amount
+    AND s.name = k.name;
+
+    DELETE FROM stg_transactions s
+    USING unnest(p_keys) k
+    WHERE (k.account_id IS NULL OR k.amount IS NULL OR k.name IS NULL)
+    AND s.account_id IS NOT DISTINCT FROM k.account_id
+    AND s.amount IS NOT DISTINCT FROM k.amount
+    AND s.name IS NOT DISTINCT FROM k.name;
+
+    INSERT INTO stg_transactions (
+        transaction_id, account_id, amount, "date", name, merchant_name,
+        category, group_name, payment_channel, authorized_datetime, pull_date
+    )
+    SELECT
+        t.transaction_id,
+        t.account_id,
+        t.amount,
+        t."date",
+        t.name,
+        t.merchant_name,
+        t.category,
+        t.group_name,
+        t.payment_channel,
+        t.authorized_datetime,
+        t.pull_date
+    FROM (
+        SELECT t.*
+        FROM transactions t
+        JOIN (SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)) k
+            ON t.account_id = k.account_id
+            AND t.amount = k.amount
+            AND t.name = k.name
+        UNION ALL
+        SELECT t.*
+        FROM transactions t
+        JOIN (
+            SELECT DISTINCT account_id, amount, name FROM unnest(p_keys)
+            WHERE account_id IS NULL OR amount IS NULL OR name IS NULL
+        ) k
+            ON t.account_id IS NOT DISTINCT FROM k.account_id
+            AND t.amount IS NOT DISTINCT FROM k.amount
+            AND t.name IS NOT DISTINCT FROM k.name
+    ) t
+    WHERE t.pending = FALSE
+    AND NOT t.is_duplicate;
+END;
+$$ language 'plpgsql';
+
+-- The groups left out are brought in by 0015, once the rollups accept NULL amounts
@@ -0,0 +1,27 @@
+-- Replacing the cash-flow rules deletes some and inserts others, and each statement fired a
+-- full reclassification of stg_transactions (cascading into the rollup and subscription
+-- triggers). A caller that changes several rules sets app.cashflow_reclassify_suspended for
+-- its transaction and calls reclassify_stg_flow_types() once at the end instead.
+
+-- Recompute flow_type where the rules changed it; returns the rows updated
+CREATE OR REPLACE FUNCTION reclassify_stg_flow_types()
+RETURNS integer AS $$
+    WITH changed AS (
+        UPDATE stg_transactions
+        SET flow_type = cashflow_type(amount, name, category)
+        WHERE flow_type IS DISTINCT FROM cashflow_type(amount, name, category)
+        RETURNING 1
+    )
+    SELECT COUNT(*)::integer FROM changed
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION reclassify_cashflow()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('app.cashflow_reclassify_suspended', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM reclassify_stg_flow_types();
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
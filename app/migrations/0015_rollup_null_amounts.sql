@@ -0,0 +1,141 @@
+-- stg_transactions can hold rows with a NULL amount since 0013, and SUM over a group of only
+-- NULL amounts is NULL, which the NOT NULL rollup totals reject. Such rows now add 0 to the
+-- total and still count in txn_count, so the counts keep matching stg_transactions.
+
+CREATE OR REPLACE FUNCTION sync_monthly_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE monthly_rollups;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO monthly_rollups AS r (month, account_id, category, group_name, flow, total, txn_count)
+        SELECT
+            DATE_TRUNC('month', "date")::date,
+            COALESCE(account_id, ''),
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            COALESCE(SUM(amount), 0),
+            COUNT(*)
+        FROM new_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (month, account_id, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO monthly_rollups AS r (month, account_id, category, group_name, flow, total, txn_count)
+        SELECT
+            DATE_TRUNC('month', "date")::date,
+            COALESCE(account_id, ''),
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            -COALESCE(SUM(amount), 0),
+            -COUNT(*)
+        FROM old_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (month, account_id, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+
+        DELETE FROM monthly_rollups WHERE txn_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION sync_daily_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE daily_rollups;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO daily_rollups AS r (day, category, group_name, flow, total, txn_count)
+        SELECT
+            "date",
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            COALESCE(SUM(amount), 0),
+            COUNT(*)
+        FROM new_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO daily_rollups AS r (day, category, group_name, flow, total, txn_count)
+        SELECT
+            "date",
+            COALESCE(category, ''),
+            COALESCE(group_name, ''),
+            CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+            -COALESCE(SUM(amount), 0),
+            -COUNT(*)
+        FROM old_rows
+        WHERE "date" IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, category, group_name, flow) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            txn_count = r.txn_count + EXCLUDED.txn_count;
+
+        DELETE FROM daily_rollups WHERE txn_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Bring in the NULL-key groups 0013 left out, now that the rollups accept them
+SELECT refresh_stg_transactions(ARRAY(
+    SELECT DISTINCT ROW(account_id, amount, name)::transaction_group_key
+    FROM transactions
+    WHERE account_id IS NULL OR amount IS NULL OR name IS NULL
+));
+
+ANALYZE stg_transactions;
+
+-- Rebuild both rollups from stg_transactions with the same coalesced totals
+TRUNCATE monthly_rollups;
+INSERT INTO monthly_rollups (month, account_id, category, group_name, flow, total, txn_count)
+SELECT
+    DATE_TRUNC('month', "date")::date,
+    COALESCE(account_id, ''),
+    COALESCE(category, ''),
+    COALESCE(group_name, ''),
+    CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+    COALESCE(SUM(amount), 0),
+    COUNT(*)
+FROM stg_transactions
+WHERE "date" IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5;
+
+TRUNCATE daily_rollups;
+INSERT INTO daily_rollups (day, category, group_name, flow, total, txn_count)
+SELECT
+    "date",
+    COALESCE(category, ''),
+    COALESCE(group_name, ''),
+    CASE WHEN amount > 0 THEN 'expense' ELSE 'income' END,
+    COALESCE(SUM(amount), 0),
+    COUNT(*)
+FROM stg_transactions
+WHERE "date" IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+
+ANALYZE monthly_rollups;
+ANALYZE daily_rollups;
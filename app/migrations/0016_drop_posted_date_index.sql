@@ -0,0 +1,6 @@
+-- idx_transactions_posted_date (0009) was meant to back the NOT pending AND NOT is_duplicate
+-- filter, but no query reads transactions by date with it: refresh_stg_transactions() selects
+-- by (account_id, amount, name) through the group-key indexes and analytics reads
+-- stg_transactions. It only cost every transactions write an index update.
+
+DROP INDEX IF EXISTS idx_transactions_posted_date;
@@ -1,9 +1,16 @@
 from flask import Blueprint, jsonify, request, render_template, current_app
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from app.config import Config
 from app.financial_data.utils.db_connection import get_db_connection
-from psycopg2.extras import RealDictCursor, DictCursor
-import calendar
+from app.financial_data.utils.analytics_filters import (
+    AnalyticsFilter, parse_month, parse_date_param, month_range, trailing_months
+)
+from app.financial_data.utils.pagination import keyset, limit_sql, page, page_params
+from app.financial_data.utils.downsampling import DEFAULT_POINTS, MAX_POINTS, bucket_days, lttb
+from app.utils.response_cache import bump_data_version, cached_response, conditional_response
+from app.utils.json_response import ndjson_response, wants_ndjson
+from psycopg2.extras import RealDictCursor, DictCursor, execute_values
 from zoneinfo import ZoneInfo
 
 analytics_bp = Blueprint('analytics', __name__)
@@ -28,7 +35,86 @@ def net_income():
 def expenses_subs():
     return render_template('subs.html')
 
+def _transactions_page(cur, filters, column, amount_sql, limit, after):
+    """One page of the filtered stg_transactions, newest first, as (rows, next_cursor).
+
+    Rows are (transaction_id, name, column, amount, date), ordered by (date, transaction_id)
+    so a page continues from the cursor through the date indexes instead of re-sorting the
+    whole window. limit=None returns every row.
+    """
+    keyset(filters, after)
+    cur.execute(f"""
+    SELECT 
+        t.transaction_id,
+        t.name,
+        t.{column},
+        {amount_sql} as amount,
+        t.date
+    FROM stg_transactions t
+    {filters.where()}
+    ORDER BY t.date DESC, t.transaction_id DESC
+    {limit_sql(limit)}
+    """, filters.params)
+    return page(cur.fetchall(), limit, lambda row: (row[4], row[0]))
+
+def _summary_stats(cur, source, filters, column, amount_sql, month_sql, count_sql="COUNT(*)"):
+    """Summary statistics of a filtered window, computed in one grouped scan.
+
+    GROUPING SETS return the total per raw value (for row percentages), per display label
+    (NULL and '' both count as 'Uncategorized', for the highest one) and overall; a window
+    ranks the labels. 'months' counts the distinct month_sql values, the months with any
+    transaction, which the monthly averages divide by.
+    Returns {'totals': {value: total}, 'total', 'count', 'months', 'highest'}.
+    """
+    label = f"COALESCE(NULLIF({column}, ''), 'Uncategorized')"
+    cur.execute(f"""
+    SELECT 
+        GROUPING({column}) = 0 as by_value,
+        GROUPING({label}) = 0 as by_label,
+        {column} as value,
+        {label} as label,
+        SUM({amount_sql}) as total,
+        {count_sql} as transaction_count,
+        COUNT(DISTINCT {month_sql}) as months,
+        ROW_NUMBER() OVER (
+            PARTITION BY GROUPING({column}), GROUPING({label})
+            ORDER BY SUM({amount_sql}) DESC, {label}
+        ) as label_rank
+    FROM {source}
+    {filters.where()}
+    GROUP BY GROUPING SETS (({column}), ({label}), ())
+    """, filters.params)
+    
+    stats = {'totals': {}, 'total': 0.0, 'count': 0, 'months': 0, 'highest': ''}
+    for by_value, by_label, value, label, total, count, months, label_rank in cur.fetchall():
+        if by_value:
+            stats['totals'][value] = float(total)
+        elif by_label:
+            if label_rank == 1:
+                stats['highest'] = label
+        else:
+            stats['total'] = float(total or 0)
+            stats['count'] = int(count or 0)
+            stats['months'] = months
+    return stats
+
+def _monthly_average(stats):
+    """Total spread over the months that have transactions"""
+    return stats['total'] / stats['months'] if stats['months'] else 0
+
+def _summary_only():
+    """summary_only=true skips the transaction list for callers that only show the totals"""
+    return request.args.get('summary_only', 'false').lower() == 'true'
+
+def _value_percentage(row, totals):
+    """Share of its category/group total; rows without one never matched a total"""
+    if not row[2] or not totals.get(row[2]):
+        return 0
+    return float(row[3]) / totals[row[2]] * 100
+
 @analytics_bp.route('/api/expenses/summary')
+@conditional_response
+@cached_response
 def expenses_summary():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -37,92 +123,43 @@ def expenses_summary():
         # Get filter parameters
         category = request.args.get('category', 'all')
         month = request.args.get('month', 'all')
-        
-        # Get last 12 months
-        end_date = datetime.now()
-        start_date = end_date - relativedelta(months=11)
-        
-        base_conditions = """
-            WHERE t.amount > 0
-            AND t.date BETWEEN %s AND %s
-            AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
-        """
-        
-        params = [start_date, end_date]
-        
-        if category != 'all':
-            base_conditions += " AND t.category = %s"
-            params.append(category)
-            
-        if month != 'all':
-            base_conditions += " AND TO_CHAR(t.date, 'YYYY-MM') = %s"
-            params.append(month)
-        
-        query = f"""
-        WITH filtered_transactions AS (
-            SELECT 
-                t.transaction_id,
-                t.name,
-                t.category,
-                t.amount,
-                t.date
-            FROM stg_transactions t
-            {base_conditions}
-        ),
-        category_totals AS (
-            SELECT 
-                category,
-                SUM(amount) as category_total
-            FROM filtered_transactions
-            GROUP BY category
-        ),
-        total_amount AS (
-            SELECT SUM(amount) as grand_total 
-            FROM filtered_transactions
+        limit, after = page_params(request.args)
+        
+        # Last 12 calendar months
+        filters = (
+            AnalyticsFilter()
+            .direction('expense')
+            .date_range(*trailing_months(12))
+            .exclude_transfers()
+            .equals('category', category)
+            .month(month)
         )
-        SELECT 
-            ft.transaction_id,
-            ft.name,
-            ft.category,
-            ft.amount,
-            ft.date,
-            (ft.amount / NULLIF(ct.category_total, 0) * 100) as category_percentage
-        FROM filtered_transactions ft
-        LEFT JOIN category_totals ct ON ft.category = ct.category
-        CROSS JOIN total_amount
-        ORDER BY ft.date DESC, ft.amount DESC
-        """
-        
-        cur.execute(query, tuple(params))
-        results = cur.fetchall()
-        
-        # Calculate summary statistics
-        total_expenses = sum(abs(float(row[3])) for row in results)
-        monthly_average = total_expenses / 12 if results else 0
-        
-        # Find highest category
-        category_totals = {}
-        for row in results:
-            category = row[2] or 'Uncategorized'
-            amount = abs(float(row[3]))
-            category_totals[category] = category_totals.get(category, 0) + amount
-        
-        highest_category = max(category_totals.items(), key=lambda x: x[1])[0] if category_totals else ''
-        
-        return jsonify({
-            'total_expenses': total_expenses,
-            'monthly_average': monthly_average,
-            'highest_category': highest_category,
-            'transactions': [{
-                'transaction_id': row[0],
-                'name': row[1],
-                'category': row[2] or 'Uncategorized',
-                'amount': abs(float(row[3])),
-                'date': row[4].isoformat(),
-                'percentage': float(row[5] or 0)
-            } for row in results]
-        })
         
+        # Totals cover the whole window, whichever page is listed
+        stats = _summary_stats(cur, 'stg_transactions t', filters, 't.category', 't.amount', 't.month_start')
+        response = {
+            'total_expenses': stats['total'],
+            'monthly_average': _monthly_average(stats),
+            'highest_category': stats['highest'],
+            'total_count': stats['count']
+        }
+        if _summary_only():
+            return jsonify(response)
+        
+        results, next_cursor = _transactions_page(cur, filters, 'category', 't.amount', limit, after)
+        response['next_cursor'] = next_cursor
+        response['transactions'] = [{
+            'transaction_id': row[0],
+            'name': row[1],
+            'category': row[2] or 'Uncategorized',
+            'amount': abs(float(row[3])),
+            'date': row[4].isoformat(),
+            'percentage': _value_percentage(row, stats['totals'])
+        } for row in results]
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in expenses_summary: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -131,56 +168,40 @@ def expenses_summary():
         conn.close()
 
 @analytics_bp.route('/api/expenses/monthly')
+@conditional_response
+@cached_response
 def expenses_monthly():
     category = request.args.get('category', 'all')
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
-        # Get last 12 months
-        end_date = datetime.now()
-        start_date = end_date - relativedelta(months=11)
+        # Last 12 calendar months
+        start_date, end_date = trailing_months(12)
         
+        filters = AnalyticsFilter('r', date_column='month', flow_column='flow').direction('expense')
         if category != 'all':
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(t.amount), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount > 0
-                AND category = %s
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date, category))
+            filters.equals('category', category)
         else:
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(t.amount), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount > 0
-                AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date))
+            filters.exclude_transfers()
+        
+        query = f"""
+        SELECT 
+            d.month,
+            COALESCE(SUM(r.total), 0) as total_amount
+        FROM generate_series(
+            %s::timestamp,
+            %s::timestamp - INTERVAL '1 month',
+            '1 month'
+        ) AS d(month)
+        LEFT JOIN monthly_rollups r ON 
+            r.month = d.month::date
+            {filters.and_()}
+        GROUP BY d.month
+        ORDER BY d.month
+        """
+        
+        cur.execute(query, (start_date, end_date) + filters.params)
         results = cur.fetchall()
         
         months = []
@@ -203,6 +224,8 @@ def expenses_monthly():
         conn.close()
 
 @analytics_bp.route('/api/expenses/group_summary')
+@conditional_response
+@cached_response
 def expenses_group_summary():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -211,92 +234,55 @@ def expenses_group_summary():
         # Get filter parameters
         group = request.args.get('group', 'all')
         month = request.args.get('month', 'all')
-        
-        # Get last 12 months
-        end_date = datetime.now()
-        start_date = end_date - relativedelta(months=11)
-        
-        base_conditions = """
-            WHERE t.amount > 0
-            AND t.date BETWEEN %s AND %s
-            AND LOWER(COALESCE(t.group_name, '')) NOT LIKE '%%transfer%%'
-        """
-        
-        params = [start_date, end_date]
-        
-        if group != 'all':
-            base_conditions += " AND t.group_name = %s"
-            params.append(group)
-            
-        if month != 'all':
-            base_conditions += " AND TO_CHAR(t.date, 'YYYY-MM') = %s"
-            params.append(month)
-        
-        query = f"""
-        WITH filtered_transactions AS (
-            SELECT 
-                t.transaction_id,
-                t.name,
-                t.group_name,
-                t.amount,
-                t.date
-            FROM stg_transactions t
-            {base_conditions}
-        ),
-        group_totals AS (
-            SELECT 
-                group_name,
-                SUM(amount) as group_total
-            FROM filtered_transactions
-            GROUP BY group_name
-        ),
-        total_amount AS (
-            SELECT SUM(amount) as grand_total 
-            FROM filtered_transactions
+        limit, after = page_params(request.args)
+        
+        # Last 12 calendar months, aligned to month boundaries so the totals
+        # from monthly_rollups cover exactly the listed transactions
+        window = trailing_months(12)
+        
+        rollup_filters = (
+            AnalyticsFilter('r', date_column='month', flow_column='flow')
+            .direction('expense')
+            .date_range(*window)
+            .exclude_transfers('is_group_transfer')
+            .equals('group_name', group)
+            .month(month)
+        )
+        filters = (
+            AnalyticsFilter()
+            .direction('expense')
+            .date_range(*window)
+            .exclude_transfers('is_group_transfer')
+            .equals('group_name', group)
+            .month(month)
         )
-        SELECT 
-            ft.transaction_id,
-            ft.name,
-            ft.group_name,
-            ft.amount,
-            ft.date,
-            (ft.amount / NULLIF(gt.group_total, 0) * 100) as group_percentage
-        FROM filtered_transactions ft
-        LEFT JOIN group_totals gt ON ft.group_name = gt.group_name
-        CROSS JOIN total_amount
-        ORDER BY ft.date DESC, ft.amount DESC
-        """
-        
-        cur.execute(query, tuple(params))
-        results = cur.fetchall()
-        
-        # Calculate summary statistics
-        total_expenses = sum(abs(float(row[3])) for row in results)
-        monthly_average = total_expenses / 12 if results else 0
-        
-        # Find highest group
-        group_totals = {}
-        for row in results:
-            group = row[2] or 'Uncategorized'
-            amount = abs(float(row[3]))
-            group_totals[group] = group_totals.get(group, 0) + amount
-        
-        highest_group = max(group_totals.items(), key=lambda x: x[1])[0] if group_totals else ''
-        
-        return jsonify({
-            'total_expenses': total_expenses,
-            'monthly_average': monthly_average,
-            'highest_group': highest_group,
-            'transactions': [{
-                'transaction_id': row[0],
-                'name': row[1],
-                'group_name': row[2] or 'Uncategorized',
-                'amount': abs(float(row[3])),
-                'date': row[4].isoformat(),
-                'percentage': float(row[5] or 0)
-            } for row in results]
-        })
         
+        stats = _summary_stats(
+            cur, 'monthly_rollups r', rollup_filters, 'r.group_name', 'r.total', 'r.month', 'SUM(r.txn_count)'
+        )
+        response = {
+            'total_expenses': stats['total'],
+            'monthly_average': _monthly_average(stats),
+            'highest_group': stats['highest'],
+            'total_count': stats['count']
+        }
+        if _summary_only():
+            return jsonify(response)
+        
+        results, next_cursor = _transactions_page(cur, filters, 'group_name', 't.amount', limit, after)
+        response['next_cursor'] = next_cursor
+        response['transactions'] = [{
+            'transaction_id': row[0],
+            'name': row[1],
+            'group_name': row[2] or 'Uncategorized',
+            'amount': abs(float(row[3])),
+            'date': row[4].isoformat(),
+            'percentage': _value_percentage(row, stats['totals'])
+        } for row in results]
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in expenses_group_summary: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -304,56 +290,51 @@ def expenses_group_summary():
         cur.close()
         conn.close()
 
+def _month_span():
+    """Whole months from start_date's month through end_date's month, as a half-open range.
+    Raises ValueError when either date is missing or unparseable."""
+    start, end = request.args.get('start_date'), request.args.get('end_date')
+    if not start or not end:
+        raise ValueError("start_date and end_date are required")
+    return parse_date_param(start).replace(day=1), month_range(parse_date_param(end))[1]
+
 @analytics_bp.route('/api/expenses/group_monthly')
+@conditional_response
+@cached_response
 def expenses_group_monthly():
     group = request.args.get('group', 'all')
-    start_date = datetime.fromisoformat(request.args.get('start_date').replace('Z', '+00:00'))
-    end_date = datetime.fromisoformat(request.args.get('end_date').replace('Z', '+00:00'))
+    try:
+        start_date, end_date = _month_span()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
+        filters = AnalyticsFilter('r', date_column='month', flow_column='flow').direction('expense')
         if group != 'all':
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(t.amount), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount > 0
-                AND group_name = %s
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date, group))
+            filters.equals('group_name', group)
         else:
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(t.amount), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount > 0
-                AND LOWER(COALESCE(group_name, '')) NOT LIKE '%%transfer%%'
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date))
+            filters.exclude_transfers('is_group_transfer')
+        
+        query = f"""
+        SELECT 
+            d.month,
+            COALESCE(SUM(r.total), 0) as total_amount
+        FROM generate_series(
+            %s::timestamp,
+            %s::timestamp - INTERVAL '1 month',
+            '1 month'
+        ) AS d(month)
+        LEFT JOIN monthly_rollups r ON 
+            r.month = d.month::date
+            {filters.and_()}
+        GROUP BY d.month
+        ORDER BY d.month
+        """
+        
+        cur.execute(query, (start_date, end_date) + filters.params)
         results = cur.fetchall()
         
         months = []
@@ -376,6 +357,8 @@ def expenses_group_monthly():
         conn.close()
 
 @analytics_bp.route('/api/income/summary')
+@conditional_response
+@cached_response
 def income_summary():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -384,86 +367,43 @@ def income_summary():
         # Get filter parameters
         category = request.args.get('category', 'all')
         month = request.args.get('month', 'all')
-        
-        # Get last 12 months
-        end_date = datetime.now()
-        start_date = end_date - relativedelta(months=11)
-        
-        base_conditions = """
-            WHERE t.amount < 0
-            AND t.date BETWEEN %s AND %s
-            AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
-        """
-        
-        params = [start_date, end_date]
-        
-        if category != 'all':
-            base_conditions += " AND t.category = %s"
-            params.append(category)
-            
-        if month != 'all':
-            base_conditions += " AND TO_CHAR(t.date, 'YYYY-MM') = %s"
-            params.append(month)
-        
-        query = f"""
-        WITH filtered_transactions AS (
-            SELECT 
-                t.transaction_id,
-                t.name,
-                t.category,
-                ABS(t.amount) as amount,
-                t.date
-            FROM stg_transactions t
-            {base_conditions}
-        ),
-        category_totals AS (
-            SELECT 
-                category,
-                SUM(amount) as category_total
-            FROM filtered_transactions
-            GROUP BY category
+        limit, after = page_params(request.args)
+        
+        # Last 12 calendar months
+        filters = (
+            AnalyticsFilter()
+            .direction('income')
+            .date_range(*trailing_months(12))
+            .exclude_transfers()
+            .equals('category', category)
+            .month(month)
         )
-        SELECT 
-            ft.transaction_id,
-            ft.name,
-            ft.category,
-            ft.amount,
-            ft.date,
-            (ft.amount / NULLIF(ct.category_total, 0) * 100) as category_percentage
-        FROM filtered_transactions ft
-        LEFT JOIN category_totals ct ON ft.category = ct.category
-        ORDER BY ft.date DESC, ft.amount DESC
-        """
-        cur.execute(query, tuple(params))
-        results = cur.fetchall()
-        
-        # Calculate summary statistics
-        total_income = sum(float(row[3]) for row in results)
-        monthly_average = total_income / 12 if results else 0
-        
-        # Find highest income category
-        category_totals = {}
-        for row in results:
-            category = row[2] or 'Uncategorized'
-            amount = float(row[3])
-            category_totals[category] = category_totals.get(category, 0) + amount
-        
-        highest_category = max(category_totals.items(), key=lambda x: x[1])[0] if category_totals else ''
-        
-        return jsonify({
-            'total_income': total_income,
-            'monthly_average': monthly_average,
-            'highest_category': highest_category,
-            'transactions': [{
-                'transaction_id': row[0],
-                'name': row[1],
-                'category': row[2] or 'Uncategorized',
-                'amount': float(row[3]),
-                'date': row[4].isoformat(),
-                'percentage': float(row[5] or 0)
-            } for row in results]
-        })
         
+        # Totals cover the whole window, whichever page is listed
+        stats = _summary_stats(cur, 'stg_transactions t', filters, 't.category', 'ABS(t.amount)', 't.month_start')
+        response = {
+            'total_income': stats['total'],
+            'monthly_average': _monthly_average(stats),
+            'highest_category': stats['highest'],
+            'total_count': stats['count']
+        }
+        if _summary_only():
+            return jsonify(response)
+        
+        results, next_cursor = _transactions_page(cur, filters, 'category', 'ABS(t.amount)', limit, after)
+        response['next_cursor'] = next_cursor
+        response['transactions'] = [{
+            'transaction_id': row[0],
+            'name': row[1],
+            'category': row[2] or 'Uncategorized',
+            'amount': float(row[3]),
+            'date': row[4].isoformat(),
+            'percentage': _value_percentage(row, stats['totals'])
+        } for row in results]
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in income_summary: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -472,55 +412,43 @@ def income_summary():
         conn.close()
 
 @analytics_bp.route('/api/income/monthly')
+@conditional_response
+@cached_response
 def income_monthly():
     category = request.args.get('category', 'all')
-    start_date = datetime.fromisoformat(request.args.get('start_date').replace('Z', '+00:00'))
-    end_date = datetime.fromisoformat(request.args.get('end_date').replace('Z', '+00:00'))
+    try:
+        start_date, end_date = _month_span()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
+        filters = AnalyticsFilter('r', date_column='month', flow_column='flow').direction('income')
         if category != 'all':
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(ABS(t.amount)), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount < 0
-                AND category = %s
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date, category))
+            filters.equals('category', category)
         else:
-            query = """
-            SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(ABS(t.amount)), 0) as total_amount
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND t.amount < 0
-                AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
-            """
-            cur.execute(query, (start_date, end_date))
+            filters.exclude_transfers()
+        
+        # Income rows are stored with negative amounts
+        query = f"""
+        SELECT 
+            d.month,
+            COALESCE(-SUM(r.total), 0) as total_amount
+        FROM generate_series(
+            %s::timestamp,
+            %s::timestamp - INTERVAL '1 month',
+            '1 month'
+        ) AS d(month)
+        LEFT JOIN monthly_rollups r ON 
+            r.month = d.month::date
+            {filters.and_()}
+        GROUP BY d.month
+        ORDER BY d.month
+        """
+        
+        cur.execute(query, (start_date, end_date) + filters.params)
         results = cur.fetchall()
         
         months = []
@@ -543,32 +471,36 @@ def income_monthly():
         conn.close()
 
 @analytics_bp.route('/api/net_income/monthly')
+@conditional_response
+@cached_response
 def net_income_monthly():
-    start_date = datetime.fromisoformat(request.args.get('start_date').replace('Z', '+00:00'))
-    end_date = datetime.fromisoformat(request.args.get('end_date').replace('Z', '+00:00'))
+    try:
+        start_date, end_date = _month_span()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
-        query = """
+        filters = AnalyticsFilter('r', date_column='month', flow_column='flow').direction('both').exclude_transfers()
+        
+        query = f"""
         WITH monthly_data AS (
             SELECT 
-                DATE_TRUNC('month', d.date) as month,
-                COALESCE(SUM(CASE WHEN t.amount < 0 THEN ABS(t.amount) ELSE 0 END), 0) as income,
-                COALESCE(SUM(CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END), 0) as expenses
-            FROM (
-                SELECT generate_series(
-                    DATE_TRUNC('month', %s::timestamp),
-                    DATE_TRUNC('month', %s::timestamp),
-                    '1 month'
-                ) as date
-            ) d
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = d.date
-                AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
-            GROUP BY DATE_TRUNC('month', d.date)
-            ORDER BY DATE_TRUNC('month', d.date)
+                d.month,
+                COALESCE(-SUM(r.total) FILTER (WHERE r.flow = 'income'), 0) as income,
+                COALESCE(SUM(r.total) FILTER (WHERE r.flow = 'expense'), 0) as expenses
+            FROM generate_series(
+                %s::timestamp,
+                %s::timestamp - INTERVAL '1 month',
+                '1 month'
+            ) AS d(month)
+            LEFT JOIN monthly_rollups r ON 
+                r.month = d.month::date
+                {filters.and_()}
+            GROUP BY d.month
+            ORDER BY d.month
         )
         SELECT 
             to_char(month, 'Month YYYY') as month,
@@ -578,7 +510,7 @@ def net_income_monthly():
         FROM monthly_data
         """
         
-        cur.execute(query, (start_date, end_date))
+        cur.execute(query, (start_date, end_date) + filters.params)
         results = cur.fetchall()
         
         months = []
@@ -605,447 +537,370 @@ def net_income_monthly():
         cur.close()
         conn.close()
 
-@analytics_bp.route('/api/expenses/daily')
-def expenses_daily():
-    category = request.args.get('category', 'all')
-    month = request.args.get('month')
-    
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        current_timestamp = datetime.now(ZoneInfo("America/Los_Angeles"))
-        pacific_time = current_timestamp
-        
-        current_month = datetime.strptime(month, '%Y-%m').replace(tzinfo=ZoneInfo("America/Los_Angeles"))
-        prior_month = current_month - relativedelta(months=1)
-        six_months_ago = current_month - relativedelta(months=6)
+# Transfer flag excluded from the curves for each dimension they can be filtered by
+CURVE_DIMENSIONS = {
+    'category': 'is_transfer',
+    'group_name': 'is_group_transfer',
+}
 
-        # Get the last day for both months
-        _, current_last_day = calendar.monthrange(current_month.year, current_month.month)
-        _, prior_last_day = calendar.monthrange(prior_month.year, prior_month.month)
-        
-        # Set exact date ranges
-        current_start = current_month.replace(day=1)
-        current_end = current_month.replace(day=current_last_day)
-        prior_start = prior_month.replace(day=1)
-        prior_end = prior_month.replace(day=prior_last_day)
-        
-        # Add query for 4-month average
-        avg_query = """
-        WITH RECURSIVE dates AS (
-            SELECT generate_series(
-                DATE_TRUNC('month', %s::timestamptz),
-                (DATE_TRUNC('month', %s::timestamptz) + INTERVAL '1 month - 1 day'),
-                '1 day'::interval
-            )::date AS date
-        ),
-        prior_months_totals AS (
-            SELECT 
-                EXTRACT(DAY FROM date) as day_of_month,
-                SUM(amount) as daily_total
-            FROM stg_transactions
-            WHERE date >= %s::timestamptz 
-            AND date < %s::timestamptz
-            AND amount > 0
-            AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-            {category_filter}
-            GROUP BY EXTRACT(DAY FROM date)
-        ),
-        daily_avgs AS (
-            SELECT 
-                day_of_month,
-                COALESCE(daily_total / 4.0, 0) as avg_daily_amount
-            FROM prior_months_totals
-        )
-        SELECT 
-            d.date,
-            COALESCE(SUM(da.avg_daily_amount) OVER (ORDER BY d.date), 0) as cumulative_avg
-        FROM dates d
-        LEFT JOIN daily_avgs da ON EXTRACT(DAY FROM d.date) = da.day_of_month
-        ORDER BY d.date;
-        """
+def cumulative_curves_sql(source, day_column, amount_column, conditions=""):
+    """Current month, prior month and trailing N-month average cumulative curves in one pass.
 
-        category_filter = "AND category = %s" if category != 'all' else ""
-        avg_query = avg_query.format(category_filter=category_filter)
-        
-        # Update the date ranges for the 4-month average calculation
-        four_month_end = current_start  # End at the start of current month
-        four_month_start = four_month_end - relativedelta(months=4)  # Go back 4 months
+    Reads source (aliased s) once over [avg_start, curve_end). Each day is bucketed by day of
+    month, so the prior month and the average window line up with the selected month's days.
+    Takes the parameters from curve_params(). Returns rows of (date, current_total, prior_total, avg_total).
+    """
+    return f"""
+    SELECT
+        d.day::date as date,
+        COALESCE(SUM(x.current_amount) OVER w, 0) as current_total,
+        COALESCE(SUM(x.prior_amount) OVER w, 0) as prior_total,
+        COALESCE(SUM(x.avg_amount) OVER w, 0) as avg_total
+    FROM generate_series(
+        %(curve_start)s::timestamp,
+        %(curve_end)s::timestamp - INTERVAL '1 day',
+        '1 day'::interval
+    ) AS d(day)
+    LEFT JOIN (
+        SELECT
+            EXTRACT(DAY FROM s.{day_column}) as day_of_month,
+            SUM(s.{amount_column}) FILTER (WHERE s.{day_column} >= %(curve_start)s) as current_amount,
+            SUM(s.{amount_column}) FILTER (
+                WHERE s.{day_column} >= %(prior_start)s AND s.{day_column} < %(curve_start)s
+            ) as prior_amount,
+            SUM(s.{amount_column}) FILTER (WHERE s.{day_column} < %(curve_start)s) / %(avg_months)s as avg_amount
+        FROM {source} s
+        WHERE s.{day_column} >= %(avg_start)s
+        AND s.{day_column} < %(curve_end)s
+        {conditions}
+        GROUP BY 1
+    ) x ON x.day_of_month = EXTRACT(DAY FROM d.day)
+    WINDOW w AS (ORDER BY d.day)
+    """
 
-        # Update the parameters for the query
-        params = [current_start, current_end, four_month_start, four_month_end]
-        if category != 'all':
-            params.append(category)
-        cur.execute(avg_query, tuple(params))
-        avg_results = cur.fetchall()
+def curve_params(month_start, avg_months):
+    """Half-open ranges for cumulative_curves_sql(); the prior month is always inside the average window"""
+    return {
+        'curve_start': month_start,
+        'curve_end': month_start + relativedelta(months=1),
+        'prior_start': month_start - relativedelta(months=1),
+        'avg_start': month_start - relativedelta(months=max(avg_months, 1)),
+        'avg_months': avg_months,
+    }
 
-        # Get existing current and prior month data
-        base_query = """
-        WITH RECURSIVE dates AS (
-            SELECT generate_series(
-                DATE_TRUNC('month', %s::timestamptz),
-                (DATE_TRUNC('month', %s::timestamptz) + INTERVAL '1 month - 1 day'),
-                '1 day'::interval
-            )::date AS date
-        ),
-        daily_totals AS (
-            SELECT 
-                EXTRACT(DAY FROM (date AT TIME ZONE 'UTC' AT TIME ZONE 'America/Los_Angeles')::date) as day_of_month,
-                COALESCE(SUM(amount), 0) as daily_amount
-            FROM stg_transactions 
-            WHERE date >= %s::timestamptz 
-            AND date < %s::timestamptz + INTERVAL '1 day'
-            AND amount > 0
-            AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-            {category_filter}
-            GROUP BY EXTRACT(DAY FROM (date AT TIME ZONE 'UTC' AT TIME ZONE 'America/Los_Angeles')::date)
-        )
-        SELECT 
-            d.date,
-            COALESCE(SUM(dt.daily_amount) OVER (ORDER BY d.date), 0) as cumulative_amount
-        FROM dates d
-        LEFT JOIN daily_totals dt ON EXTRACT(DAY FROM d.date) = dt.day_of_month
-        ORDER BY d.date;
-        """
-        
-        category_filter = "AND category = %s" if category != 'all' else ""
-        query = base_query.format(category_filter=category_filter)
-        
-        # Get current month data
-        params = [current_start, current_end, current_start, current_end]
-        if category != 'all':
-            params.append(category)
-        cur.execute(query, tuple(params))
-        current_results = cur.fetchall()
-        
-        # Get prior month data
-        params = [current_start, current_end, prior_start, prior_end]
-        if category != 'all':
-            params.append(category)
-        cur.execute(query, tuple(params))
-        prior_results = cur.fetchall()
+def cumulative_curves(cur, month_start, avg_months, filters):
+    """Cumulative daily expense curves from daily_rollups.
 
-        # Pad prior month results if needed
-        prior_amounts = [float(row[1]) for row in prior_results]
-        if len(prior_amounts) < len(current_results):
-            last_value = prior_amounts[-1] if prior_amounts else 0
-            prior_amounts.extend([last_value] * (len(current_results) - len(prior_amounts)))
+    filters maps dimension columns ('category', 'group_name') to a value or 'all'. Transfers
+    are excluded for every dimension given, so {'category': ..., 'group_name': ...} filters both.
+    """
+    conditions = AnalyticsFilter('s', date_column='day', flow_column='flow', named=True).direction('expense')
+    for column, value in filters.items():
+        if column not in CURVE_DIMENSIONS:
+            raise ValueError(f"Unsupported dimension: {column}")
+        conditions.exclude_transfers(CURVE_DIMENSIONS[column]).equals(column, value)
 
-        current_pacific_date = pacific_time.strftime('%Y-%m-%d')
-        current_dates = [row[0].strftime('%Y-%m-%d') for row in current_results]
-        
-        return jsonify({
-            'dates': current_dates,
-            'amounts': [float(row[1]) for row in current_results],
-            'prior_amounts': prior_amounts,
-            'avg_amounts': [float(row[1]) for row in avg_results],
-            'current_date': current_pacific_date
-        })
-        
+    params = curve_params(month_start, avg_months)
+    params.update(conditions.params)
+    cur.execute(cumulative_curves_sql('daily_rollups', 'day', 'total', conditions.and_()), params)
+    rows = cur.fetchall()
+    return {
+        'dates': [row[0].strftime('%Y-%m-%d') for row in rows],
+        'amounts': [float(row[1]) for row in rows],
+        'prior_amounts': [float(row[2]) for row in rows],
+        'avg_amounts': [float(row[3]) for row in rows],
+        'avg_months': avg_months
+    }
+
+def _daily_curves_response(filters):
+    """Shared body of the daily curve routes: month and avg_months come from the query string"""
+    month = request.args.get('month')
+    avg_months = request.args.get('avg_months', Config.DAILY_AVG_MONTHS, type=int)
+    
+    if not avg_months or avg_months < 1:
+        return jsonify({'error': 'avg_months must be a positive integer'}), 400
+    try:
+        month_start = parse_month(month)
+    except ValueError:
+        month_start = None
+    if month_start is None:
+        return jsonify({'error': 'month must be YYYY-MM'}), 400
+    
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
+    try:
+        response = cumulative_curves(cur, month_start, avg_months, filters)
+        response['current_date'] = datetime.now(ZoneInfo("America/Los_Angeles")).strftime('%Y-%m-%d')
+        return jsonify(response)
     except Exception as e:
-        current_app.logger.error(f"Error in expenses_daily: {str(e)}")
+        current_app.logger.error(f"Error in daily curves: {str(e)}")
         return jsonify({'error': str(e)}), 500
     finally:
         cur.close()
         conn.close()
 
+@analytics_bp.route('/api/expenses/daily')
+@conditional_response
+@cached_response
+def expenses_daily():
+    filters = {'category': request.args.get('category', 'all')}
+    if request.args.get('group', 'all') != 'all':
+        filters['group_name'] = request.args['group']
+    return _daily_curves_response(filters)
+
 @analytics_bp.route('/api/expenses/group_daily')
+@conditional_response
+@cached_response
 def expenses_group_daily():
-    group = request.args.get('group', 'all')
-    month = request.args.get('month')
+    filters = {'group_name': request.args.get('group', 'all')}
+    if request.args.get('category', 'all') != 'all':
+        filters['category'] = request.args['category']
+    return _daily_curves_response(filters)
+
+@analytics_bp.route('/cashflow')
+def cashflow():
+    return render_template('cashflow.html')
+
+# Classified cash flow rows (stg_transactions.flow_type, see 0011_cashflow_rules.sql), newest
+# first: (date, description, category, amount, transaction_id), inflows positive
+CASHFLOW_TRANSACTIONS_SQL = """
+SELECT 
+    t.date,
+    t.name as description,
+    COALESCE(t.category, 'Uncategorized') as category,
+    CASE WHEN t.flow_type = 'inflow' THEN ABS(t.amount) ELSE -t.amount END as amount,
+    t.transaction_id
+FROM stg_transactions t
+WHERE t.flow_type IS NOT NULL
+{conditions}
+ORDER BY t.date DESC, t.transaction_id DESC
+{limit}
+"""
+
+# Months, outflow summary and one page of detail from a single read of the window
+CASHFLOW_SQL = """
+WITH flows AS MATERIALIZED (
+    SELECT 
+        t.transaction_id,
+        t.date,
+        t.month_start,
+        t.name,
+        t.category,
+        t.flow_type,
+        ABS(t.amount) as amount
+    FROM stg_transactions t
+    WHERE t.flow_type IS NOT NULL
+    AND t.date >= %(start)s
+    AND t.date < %(end)s
+),
+monthly AS (
+    SELECT 
+        month_start,
+        COALESCE(SUM(amount) FILTER (WHERE flow_type = 'inflow'), 0) as inflow,
+        COALESCE(SUM(amount) FILTER (WHERE flow_type = 'outflow'), 0) as outflow
+    FROM flows
+    GROUP BY month_start
+)
+SELECT 
+    (
+        SELECT json_agg(json_build_object(
+            'month', to_char(m.month, 'Mon YYYY'),
+            'inflow', ROUND(COALESCE(f.inflow, 0), 2),
+            'outflow', ROUND(COALESCE(f.outflow, 0), 2),
+            'net_flow', ROUND(COALESCE(f.inflow, 0) - COALESCE(f.outflow, 0), 2)
+        ) ORDER BY m.month)
+        FROM generate_series(
+            date_trunc('month', %(start)s::timestamp),
+            %(end)s::timestamp - INTERVAL '1 day',
+            '1 month'
+        ) m(month)
+        LEFT JOIN monthly f ON f.month_start = m.month::date
+    ) as months,
+    (
+        SELECT json_agg(s ORDER BY s.total DESC)
+        FROM (
+            SELECT 
+                name as description,
+                SUM(amount) as total,
+                COUNT(*) as count,
+                ROUND(AVG(amount), 2) as average
+            FROM flows
+            WHERE flow_type = 'outflow'
+            GROUP BY name
+        ) s
+    ) as outflow_summary,
+    (
+        SELECT json_agg(d ORDER BY d.date DESC, d.transaction_id DESC)
+        FROM (
+            SELECT 
+                date,
+                name as description,
+                COALESCE(category, 'Uncategorized') as category,
+                CASE WHEN flow_type = 'inflow' THEN amount ELSE -amount END as amount,
+                transaction_id
+            FROM flows
+            {after}
+            ORDER BY date DESC, transaction_id DESC
+            {limit}
+        ) d
+    ) as transactions
+"""
+
+def _cashflow_window(cur):
+    """Half-open [start, end) date window for /api/cashflow.
+
+    start_date/end_date (inclusive) override it. Otherwise it ends with the latest classified
+    transaction and starts at CASHFLOW_START_DATE if set, else CASHFLOW_MONTHS calendar months
+    back. Raises ValueError for unparseable dates.
+    """
+    if request.args.get('end_date'):
+        end = parse_date_param(request.args.get('end_date')) + timedelta(days=1)
+    else:
+        cur.execute("SELECT MAX(date) FROM stg_transactions WHERE flow_type IS NOT NULL")
+        latest = cur.fetchone()[0]
+        end = (latest or datetime.now().date()) + timedelta(days=1)
+    
+    if request.args.get('start_date'):
+        start = parse_date_param(request.args.get('start_date'))
+    elif Config.CASHFLOW_START_DATE:
+        start = parse_date_param(Config.CASHFLOW_START_DATE)
+    else:
+        start = trailing_months(Config.CASHFLOW_MONTHS, today=end - timedelta(days=1))[0]
+    return start, end
+
+@analytics_bp.route('/api/cashflow')
+@conditional_response
+@cached_response
+def cashflow_summary():
+    conn = get_db_connection()
+    cur = conn.cursor()
     
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        current_timestamp = datetime.now(ZoneInfo("America/Los_Angeles"))
-        pacific_time = current_timestamp
+        limit, after = page_params(request.args)
+        start_date, end_date = _cashflow_window(cur)
+        current_app.logger.info(f"Using dates - Start: {start_date}, End: {end_date}")
         
-        current_month = datetime.strptime(month, '%Y-%m').replace(tzinfo=ZoneInfo("America/Los_Angeles"))
-        prior_month = current_month - relativedelta(months=1)
-
-        # Get the last day for both months
-        _, current_last_day = calendar.monthrange(current_month.year, current_month.month)
-        _, prior_last_day = calendar.monthrange(prior_month.year, prior_month.month)
-        
-        # Set exact date ranges
-        current_start = current_month.replace(day=1)
-        current_end = current_month.replace(day=current_last_day)
-        prior_start = prior_month.replace(day=1)
-        prior_end = prior_month.replace(day=prior_last_day)
-        
-        base_query = """
-        WITH RECURSIVE dates AS (
-            SELECT generate_series(
-                DATE_TRUNC('month', %s::timestamptz),
-                (DATE_TRUNC('month', %s::timestamptz) + INTERVAL '1 month - 1 day'),
-                '1 day'::interval
-            )::date AS date
-        ),
-        daily_totals AS (
-            SELECT 
-                EXTRACT(DAY FROM (date AT TIME ZONE 'UTC' AT TIME ZONE 'America/Los_Angeles')::date) as day_of_month,
-                COALESCE(SUM(amount), 0) as daily_amount
-            FROM stg_transactions 
-            WHERE date >= %s::timestamptz 
-            AND date < %s::timestamptz + INTERVAL '1 day'
-            AND amount > 0
-            AND LOWER(COALESCE(group_name, '')) NOT LIKE '%%transfer%%'
-            {group_filter}
-            GROUP BY EXTRACT(DAY FROM (date AT TIME ZONE 'UTC' AT TIME ZONE 'America/Los_Angeles')::date)
-        )
-        SELECT 
-            d.date,
-            COALESCE(SUM(dt.daily_amount) OVER (ORDER BY d.date), 0) as cumulative_amount
-        FROM dates d
-        LEFT JOIN daily_totals dt ON EXTRACT(DAY FROM d.date) = dt.day_of_month
-        ORDER BY d.date;
-        """
+        if wants_ndjson():
+            # Only the transaction list, streamed from the cursor onwards
+            listed = keyset(AnalyticsFilter().date_range(start_date, end_date), after)
+            return ndjson_response(
+                CASHFLOW_TRANSACTIONS_SQL.format(conditions=listed.and_(), limit=''),
+                listed.params,
+                row_object=lambda columns, row: {
+                    'date': row[0],
+                    'description': row[1],
+                    'category': row[2],
+                    'amount': row[3]
+                }
+            )
         
-        group_filter = "AND group_name = %s" if group != 'all' else ""
-        query = base_query.format(group_filter=group_filter)
+        params = {'start': start_date, 'end': end_date}
+        after_sql = ""
+        if after is not None:
+            after_sql = "WHERE (date, transaction_id) < (%(after_date)s, %(after_id)s)"
+            params.update(after_date=after[0], after_id=after[1])
         
-        # Get current month data using current month's date range
-        params = [current_start, current_end, current_start, current_end]
-        if group != 'all':
-            params.append(group)
-        cur.execute(query, tuple(params))
-        current_results = cur.fetchall()
+        cur.execute(CASHFLOW_SQL.format(after=after_sql, limit=limit_sql(limit)), params)
+        months, outflow_summary, transactions = cur.fetchone()
+        months = months or []
         
-        # Get prior month data using prior month's date range
-        params = [current_start, current_end, prior_start, prior_end]  # Use current dates for x-axis but prior dates for data
-        if group != 'all':
-            params.append(group)
-        cur.execute(query, tuple(params))
-        prior_results = cur.fetchall()
-
-        # Pad prior month results if needed (in case prior month was shorter)
-        prior_amounts = [float(row[1]) for row in prior_results]
-        if len(prior_amounts) < len(current_results):
-            last_value = prior_amounts[-1] if prior_amounts else 0
-            prior_amounts.extend([last_value] * (len(current_results) - len(prior_amounts)))
-
-        current_pacific_date = pacific_time.strftime('%Y-%m-%d')
-        current_dates = [row[0].strftime('%Y-%m-%d') for row in current_results]
+        transactions, next_cursor = page(
+            transactions or [], limit,
+            lambda row: (datetime.strptime(row['date'], '%Y-%m-%d').date(), row['transaction_id'])
+        )
+        cash_in = [float(row['inflow']) for row in months]
+        cash_out = [float(row['outflow']) for row in months]
+        total_cash_in = sum(cash_in)
+        total_cash_out = sum(cash_out)
         
         return jsonify({
-            'dates': current_dates,
-            'amounts': [float(row[1]) for row in current_results],
-            'prior_amounts': prior_amounts,
-            'current_date': current_pacific_date
+            'start_date': start_date.isoformat(),
+            'end_date': (end_date - timedelta(days=1)).isoformat(),
+            'total_cash_in': total_cash_in,
+            'total_cash_out': total_cash_out,
+            'net_cash_flow': total_cash_in - total_cash_out,
+            'months': [row['month'] for row in months],
+            'cash_in': cash_in,
+            'cash_out': cash_out,
+            'net_flow': [float(row['net_flow']) for row in months],
+            'transactions': [{
+                'date': row['date'],
+                'description': row['description'],
+                'category': row['category'],
+                'amount': float(row['amount'])
+            } for row in transactions],
+            'next_cursor': next_cursor,
+            'outflow_summary': [{
+                'description': row['description'],
+                'total': float(row['total']),
+                'count': row['count'],
+                'average': float(row['average'])
+            } for row in outflow_summary or []]
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        current_app.logger.error(f"Error in expenses_group_daily: {str(e)}")
+        current_app.logger.error(f"Error in cashflow_summary: {str(e)}")
         return jsonify({'error': str(e)}), 500
     finally:
         cur.close()
         conn.close()
 
-@analytics_bp.route('/cashflow')
-def cashflow():
-    return render_template('cashflow.html')
+@analytics_bp.route('/api/cashflow/rules', methods=['GET', 'PUT'])
+@conditional_response
+def cashflow_rules():
+    """Cash-flow classification rules. PUT {"rules": [{"pattern", "exclude"}]} replaces them all.
 
-@analytics_bp.route('/api/cashflow')
-def cashflow_summary():
+    A positive transaction is an outflow when its name contains a pattern of a rule with
+    exclude false and none of the exclude patterns; changing the rules reclassifies every
+    stored transaction, once per PUT and only when the rule set actually changed.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
     try:
-        start_date = datetime(2024, 7, 1)
-        
-        # Get the latest transaction date
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        latest_date_query = """
-        SELECT MAX(date) FROM stg_transactions;
-        """
-        cur.execute(latest_date_query)
-        end_date = cur.fetchone()[0]
-        
-        current_app.logger.info(f"Using dates - Start: {start_date}, End: {end_date}")
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        query = """
-        WITH RECURSIVE date_series AS (
-            SELECT generate_series(
-                %s::timestamp,
-                %s::timestamp,
-                '1 month'
-            )::date as month
-        ),
-        monthly_flows AS (
-            SELECT 
-                DATE_TRUNC('month', ds.month) as month,
-                COALESCE(SUM(CASE 
-                    WHEN t.amount < 0 
-                    AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
-                    THEN ABS(t.amount) 
-                    ELSE 0 
-                END), 0) as inflow,
-                COALESCE(SUM(CASE 
-                    WHEN t.amount > 0 
-                    AND (t.name ILIKE '%%External Withdrawal%%' or t.name ilike '%%Zelle To ZIQI%%' or t.name ILIKE '%%Check%%')
-                    AND t.name not ilike '%%MONEYLINE%%'
-                    AND t.name not ilike '%%WF%%'
-                    THEN t.amount 
-                    ELSE 0 
-                END), 0) as outflow
-            FROM date_series ds
-            LEFT JOIN stg_transactions t ON 
-                DATE_TRUNC('month', t.date) = DATE_TRUNC('month', ds.month)
-            GROUP BY DATE_TRUNC('month', ds.month)
-            ORDER BY DATE_TRUNC('month', ds.month)
-        )
-        SELECT 
-            to_char(month, 'Mon YYYY') as month_label,
-            ROUND(inflow::numeric, 2) as inflow,
-            ROUND(outflow::numeric, 2) as outflow,
-            ROUND((inflow - outflow)::numeric, 2) as net_flow
-        FROM monthly_flows
-        ORDER BY month;
-        """
-        
-        try:
-            cur.execute(query, (start_date, end_date))
-            results = cur.fetchall()
-            current_app.logger.info(f"Retrieved {len(results)} rows")
+        if request.method == 'PUT':
+            rules = (request.get_json(silent=True) or {}).get('rules')
+            if not isinstance(rules, list) or not all(
+                isinstance(rule, dict)
+                and isinstance(rule.get('pattern'), str)
+                and rule['pattern'].strip()
+                for rule in rules
+            ):
+                return jsonify({'error': 'rules must be a list of {"pattern", "exclude"} objects'}), 400
             
-            # Debug log the first few results
-            for i, row in enumerate(results[:3]):
-                current_app.logger.debug(f"Row {i}: {row}")
-            
-            if not results:
-                return jsonify({
-                    'total_cash_in': 0,
-                    'total_cash_out': 0,
-                    'net_cash_flow': 0,
-                    'months': [],
-                    'cash_in': [],
-                    'cash_out': [],
-                    'net_flow': []
-                })
-            
-            # Process results with explicit indices
-            months = []
-            cash_in = []
-            cash_out = []
-            net_flow = []
-            
-            for row in results:
-                try:
-                    months.append(str(row[0]))  # Month label
-                    cash_in.append(float(row[1]))  # Inflow
-                    cash_out.append(float(row[2]))  # Outflow
-                    net_flow.append(float(row[3]))  # Net flow
-                except Exception as e:
-                    current_app.logger.error(f"Error processing row {row}: {str(e)}")
-                    continue
-            
-            # Calculate totals
-            total_cash_in = sum(cash_in)
-            total_cash_out = sum(cash_out)
-            net_cash_flow = total_cash_in - total_cash_out
-            
-            # Add query for transactions using same logic as monthly summary
-            transactions_query = """
-            WITH cash_flows AS (
-                SELECT 
-                    date,
-                    name as description,
-                    category,
-                    CASE 
-                        WHEN amount < 0 
-                        AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-                        THEN ABS(amount)
-                        ELSE 0 
-                    END as inflow,
-                    CASE 
-                        WHEN amount > 0 
-                        AND (name ILIKE '%%External Withdrawal%%' or name ilike '%%Zelle To ZIQI%%' or name ILIKE '%%Check%%')
-                        AND name not ilike '%%MONEYLINE%%'
-                        AND name not ilike '%%WF%%'
-                        THEN amount
-                        ELSE 0 
-                    END as outflow
-                FROM stg_transactions 
-                WHERE date BETWEEN %s AND %s
-            )
-            SELECT 
-                date,
-                description,
-                category,
-                inflow,
-                outflow
-            FROM cash_flows
-            WHERE inflow > 0 OR outflow > 0
-            ORDER BY date DESC
-            """
-            
-            cur.execute(transactions_query, (start_date, end_date))
-            transactions = [{
-                'date': row[0].strftime('%Y-%m-%d'),
-                'description': row[1],
-                'category': row[2] or 'Uncategorized',
-                'amount': float(row[3] if row[3] > 0 else -row[4])
-            } for row in cur.fetchall()]
-            
-            # Add this query right after the transactions_query (around line 928)
-            summary_query = """
-            WITH cash_flows AS (
-                SELECT 
-                    name as description,
-                    CASE 
-                        WHEN amount > 0 
-                        AND (name ILIKE '%%External Withdrawal%%' or name ilike '%%Zelle To ZIQI%%' or name ILIKE '%%Check%%')
-                        AND name not ilike '%%MONEYLINE%%'
-                        AND name not ilike '%%WF%%'
-                        THEN amount
-                        ELSE 0 
-                    END as outflow
-                FROM stg_transactions 
-                WHERE date BETWEEN %s AND %s
-            )
-            SELECT 
-                description,
-                SUM(outflow) as total_outflow,
-                COUNT(*) as transaction_count,
-                ROUND(AVG(outflow), 2) as avg_outflow
-            FROM cash_flows
-            WHERE outflow > 0
-            GROUP BY description
-            ORDER BY total_outflow DESC;
-            """
-            
-            cur.execute(summary_query, (start_date, end_date))
-            outflow_summary = [{
-                'description': row[0],
-                'total': float(row[1]),
-                'count': row[2],
-                'average': float(row[3])
-            } for row in cur.fetchall()]
-            
-            return jsonify({
-                'total_cash_in': total_cash_in,
-                'total_cash_out': total_cash_out,
-                'net_cash_flow': net_cash_flow,
-                'months': months,
-                'cash_in': cash_in,
-                'cash_out': cash_out,
-                'net_flow': net_flow,
-                'transactions': transactions,
-                'outflow_summary': outflow_summary
-            })
-            
-        except Exception as e:
-            current_app.logger.error(f"Query execution error: {str(e)}")
-            current_app.logger.error(f"Query being executed: {query}")
-            current_app.logger.error(f"Parameters: {(start_date, end_date)}")
-            raise
+            wanted = {(rule['pattern'].strip(), bool(rule.get('exclude'))) for rule in rules}
+            cur.execute("SELECT pattern, exclude FROM cashflow_rules")
+            current = {(row['pattern'], row['exclude']) for row in cur.fetchall()}
+            removed, added = current - wanted, wanted - current
             
+            if removed or added:
+                # Reclassify once below rather than after each statement (migration 0014)
+                cur.execute("SELECT set_config('app.cashflow_reclassify_suspended', 'on', true)")
+                if removed:
+                    execute_values(cur, """
+                        DELETE FROM cashflow_rules r
+                        USING (VALUES %s) v(pattern, exclude)
+                        WHERE r.pattern = v.pattern AND r.exclude = v.exclude
+                    """, list(removed))
+                if added:
+                    execute_values(cur, """
+                        INSERT INTO cashflow_rules (pattern, exclude) VALUES %s
+                        ON CONFLICT (pattern, exclude) DO NOTHING
+                    """, list(added))
+                cur.execute("SELECT set_config('app.cashflow_reclassify_suspended', 'off', true)")
+                cur.execute("SELECT reclassify_stg_flow_types()")
+                conn.commit()
+                bump_data_version()
+        
+        cur.execute("SELECT pattern, exclude FROM cashflow_rules ORDER BY exclude, pattern")
+        return jsonify({'rules': cur.fetchall()})
+        
     except Exception as e:
-        current_app.logger.error(f"Error in cashflow_summary: {str(e)}")
+        conn.rollback()
+        current_app.logger.error(f"Error in cashflow_rules: {str(e)}")
         return jsonify({'error': str(e)}), 500
     finally:
         cur.close()
@@ -1056,6 +911,8 @@ def balances():
     return render_template('balances.html')
 
 @analytics_bp.route('/api/balances')
+@conditional_response
+@cached_response
 def get_balances():
     try:
         conn = get_db_connection()
@@ -1063,19 +920,18 @@ def get_balances():
         
         query = """
         WITH base AS (
-            SELECT DISTINCT ON (a.account_name)
-                a.account_name,
+            SELECT DISTINCT ON (c.account_name)
+                c.account_name,
                 c.balance_current as bal_cur,
                 c.balance_limit as bal_limit,
                 ROUND((c.balance_current / NULLIF(c.balance_limit, 0) * 100)::numeric, 2) as util_rate,
                 c.next_payment_due_date,
                 i.transactions_last_successful_update as last_update,
                 0 as sort_order
-            FROM credit_accounts c
-            JOIN accounts a ON c.account_id = a.account_id
-            JOIN account_history ah ON a.account_id = ah.account_id
-            JOIN items i ON ah.institution_id = i.institution_id
-            ORDER BY a.account_name, ah.created_at DESC
+            FROM current_accounts c
+            JOIN items i ON c.institution_id = i.institution_id
+            WHERE c.type = 'credit'
+            ORDER BY c.account_name, i.updated_at DESC
         ), totals AS (
             SELECT 
                 'Total' as account_name,
@@ -1105,62 +961,184 @@ def get_balances():
         cur.close()
         conn.close()
 
-@analytics_bp.route('/api/daily/expenses')
-def daily_expenses():
+# Account types whose balance is owed rather than held
+LIABILITY_TYPES = ('credit', 'loan')
+
+@analytics_bp.route('/api/balances/history')
+@conditional_response
+@cached_response
+def balance_history():
+    """Per-account balances and total net worth over [start_date, end_date], downsampled.
+
+    Snapshots are bucketed in SQL to a few times the requested number of points, keeping each
+    account's last snapshot per bucket, and each series is then reduced to `points` with LTTB.
+    Net worth carries every account's last known balance forward, starting from its latest
+    snapshot before the range; liabilities count negative.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
     try:
-        selected_month = request.args.get('month')  # Format: "YYYY-MM"
+        points = request.args.get('points', DEFAULT_POINTS, type=int)
+        if not 3 <= points <= MAX_POINTS:
+            raise ValueError(f"points must be between 3 and {MAX_POINTS}")
         
-        # Convert selected_month to start and end dates
-        start_date = datetime.strptime(f"{selected_month}-01", "%Y-%m-%d")
-        end_date = start_date + relativedelta(months=1) - timedelta(days=1)
+        if request.args.get('end_date'):
+            end = parse_date_param(request.args.get('end_date')) + timedelta(days=1)
+        else:
+            end = datetime.now().date() + timedelta(days=1)
+        if request.args.get('start_date'):
+            start = parse_date_param(request.args.get('start_date'))
+        else:
+            months = request.args.get('months', 12, type=int)
+            start = trailing_months(months, today=end - timedelta(days=1))[0]
+        if start >= end:
+            raise ValueError("start_date must not be after end_date")
+        width = bucket_days(start, end, points)
+        
+        cur.execute("""
+        WITH buckets AS (
+            SELECT DISTINCT ON (h.account_id, bucket)
+                h.account_id,
+                %(start)s::date + ((h.pull_date - %(start)s::date) / %(width)s) * %(width)s as bucket,
+                h.balance_current
+            FROM account_history h
+            WHERE h.pull_date >= %(start)s
+            AND h.pull_date < %(end)s
+            AND h.balance_current IS NOT NULL
+            ORDER BY h.account_id, bucket, h.pull_date DESC, h.created_at DESC
+        ),
+        opening AS (
+            SELECT c.account_id, NULL::date as bucket, prior.balance_current
+            FROM current_accounts c
+            CROSS JOIN LATERAL (
+                SELECT h.balance_current
+                FROM account_history h
+                WHERE h.account_id = c.account_id
+                AND h.pull_date < %(start)s
+                AND h.balance_current IS NOT NULL
+                ORDER BY h.pull_date DESC, h.created_at DESC
+                LIMIT 1
+            ) prior
+        )
+        SELECT s.account_id, c.account_name, c.type, s.bucket, s.balance_current
+        FROM (
+            SELECT * FROM opening
+            UNION ALL
+            SELECT * FROM buckets
+        ) s
+        JOIN current_accounts c ON c.account_id = s.account_id
+        ORDER BY s.bucket NULLS FIRST, s.account_id
+        """, {'start': start, 'end': end, 'width': width})
+        
+        accounts = {}
+        balances = {}
+        net_worth = []
+        for account_id, account_name, account_type, bucket, balance in cur.fetchall():
+            sign = -1 if account_type in LIABILITY_TYPES else 1
+            balances[account_id] = sign * float(balance)
+            if bucket is None:
+                continue
+            series = accounts.setdefault(account_id, {
+                'account_id': account_id,
+                'account_name': account_name,
+                'type': account_type,
+                'dates': [],
+                'balances': []
+            })
+            series['dates'].append(bucket)
+            series['balances'].append(float(balance))
+            # Rows arrive in bucket order, so the last entry is this bucket's running total
+            if net_worth and net_worth[-1][0] == bucket:
+                net_worth[-1] = (bucket, sum(balances.values()))
+            else:
+                net_worth.append((bucket, sum(balances.values())))
+        
+        def downsample(dates, values):
+            kept = lttb([d.toordinal() for d in dates], values, points)
+            return [[dates[i].isoformat(), round(values[i], 2)] for i in kept]
         
-        conn = get_db_connection()
-        cur = conn.cursor()
+        return jsonify({
+            'start_date': start.isoformat(),
+            'end_date': (end - timedelta(days=1)).isoformat(),
+            'bucket_days': width,
+            'accounts': [{
+                'account_id': series['account_id'],
+                'account_name': series['account_name'],
+                'type': series['type'],
+                'points': downsample(series['dates'], series['balances'])
+            } for series in sorted(accounts.values(), key=lambda s: s['account_name'] or '')],
+            'net_worth': downsample([row[0] for row in net_worth], [row[1] for row in net_worth])
+        })
         
-        query = """
-        WITH daily_expenses AS (
-            SELECT 
-                date_trunc('day', date) as day,
-                name as description,
-                category,
-                amount
-            FROM stg_transactions
-            WHERE date >= %s 
-            AND date < %s
-            AND amount > 0
-            AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-            ORDER BY date
-        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error in balance_history: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+@analytics_bp.route('/api/daily/expenses')
+@conditional_response
+@cached_response
+def daily_expenses():
+    # One "YYYY-MM" month, the current one by default; day-of-month totals across months
+    # would add up unrelated days
+    try:
+        month_start = parse_month(request.args.get('month') or datetime.now().strftime('%Y-%m'))
+        if month_start is None:
+            raise ValueError("month must be a single YYYY-MM month")
+        limit, after = page_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filters = AnalyticsFilter().month(month_start).direction('expense').exclude_transfers()
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
+    try:
+        # Day totals cover every listed page, so a day split across pages keeps its full total
+        cur.execute(f"""
         SELECT 
-            EXTRACT(DAY FROM day) as day_of_month,
-            json_agg(
-                json_build_object(
-                    'description', description,
-                    'category', COALESCE(category, 'Uncategorized'),
-                    'amount', amount
-                )
-            ) as transactions,
-            SUM(amount) as daily_total
-        FROM daily_expenses
+            EXTRACT(DAY FROM t.date) as day_of_month,
+            SUM(t.amount) as daily_total
+        FROM stg_transactions t
+        {filters.where()}
         GROUP BY day_of_month
-        ORDER BY day_of_month;
-        """
-        
-        cur.execute(query, (start_date, end_date))
-        results = cur.fetchall()
+        """, filters.params)
+        daily_totals = {int(row[0]): float(row[1]) for row in cur.fetchall()}
         
-        # Initialize days dictionary
+        keyset(filters, after)
+        cur.execute(f"""
+        SELECT 
+            t.date,
+            t.name as description,
+            t.category,
+            t.amount,
+            t.transaction_id
+        FROM stg_transactions t
+        {filters.where()}
+        ORDER BY t.date DESC, t.transaction_id DESC
+        {limit_sql(limit)}
+        """, filters.params)
+        results, next_cursor = page(cur.fetchall(), limit, lambda row: (row[0], row[4]))
+        
+        # Group the listed transactions by day of month, in day order
         days = {}
+        for row in reversed(results):
+            day = days.setdefault(row[0].day, {
+                'total': daily_totals[row[0].day],
+                'transactions': []
+            })
+            day['transactions'].append({
+                'description': row[1],
+                'category': row[2] or 'Uncategorized',
+                'amount': float(row[3])
+            })
         
-        # Process results
-        for row in results:
-            day = int(row[0])
-            days[day] = {
-                'total': float(row[2]),
-                'transactions': row[1]
-            }
-        
-        return jsonify({'days': days})
+        return jsonify({'days': days, 'next_cursor': next_cursor})
         
     except Exception as e:
         current_app.logger.error(f"Error in daily_expenses: {str(e)}")
@@ -1183,12 +1161,12 @@ def bank_balances():
         WITH base AS (
             SELECT
                 a.account_name,
-                d.balance_current,
+                a.balance_current,
                 i.transactions_last_successful_update,
                 0 as sort_order
-            FROM depository_accounts d
-            JOIN accounts a ON d.account_id = a.account_id
+            FROM current_accounts a
             JOIN items i ON a.institution_id = i.institution_id
+            WHERE a.type = 'depository'
         )
         SELECT *
         FROM base
@@ -1215,6 +1193,8 @@ def bank_balances():
         conn.close()
 
 @analytics_bp.route('/api/bank-balances')
+@conditional_response
+@cached_response
 def get_bank_balances():
     try:
         conn = get_db_connection()
@@ -1224,11 +1204,11 @@ def get_bank_balances():
         WITH base AS (
             SELECT
                 a.account_name,
-                d.balance_current as current_balance,
-                d.balance_available as available_balance,
-                d.pull_date
-            FROM depository_accounts d
-            JOIN accounts a ON d.account_id = a.account_id
+                a.balance_current as current_balance,
+                a.balance_available as available_balance,
+                a.pull_date
+            FROM current_accounts a
+            WHERE a.type = 'depository'
         )
         SELECT *,
             ROUND(current_balance::numeric, 2) as current_balance,
@@ -1259,6 +1239,8 @@ def get_bank_balances():
         conn.close()
 
 @analytics_bp.route('/api/expenses/category_breakdown')
+@conditional_response
+@cached_response
 def expenses_category_breakdown():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -1266,19 +1248,24 @@ def expenses_category_breakdown():
     try:
         month = request.args.get('month')
         
-        query = """
+        filters = (
+            AnalyticsFilter('r', date_column='month', flow_column='flow')
+            .direction('expense')
+            .month(month)
+            .exclude_transfers()
+        )
+        
+        query = f"""
         SELECT 
-            COALESCE(category, 'Uncategorized') as category,
-            SUM(amount) as total
-        FROM stg_transactions
-        WHERE amount > 0
-        AND TO_CHAR(date, 'YYYY-MM') = %s
-        AND LOWER(COALESCE(category, '')) NOT LIKE '%%transfer%%'
-        GROUP BY category
+            COALESCE(NULLIF(r.category, ''), 'Uncategorized') as category,
+            SUM(r.total) as total
+        FROM monthly_rollups r
+        {filters.where()}
+        GROUP BY 1
         ORDER BY total DESC
         """
         
-        cur.execute(query, (month,))
+        cur.execute(query, filters.params)
         results = cur.fetchall()
         
         return jsonify({
@@ -1292,6 +1279,266 @@ def expenses_category_breakdown():
         cur.close()
         conn.close()
 
+# Sections /api/dashboard can return, per flow
+DASHBOARD_SECTIONS = {
+    'expense': ('summary', 'breakdown', 'monthly', 'daily', 'values'),
+    'income': ('summary', 'breakdown', 'monthly', 'daily', 'values'),
+    'net': ('monthly',),
+}
+
+# Dashboard dimension parameter -> (stg_transactions column, transfer flag for that column)
+DASHBOARD_DIMENSIONS = {
+    'category': ('category', 'is_transfer'),
+    'group': ('group_name', 'is_group_transfer'),
+}
+
+def _dashboard_section_sql(section, flow, dimension_key):
+    """json expression computing one dashboard section from the scoped CTE; the summary
+    section is paged and computed separately by _dashboard_summary()"""
+    value_match = "(%(value)s = 'all' OR s.value = %(value)s)"
+    in_period = "s.date >= %(period_start)s AND s.date < %(period_end)s"
+
+    if section == 'breakdown':
+        return f"""(
+            SELECT COALESCE(json_agg(json_build_object('label', b.label, 'amount', b.total) ORDER BY b.total DESC), '[]')
+            FROM (
+                SELECT COALESCE(NULLIF(s.value, ''), 'Uncategorized') as label, SUM(s.amount) as total
+                FROM scoped s
+                WHERE {in_period}
+                GROUP BY 1
+            ) b
+        )"""
+
+    if section == 'monthly':
+        if flow == 'net':
+            totals = """
+                COALESCE(-SUM(s.amount) FILTER (WHERE s.amount < 0), 0) as income,
+                COALESCE(SUM(s.amount) FILTER (WHERE s.amount > 0), 0) as expenses
+            """
+            fields = "'income', COALESCE(x.income, 0), 'expenses', COALESCE(x.expenses, 0)"
+        else:
+            totals = "SUM(s.amount) as total"
+            fields = "'amount', COALESCE(x.total, 0)"
+        return f"""(
+            SELECT json_agg(json_build_object('month', m.month::date, {fields}) ORDER BY m.month)
+            FROM generate_series(%(window_start)s::timestamp, %(window_last)s::timestamp, '1 month') m(month)
+            LEFT JOIN (
+                SELECT s.month_start, {totals}
+                FROM scoped s
+                WHERE s.date >= %(window_start)s AND s.date < %(window_end)s
+                AND {value_match}
+                GROUP BY s.month_start
+            ) x ON x.month_start = m.month::date
+        )"""
+
+    if section == 'daily':
+        curves = cumulative_curves_sql('scoped', 'date', 'amount', f"AND {value_match}")
+        return f"""(
+            SELECT json_build_object(
+                'dates', json_agg(to_char(c.date, 'YYYY-MM-DD') ORDER BY c.date),
+                'amounts', json_agg(c.current_total ORDER BY c.date),
+                'prior_amounts', json_agg(c.prior_total ORDER BY c.date),
+                'avg_amounts', json_agg(c.avg_total ORDER BY c.date)
+            )
+            FROM ({curves}) c
+        )"""
+
+    if section == 'values':
+        return """(
+            SELECT COALESCE(json_agg(DISTINCT s.value ORDER BY s.value) FILTER (WHERE s.value IS NOT NULL), '[]')
+            FROM scoped s
+        )"""
+
+    raise ValueError(f"Unsupported dashboard section: {section}")
+
+def _dashboard_summary(cur, filters, column, amount_sql, monthly, limit, after):
+    """The dashboard summary section: statistics computed in SQL over the whole period by
+    _summary_stats, plus one page of transactions unless summary_only is set"""
+    stats = _summary_stats(cur, 'stg_transactions t', filters, f"t.{column}", amount_sql, 't.month_start')
+    summary = {
+        'total': stats['total'],
+        'monthly_average': _monthly_average(stats) if monthly else 0,
+        'highest': stats['highest'],
+        'count': stats['count'],
+        # Months of the period with any transaction
+        'months': stats['months']
+    }
+    if _summary_only():
+        return summary
+    
+    rows, next_cursor = _transactions_page(cur, filters, column, amount_sql, limit, after)
+    summary['next_cursor'] = next_cursor
+    summary['transactions'] = [{
+        'transaction_id': row[0],
+        'name': row[1],
+        column: row[2] or 'Uncategorized',
+        'amount': float(row[3]),
+        'date': row[4].isoformat(),
+        'percentage': _value_percentage(row, stats['totals'])
+    } for row in rows]
+    return summary
+
+@analytics_bp.route('/api/dashboard')
+@conditional_response
+@cached_response
+def dashboard():
+    """Every section a spend/income page needs, in one request.
+
+    The chart sections are computed by one query over a materialized scan of stg_transactions
+    covering the dates they read. The summary section takes two more: its statistics over the
+    whole period (_summary_stats) and one page of its transactions.
+
+    Query parameters: flow (expense|income|net), dimension (category|group), the dimension's
+    own filter (category=... or group=...), month (YYYY-MM or all), avg_months and sections
+    (comma-separated, defaults to all sections of the flow). The summary section's transaction
+    list is paged with limit/cursor like /api/expenses/summary and left out with
+    summary_only=true; its totals always cover the whole period.
+    """
+    flow = request.args.get('flow', 'expense')
+    dimension = request.args.get('dimension', 'category')
+    month = request.args.get('month', 'all')
+    avg_months = request.args.get('avg_months', Config.DAILY_AVG_MONTHS, type=int)
+    
+    if flow not in DASHBOARD_SECTIONS:
+        return jsonify({'error': f"flow must be one of {', '.join(DASHBOARD_SECTIONS)}"}), 400
+    if dimension not in DASHBOARD_DIMENSIONS:
+        return jsonify({'error': f"dimension must be one of {', '.join(DASHBOARD_DIMENSIONS)}"}), 400
+    if not avg_months or avg_months < 1:
+        return jsonify({'error': 'avg_months must be a positive integer'}), 400
+    
+    requested = request.args.get('sections')
+    sections = [s.strip() for s in requested.split(',') if s.strip()] if requested else list(DASHBOARD_SECTIONS[flow])
+    unsupported = [s for s in sections if s not in DASHBOARD_SECTIONS[flow]]
+    if unsupported:
+        return jsonify({'error': f"Unsupported sections for {flow}: {', '.join(unsupported)}"}), 400
+    
+    try:
+        selected_month = parse_month(month)
+    except ValueError:
+        return jsonify({'error': 'month must be YYYY-MM or all'}), 400
+    try:
+        limit, after = page_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    column, transfer_column = DASHBOARD_DIMENSIONS[dimension]
+    value = request.args.get(dimension, 'all')
+    
+    # Last 12 calendar months including the current one
+    window_start, window_end = trailing_months(12)
+    period_start, period_end = month_range(selected_month) if selected_month else (window_start, window_end)
+    
+    params = {
+        'value': value,
+        'window_start': window_start,
+        'window_last': window_end - relativedelta(months=1),
+        'window_end': window_end,
+        'period_start': period_start,
+        'period_end': period_end,
+        'avg_months': avg_months,
+    }
+    
+    # The daily curves only exist for a selected month
+    if 'daily' in sections and not selected_month:
+        sections.remove('daily')
+    if 'daily' in sections:
+        params.update(curve_params(selected_month, avg_months))
+    
+    # Scan only the dates some requested section reads
+    ranges = []
+    if 'breakdown' in sections:
+        ranges.append((params['period_start'], params['period_end']))
+    if 'monthly' in sections or 'values' in sections:
+        ranges.append((window_start, window_end))
+    if 'daily' in sections:
+        ranges.append((params['avg_start'], params['curve_end']))
+    
+    # Income rows are stored with negative amounts
+    amount = "-t.amount" if flow == 'income' else "t.amount"
+    
+    scope = AnalyticsFilter(named=True)
+    if ranges:
+        scope.date_range(min(r[0] for r in ranges), max(r[1] for r in ranges))
+    scope.direction('both' if flow == 'net' else flow).exclude_transfers(transfer_column)
+    params.update(scope.params)
+    
+    section_columns = ",\n".join(
+        f"{_dashboard_section_sql(section, flow, column)} as {section}"
+        for section in sections if section != 'summary'
+    )
+    query = f"""
+    WITH scoped AS MATERIALIZED (
+        SELECT 
+            t.transaction_id,
+            t.name,
+            t.{column} as value,
+            {amount} as amount,
+            t.date,
+            t.month_start
+        FROM stg_transactions t
+        {scope.where()}
+    )
+    SELECT {section_columns}
+    """
+    
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        row = {}
+        if section_columns:
+            cur.execute(query, params)
+            row = cur.fetchone()
+        response = {}
+        
+        if 'summary' in sections:
+            summary_filters = (
+                AnalyticsFilter()
+                .date_range(period_start, period_end)
+                .direction(flow)
+                .exclude_transfers(transfer_column)
+                .equals(column, value)
+            )
+            with conn.cursor() as summary_cur:
+                response['summary'] = _dashboard_summary(
+                    summary_cur, summary_filters, column, amount, not selected_month, limit, after
+                )
+        
+        if 'breakdown' in sections:
+            response['breakdown'] = {
+                'labels': [b['label'] for b in row['breakdown']],
+                'amounts': [b['amount'] for b in row['breakdown']]
+            }
+        
+        if 'monthly' in sections:
+            months = row['monthly']
+            response['monthly'] = {
+                'months': [datetime.strptime(m['month'], '%Y-%m-%d').strftime('%B %Y') for m in months]
+            }
+            if flow == 'net':
+                response['monthly']['income'] = [m['income'] for m in months]
+                response['monthly']['expenses'] = [m['expenses'] for m in months]
+                response['monthly']['net'] = [m['income'] - m['expenses'] for m in months]
+            else:
+                response['monthly']['amounts'] = [m['amount'] for m in months]
+        
+        if 'daily' in sections:
+            response['daily'] = dict(row['daily'])
+            response['daily']['avg_months'] = avg_months
+            response['daily']['current_date'] = datetime.now(ZoneInfo("America/Los_Angeles")).strftime('%Y-%m-%d')
+        
+        if 'values' in sections:
+            response['values'] = row['values']
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        current_app.logger.error(f"Error in dashboard: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
 # Add all other analytics routes from app.py
 # Including:
 # - /api/expenses/monthly
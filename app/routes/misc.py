@@ -1,105 +1,117 @@
 from flask import Blueprint, jsonify, request
 from app.financial_data.utils.db_connection import get_db_connection
-from datetime import datetime
+from app.financial_data.utils.analytics_filters import AnalyticsFilter
+from datetime import datetime, date
+from dateutil.relativedelta import relativedelta
 from collections import defaultdict
+from app.utils.response_cache import cached_response, conditional_response, response_cache
 
 misc_bp = Blueprint('misc', __name__)
 
 @misc_bp.route('/api/expenses/subs_stats')
+@conditional_response
+@cached_response
 def get_subs_stats():
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
-        # Get all subscription transactions
-        query = """
-        WITH base_transactions AS (
-            SELECT 
-                REGEXP_REPLACE(name, '\s*-\s*\d+.*$|\s*#\d+.*$', '') as base_name,
-                amount,
-                date
-            FROM stg_transactions 
-            WHERE category = 'Subs'
-            AND amount > 0
-            AND date >= NOW() - INTERVAL '12 months'
-        ),
-        sub_transactions AS (
+        # Subscription charges from the last 12 months
+        since = date.today() - relativedelta(months=12)
+        filters = (
+            AnalyticsFilter()
+            .equals('category', 'Subs')
+            .direction('expense')
+            .date_range(since)
+        )
+        
+        # Summary statistics over the window's charges, including the most expensive subscription
+        # (ties go to the larger total) and the months in which subscriptions last charged.
+        # Active subscriptions come from the precomputed subscriptions table.
+        cur.execute(f"""
+        WITH sub_transactions AS (
             SELECT 
-                base_name as name,
-                SUM(amount) as total_spent,
-                COUNT(*) as occurrence_count,
-                MIN(date) as first_payment,
-                MAX(date) as last_payment,
-                MAX(amount) as amount
-            FROM base_transactions
-            GROUP BY base_name
+                t.base_name as name,
+                SUM(t.amount) as total_spent,
+                MIN(t.date) as first_payment,
+                MAX(t.date) as last_payment,
+                MAX(t.amount) as amount
+            FROM stg_transactions t
+            {filters.where()}
+            GROUP BY t.base_name
         )
+        SELECT 
+            (SELECT COUNT(*) FROM subscriptions WHERE is_active) as active_count,
+            COALESCE(SUM(total_spent), 0) as total_spent,
+            COUNT(DISTINCT DATE_TRUNC('month', last_payment)) as months_active,
+            MIN(first_payment) as first_date,
+            MAX(last_payment) as last_date,
+            (ARRAY_AGG(name ORDER BY amount DESC, total_spent DESC))[1] as most_expensive_name,
+            MAX(amount) as most_expensive_amount
+        FROM sub_transactions
+        """, filters.params)
+        (active_count, total_spent, months_active, first_date, last_date,
+         most_expensive_name, most_expensive_amount) = cur.fetchone()
+        
+        total_spent = float(total_spent)
+        stats = {
+            'active_count': active_count,
+            'total_spent': total_spent,
+            'monthly_average': total_spent / months_active if months_active > 0 else 0,
+            'first_date': first_date.isoformat() if first_date else None,
+            'last_date': last_date.isoformat() if last_date else None,
+            'most_expensive': {
+                'name': most_expensive_name or '',
+                'amount': float(most_expensive_amount or 0)
+            }
+        }
+        if request.args.get('summary_only', 'false').lower() == 'true':
+            return jsonify(stats)
+        
+        # Subscriptions charged in the window, with the recurrence detected on ingest (migration
+        # 0012); payment counts and totals cover each subscription's whole history
+        cur.execute("""
         SELECT
-            name,
-            amount,
-            occurrence_count as payment_count,
+            base_name,
+            last_amount,
+            payment_count,
             first_payment,
             last_payment,
             total_spent,
-            CASE 
-                WHEN occurrence_count >= 12 THEN 'Monthly'
-                WHEN occurrence_count >= 4 THEN 'Quarterly'
-                WHEN occurrence_count >= 2 THEN 'Semi-Annual'
-                ELSE 'Annual'
-            END as frequency
-        FROM sub_transactions
+            frequency,
+            average_amount,
+            interval_days,
+            next_expected,
+            is_active
+        FROM subscriptions
+        WHERE last_payment >= %s
         ORDER BY total_spent DESC
-        """
-        
-        cur.execute(query)
+        """, (since,))
         results = cur.fetchall()
         
-        # Process subscription data
-        subscriptions = []
-        total_spent = 0
-        most_expensive = {'name': '', 'amount': 0}
-        first_date = None
-        last_date = None
-        
-        for row in results:
-            sub = {
-                'name': row[0],
-                'amount': float(row[1]),
-                'payment_count': row[2],
-                'first_payment': row[3].isoformat(),
-                'last_payment': row[4].isoformat(),
-                'total_spent': float(row[5]),
-                'frequency': row[6]
-            }
-            
-            subscriptions.append(sub)
-            total_spent += sub['total_spent']
-            
-            # Track most expensive subscription
-            if sub['amount'] > most_expensive['amount']:
-                most_expensive = {'name': sub['name'], 'amount': sub['amount']}
-            
-            # Track first and last dates
-            if first_date is None or row[3] < first_date:
-                first_date = row[3]
-            if last_date is None or row[4] > last_date:
-                last_date = row[4]
-        
-        # Calculate monthly average based on actual months with data
-        months_active = len(set(sub['last_payment'][:7] for sub in subscriptions))
-        monthly_average = total_spent / months_active if months_active > 0 else 0
+        subscriptions = [{
+            'name': row[0],
+            'amount': float(row[1]),
+            'payment_count': row[2],
+            'first_payment': row[3].isoformat(),
+            'last_payment': row[4].isoformat(),
+            'total_spent': float(row[5]),
+            'frequency': row[6],
+            'average_amount': float(row[7]),
+            'interval_days': row[8],
+            'next_expected': row[9].isoformat() if row[9] else None,
+            'is_active': row[10]
+        } for row in results]
         
         # Add monthly data query
-        monthly_query = """
+        monthly_query = f"""
         WITH base_transactions AS (
             SELECT 
-                REGEXP_REPLACE(name, '\s*-\s*\d+.*$|\s*#\d+.*$', '') as base_name,
-                amount,
-                date_trunc('month', date)::date as month
-            FROM stg_transactions 
-            WHERE category = 'Subs'
-            AND amount > 0
-            AND date >= NOW() - INTERVAL '12 months'
+                t.base_name,
+                t.amount,
+                t.month_start as month
+            FROM stg_transactions t
+            {filters.where()}
         )
         SELECT 
             base_name as name,
@@ -110,7 +122,7 @@ def get_subs_stats():
         ORDER BY month, base_name;
         """
         
-        cur.execute(monthly_query)
+        cur.execute(monthly_query, filters.params)
         monthly_results = cur.fetchall()
         monthly_data = [
             {
@@ -122,12 +134,7 @@ def get_subs_stats():
         ]
         
         return jsonify({
-            'active_count': len(subscriptions),
-            'total_spent': total_spent,
-            'monthly_average': monthly_average,
-            'first_date': first_date.isoformat() if first_date else None,
-            'last_date': last_date.isoformat() if last_date else None,
-            'most_expensive': most_expensive,
+            **stats,
             'subscriptions': subscriptions,
             'monthly_data': monthly_data
         })
@@ -138,3 +145,61 @@ def get_subs_stats():
     finally:
         cur.close()
         conn.close()
+
+@misc_bp.route('/api/plaid/usage')
+def get_plaid_usage():
+    hours = request.args.get('hours', 24 * 7, type=int)
+    
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
+    try:
+        # Read the hourly rollups; the raw call log only covers the retention window
+        cur.execute("""
+        SELECT 
+            hour,
+            product,
+            operation,
+            call_count,
+            error_count,
+            p50_response_ms,
+            p95_response_ms,
+            items_retrieved
+        FROM plaid_api_call_rollups
+        WHERE hour >= date_trunc('hour', NOW()::timestamp) - make_interval(hours => %s)
+        ORDER BY hour, product, operation
+        """, (hours,))
+        hourly = [{
+            'hour': row[0].isoformat(),
+            'product': row[1],
+            'operation': row[2],
+            'calls': row[3],
+            'errors': row[4],
+            'p50_ms': float(row[5]) if row[5] is not None else None,
+            'p95_ms': float(row[6]) if row[6] is not None else None,
+            'items_retrieved': row[7]
+        } for row in cur.fetchall()]
+        
+        totals = defaultdict(lambda: {'calls': 0, 'errors': 0, 'items_retrieved': 0})
+        for row in hourly:
+            key = f"{row['product']}.{row['operation']}"
+            totals[key]['calls'] += row['calls']
+            totals[key]['errors'] += row['errors']
+            totals[key]['items_retrieved'] += row['items_retrieved']
+        
+        return jsonify({
+            'hours': hours,
+            'hourly': hourly,
+            'totals': dict(totals)
+        })
+        
+    except Exception as e:
+        print(f"Error in get_plaid_usage: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+@misc_bp.route('/api/cache/stats')
+def get_cache_stats():
+    return jsonify(response_cache.stats())
@@ -1,6 +1,27 @@
 from flask import Blueprint, jsonify, request, render_template
 from app.financial_data.utils.db_connection import get_db_connection
-from psycopg2.extras import RealDictCursor
+from app.financial_data.utils.analytics_filters import AnalyticsFilter
+from app.financial_data.utils.pagination import keyset, limit_sql, page, page_params
+from app.utils.response_cache import bump_data_version, conditional_response
+from app.utils.json_response import (
+    columnar, decimals_as_floats, json_response, ndjson_response, wants_columnar, wants_ndjson
+)
+from psycopg2.extras import RealDictCursor, execute_values
+from datetime import datetime
+
+# Page size bounds for the search endpoint
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+
+# Most edits accepted by one batch_update request
+BATCH_MAX_EDITS = 5000
+
+# Editable fields of a batch edit -> transactions column
+BATCH_FIELDS = {
+    'category': 'category',
+    'group': 'group_name',
+    'name': 'name',
+}
 
 transactions_bp = Blueprint('transactions', __name__)
 
@@ -50,6 +71,7 @@ def update_transaction_category():
                 """, (new_category, transaction_name, transaction_id))
             
             conn.commit()
+            bump_data_version()
             return jsonify({
                 'success': True,
                 'transaction_id': transaction_id,
@@ -111,6 +133,7 @@ def update_transaction_group():
                 """, (new_group, transaction_name, transaction_id))
             
             conn.commit()
+            bump_data_version()
             return jsonify({
                 'success': True,
                 'transaction_id': transaction_id,
@@ -130,6 +153,7 @@ def update_transaction_group():
             conn.close()
 
 @transactions_bp.route('/api/categories')
+@conditional_response
 def get_categories():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -140,7 +164,7 @@ def get_categories():
         FROM transactions 
         WHERE amount > 0 
         AND category IS NOT NULL 
-        AND LOWER(COALESCE(category, '')) NOT LIKE '%transfer%'
+        AND NOT is_transfer
         ORDER BY category
         """
         cur.execute(query)
@@ -154,6 +178,7 @@ def get_categories():
         conn.close()
 
 @transactions_bp.route('/api/groups')
+@conditional_response
 def get_groups():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -164,7 +189,7 @@ def get_groups():
         FROM transactions 
         WHERE amount > 0 
         AND group_name IS NOT NULL 
-        AND LOWER(COALESCE(group_name, '')) NOT LIKE '%transfer%'
+        AND NOT is_group_transfer
         ORDER BY group_name
         """
         cur.execute(query)
@@ -177,27 +202,184 @@ def get_groups():
         cur.close()
         conn.close()
 
+TRANSACTIONS_LIST_SQL = """
+    SELECT 
+        t.transaction_id,
+        t.date,
+        a.account_name,
+        t.category,
+        t.group_name,
+        t.name,
+        t.amount
+    FROM stg_transactions t
+    LEFT JOIN accounts a ON t.account_id = a.account_id
+    {where}
+    ORDER BY t.date DESC, t.transaction_id DESC
+    {limit}
+"""
+
+def _stream_transactions(after):
+    filters = keyset(AnalyticsFilter(), after)
+    return ndjson_response(TRANSACTIONS_LIST_SQL.format(where=filters.where(), limit=''), filters.params)
+
 @transactions_bp.route('/api/transactions')
+@conditional_response
 def get_transactions():
+    """Every posted transaction, newest first.
+
+    Without limit/cursor the response is the full list. With either, it is one page:
+    {transactions, next_cursor, total}, where next_cursor continues after the last row and
+    total (first page only) is the number of transactions across all pages.
+    format=columnar replaces the list of row objects with {columns, data} column arrays,
+    amounts as numbers. format=ndjson streams every row after the cursor (limit is ignored)
+    as one JSON object per line.
+    """
+    try:
+        limit, after = page_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if wants_ndjson():
+        try:
+            return _stream_transactions(after)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    as_columns = wants_columnar()
+    conn = get_db_connection()
+    if as_columns:
+        cur = decimals_as_floats(conn.cursor())
+        row_key = lambda row: (row[1], row[0])
+    else:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        row_key = lambda row: (row['date'], row['transaction_id'])
+    
+    try:
+        filters = keyset(AnalyticsFilter(), after)
+        cur.execute(TRANSACTIONS_LIST_SQL.format(where=filters.where(), limit=limit_sql(limit)), filters.params)
+        transactions, next_cursor = page(cur.fetchall(), limit, row_key)
+        if as_columns:
+            transactions = columnar((desc[0] for desc in cur.description), transactions)
+        if limit is None:
+            return json_response(transactions) if as_columns else jsonify(transactions)
+        
+        response = {'transactions': transactions, 'next_cursor': next_cursor}
+        if after is None:
+            # monthly_rollups counts every stg_transactions row, so the total is a sum
+            # over the rollup rows rather than a count over the table
+            with conn.cursor() as count_cur:
+                count_cur.execute("SELECT COALESCE(SUM(txn_count), 0) FROM monthly_rollups")
+                response['total'] = int(count_cur.fetchone()[0])
+        return json_response(response) if as_columns else jsonify(response)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+@transactions_bp.route('/api/transactions/search')
+@conditional_response
+def search_transactions():
+    """Search transactions by name or merchant name.
+
+    mode=substring (default) matches q anywhere in the name; mode=fuzzy ranks by trigram
+    similarity above threshold. Optional filters: start_date/end_date (YYYY-MM-DD, inclusive),
+    account_id (repeatable), min_amount/max_amount, plus limit/offset paging.
+    """
+    q = (request.args.get('q') or '').strip()
+    mode = request.args.get('mode', 'substring')
+    
+    if not q:
+        return jsonify({'error': 'q is required'}), 400
+    if mode not in ('substring', 'fuzzy'):
+        return jsonify({'error': 'mode must be substring or fuzzy'}), 400
+    
+    try:
+        limit = min(request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int), SEARCH_MAX_LIMIT)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        threshold = request.args.get('threshold', 0.3, type=float)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        min_amount = request.args.get('min_amount', type=float)
+        max_amount = request.args.get('max_amount', type=float)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid filter: {str(e)}'}), 400
+    
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    
+    conditions = []
+    params = []
+    
+    if mode == 'substring':
+        # Escape LIKE wildcards so q is matched literally
+        pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        conditions.append("(t.name ILIKE %s OR t.merchant_name ILIKE %s)")
+        params.extend([pattern, pattern])
+        score = "NULL::real"
+        order_by = "t.date DESC, t.transaction_id"
+        score_params = []
+    else:
+        conditions.append("(t.name %% %s OR t.merchant_name %% %s)")
+        params.extend([q, q])
+        score = "GREATEST(similarity(t.name, %s), COALESCE(similarity(t.merchant_name, %s), 0))"
+        order_by = "score DESC, t.date DESC, t.transaction_id"
+        score_params = [q, q]
+    
+    if start_date:
+        conditions.append("t.date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("t.date <= %s")
+        params.append(end_date)
+    account_ids = request.args.getlist('account_id')
+    if account_ids:
+        conditions.append("t.account_id = ANY(%s)")
+        params.append(account_ids)
+    if min_amount is not None:
+        conditions.append("t.amount >= %s")
+        params.append(min_amount)
+    if max_amount is not None:
+        conditions.append("t.amount <= %s")
+        params.append(max_amount)
+    
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
-        cur.execute("""
+        if mode == 'fuzzy':
+            cur.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+        
+        # Fetch one extra row to report whether another page exists
+        cur.execute(f"""
             SELECT 
                 t.transaction_id,
                 t.date,
+                t.account_id,
                 a.account_name,
+                t.name,
+                t.merchant_name,
                 t.category,
                 t.group_name,
-                t.name,
-                t.amount
-            FROM stg_transactions t
+                t.amount,
+                t.pending,
+                {score} as score
+            FROM transactions t
             LEFT JOIN accounts a ON t.account_id = a.account_id
-            ORDER BY t.date DESC
-        """)
-        transactions = cur.fetchall()
-        return jsonify(transactions)
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+            LIMIT %s OFFSET %s
+        """, tuple(score_params + params + [limit + 1, offset]))
+        rows = cur.fetchall()
+        
+        return jsonify({
+            'results': rows[:limit],
+            'limit': limit,
+            'offset': offset,
+            'has_more': len(rows) > limit
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     finally:
@@ -232,6 +414,7 @@ def delete_transaction():
                 return jsonify({'error': 'Transaction not found'}), 404
                 
             conn.commit()
+            bump_data_version()
             return jsonify({
                 'success': True,
                 'transaction_id': transaction_id
@@ -288,6 +471,7 @@ def update_transaction_name():
                 """, (new_name, transaction_id))
             
             conn.commit()
+            bump_data_version()
             return jsonify({'success': True})
             
         except Exception as e:
@@ -301,3 +485,152 @@ def update_transaction_name():
             cur.close()
         if conn:
             conn.close()
+
+def _validate_edit(edit):
+    """Error message for a malformed batch edit, or None"""
+    if not isinstance(edit, dict):
+        return 'Edit must be an object'
+    if not edit.get('transaction_id'):
+        return 'transaction_id is required'
+    if not isinstance(edit['transaction_id'], str):
+        return 'transaction_id must be a string'
+    if not any(field in edit for field in BATCH_FIELDS):
+        return 'Nothing to update; expected category, group or name'
+    if any(not isinstance(edit[field], (str, type(None))) for field in BATCH_FIELDS if field in edit):
+        return 'category, group and name must be strings or null'
+    if 'name' in edit and not edit['name']:
+        return 'name cannot be empty'
+    return None
+
+@transactions_bp.route('/api/transactions/batch_update', methods=['POST'])
+def batch_update_transactions():
+    """Apply many category, group and name edits in one database transaction.
+
+    Body: {"edits": [{"transaction_id", "category"?, "group"?, "name"?, "update_all"?}, ...]}.
+    Each edit behaves like the matching single-edit endpoint: category and group edits upsert
+    the mapping for the transaction's name, and update_all applies the edit to every
+    transaction with that name. Later edits win when several touch the same transaction or
+    name. Every table is written with one set-based statement whatever the batch size.
+    Returns one result per edit, in request order; malformed edits and unknown transactions
+    fail on their own without blocking the rest.
+    """
+    data = request.get_json(silent=True) or {}
+    edits = data.get('edits')
+    if not isinstance(edits, list) or not edits:
+        return jsonify({'error': 'edits must be a non-empty list'}), 400
+    if len(edits) > BATCH_MAX_EDITS:
+        return jsonify({'error': f"At most {BATCH_MAX_EDITS} edits per request"}), 400
+    
+    results = [{'index': i, 'success': False, 'error': _validate_edit(edit)} for i, edit in enumerate(edits)]
+    for result, edit in zip(results, edits):
+        if isinstance(edit, dict):
+            result['transaction_id'] = edit.get('transaction_id')
+    
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
+    try:
+        ids = list({edit['transaction_id'] for edit, result in zip(edits, results) if not result['error']})
+        cur.execute("SELECT transaction_id, name FROM transactions WHERE transaction_id = ANY(%s)", (ids,))
+        names = dict(cur.fetchall())
+        
+        # Merge the edits per transaction and, for update_all, per original name. Name-wide
+        # edits are written first, so an update_all edit takes the fields it sets away from
+        # earlier per-transaction edits on that name; later per-transaction edits still win.
+        by_id, by_name = {}, {}
+        category_mappings, group_mappings = {}, {}
+        for edit, result in zip(edits, results):
+            if result['error']:
+                continue
+            transaction_id = edit['transaction_id']
+            if transaction_id not in names:
+                result['error'] = 'Transaction not found'
+                continue
+            name = names[transaction_id]
+            changes = {field: edit[field] for field in BATCH_FIELDS if field in edit}
+            if edit.get('update_all'):
+                by_name.setdefault(name, {}).update(changes)
+                for other_id, other_changes in by_id.items():
+                    if names[other_id] == name:
+                        for field in changes:
+                            other_changes.pop(field, None)
+            else:
+                by_id.setdefault(transaction_id, {}).update(changes)
+            if 'category' in changes:
+                category_mappings[name] = changes['category']
+            if 'group' in changes:
+                group_mappings[name] = changes['group']
+            result['success'] = True
+            del result['error']
+        
+        def values(changes_by_key):
+            # (key, set_category, category, set_group_name, group_name, set_name, name) per key
+            return [
+                (key, *(value for field in BATCH_FIELDS for value in (field in changes, changes.get(field))))
+                for key, changes in changes_by_key.items()
+            ]
+        
+        assignments = ', '.join(
+            f"{column} = CASE WHEN v.set_{column} THEN v.{column} ELSE t.{column} END"
+            for column in BATCH_FIELDS.values()
+        )
+        value_columns = ', '.join(f"set_{column}, {column}" for column in BATCH_FIELDS.values())
+        template = '(%s' + ', %s::boolean, %s' * len(BATCH_FIELDS) + ')'
+        
+        # Name-wide edits first, matched on the names as they were before this batch, so
+        # per-transaction edits below take precedence over them
+        if by_name:
+            execute_values(cur, f"""
+                UPDATE transactions t
+                SET {assignments}
+                FROM (VALUES %s) v(match_name, {value_columns})
+                WHERE t.name = v.match_name
+            """, values(by_name), template=template, page_size=len(by_name))
+        
+        by_id = {transaction_id: changes for transaction_id, changes in by_id.items() if changes}
+        if by_id:
+            execute_values(cur, f"""
+                UPDATE transactions t
+                SET {assignments}
+                FROM (VALUES %s) v(transaction_id, {value_columns})
+                WHERE t.transaction_id = v.transaction_id
+            """, values(by_id), template=template, page_size=len(by_id))
+        
+        if category_mappings:
+            execute_values(cur, """
+                INSERT INTO category_mappings (transaction_name, category)
+                VALUES %s
+                ON CONFLICT (transaction_name) 
+                DO UPDATE SET 
+                    category = EXCLUDED.category,
+                    last_updated = CURRENT_TIMESTAMP
+            """, list(category_mappings.items()), page_size=len(category_mappings))
+        
+        if group_mappings:
+            execute_values(cur, """
+                INSERT INTO group_mappings (transaction_name, group_name)
+                VALUES %s
+                ON CONFLICT (transaction_name) 
+                DO UPDATE SET 
+                    group_name = EXCLUDED.group_name,
+                    last_updated = CURRENT_TIMESTAMP
+            """, list(group_mappings.items()), page_size=len(group_mappings))
+        
+        conn.commit()
+        if by_id or by_name:
+            bump_data_version()
+        
+        updated = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': updated == len(results),
+            'updated': updated,
+            'failed': len(results) - updated,
+            'results': results
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
@@ -0,0 +1,82 @@
+import gzip
+import zlib
+import brotli
+from flask import request
+from app.config import Config
+
+# Text payloads worth compressing; images, spreadsheets and other binaries are left alone
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/javascript',
+    'image/svg+xml',
+}
+
+
+def _encoding():
+    """The client's preferred supported encoding, br over gzip on a tie, or None"""
+    return request.accept_encodings.best_match(['br', 'gzip'])
+
+
+def _stream_chunks(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing after each so nothing is held back"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(Config.COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        # Werkzeug closes this wrapper; pass that on so the body's own cleanup runs
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """after_request hook: gzip or brotli encode text responses the client accepts.
+
+    Buffered bodies under COMPRESSION_MIN_BYTES are sent as they are. Streamed bodies are
+    compressed incrementally, with a flush after every chunk so rows still reach the client
+    as soon as they are produced. COMPRESSION_LEVEL=0 turns compression off.
+    """
+    if (
+        Config.COMPRESSION_LEVEL <= 0
+        or request.method == 'HEAD'
+        or response.status_code != 200
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    if not response.is_streamed and response.calculate_content_length() < Config.COMPRESSION_MIN_BYTES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    elif encoding == 'br':
+        response.set_data(brotli.compress(response.get_data(), quality=Config.BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(response.get_data(), compresslevel=Config.COMPRESSION_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,99 @@
+from decimal import Decimal
+import uuid
+import orjson
+import psycopg2.extensions
+from flask import request, current_app
+from app.config import Config
+from app.financial_data.utils.db_connection import get_db_connection
+
+# NUMERIC columns as floats, so rows reach orjson without per-value conversion
+DECIMAL_AS_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    'DECIMAL_AS_FLOAT',
+    lambda value, cur: float(value) if value is not None else None
+)
+
+
+def decimals_as_floats(cur):
+    """Return NUMERIC values from this cursor as floats instead of Decimal"""
+    psycopg2.extensions.register_type(DECIMAL_AS_FLOAT, cur)
+    return cur
+
+
+def _default(obj):
+    # Only reached for types orjson does not serialize natively
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """Serialize to JSON bytes; dates, datetimes and UUIDs are encoded natively by orjson"""
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(payload, status=200):
+    """jsonify() replacement backed by orjson"""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def wants_columnar():
+    """format=columnar asks for column arrays instead of one object per row"""
+    return request.args.get('format') == 'columnar'
+
+
+def wants_ndjson():
+    """format=ndjson asks for the rows streamed as newline-delimited JSON"""
+    return request.args.get('format') == 'ndjson'
+
+
+def ndjson_response(query, params=None, row_object=None, itersize=None):
+    """Stream query's rows as NDJSON, one JSON object per line, from a named server-side cursor.
+
+    Rows are fetched itersize at a time (STREAM_ITERSIZE by default) and written as they
+    arrive, so memory stays flat however large the result and the first rows go out before
+    the query finishes. The first batch is fetched before the response starts, so a failing
+    query still raises here and the route can answer with an error status. row_object maps
+    (column names, row tuple) to the object written; by default the columns are zipped.
+    The response owns its connection and closes it when the stream ends or is abandoned.
+    """
+    itersize = itersize or Config.STREAM_ITERSIZE
+    conn = get_db_connection()
+    try:
+        cur = decimals_as_floats(conn.cursor(name=f"ndjson_{uuid.uuid4().hex}"))
+        cur.itersize = itersize
+        cur.execute(query, params)
+        batch = cur.fetchmany(itersize)
+        columns = [desc[0] for desc in cur.description]
+    except Exception:
+        conn.close()
+        raise
+    
+    if row_object is None:
+        row_object = lambda names, row: dict(zip(names, row))
+    
+    def generate(batch):
+        try:
+            while batch:
+                yield b''.join(dumps(row_object(columns, row)) + b'\n' for row in batch)
+                batch = cur.fetchmany(itersize)
+        finally:
+            cur.close()
+            conn.close()
+    
+    response = current_app.response_class(generate(batch), mimetype='application/x-ndjson')
+    # Also covers a response that is closed before its body is ever iterated
+    response.call_on_close(conn.close)
+    return response
+
+
+def columnar(columns, rows):
+    """{'columns': [names], 'data': [[values of column 0], [values of column 1], ...]}.
+
+    Each column name is sent once instead of once per row, and the transpose runs in C.
+    """
+    columns = list(columns)
+    return {
+        'columns': columns,
+        'data': list(zip(*rows)) if rows else [[] for _ in columns]
+    }
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from functools import wraps
+import threading
+import time
+import uuid
+from flask import request, make_response, current_app
+from app.config import Config
+
+# Identifies this process, so versions from before a restart never match
+BOOT_ID = uuid.uuid4().hex[:8]
+
+_version_lock = threading.Lock()
+_data_version = 0
+
+
+def get_data_version():
+    return _data_version
+
+
+def bump_data_version():
+    """Mark every cached response as stale. Call after committing a write to the data the API serves."""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        version = _data_version
+    response_cache.clear()
+    return version
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses, bounded by the total size of their bodies"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(old[0])
+            self._entries[key] = (body, mimetype)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (evicted_body, _) = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted_body)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'data_version': get_data_version(),
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions
+            }
+
+
+response_cache = ResponseCache(Config.RESPONSE_CACHE_MAX_BYTES)
+
+
+def current_hour():
+    """Several endpoints default to windows ending today (server or Pacific time); every
+    whole-hour timezone changes date on an hour boundary, so responses are keyed by hour too"""
+    return int(time.time() // 3600)
+
+
+def cache_key(version):
+    """Endpoint + query parameters in a canonical order + data version + hour"""
+    params = tuple(sorted(
+        (name, value) for name, values in request.args.lists() for value in values
+    ))
+    return (request.path, params, version, current_hour())
+
+
+def cached_response(f):
+    """Serve successful GET responses from response_cache until the data version changes.
+
+    The version is read before the view runs, so a response computed while a write is being
+    committed is stored under the old version and never served after the bump.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not response_cache.max_bytes or request.method != 'GET':
+            return f(*args, **kwargs)
+
+        key = cache_key(get_data_version())
+        entry = response_cache.get(key)
+        if entry is not None:
+            body, mimetype = entry
+            return current_app.response_class(body, mimetype=mimetype)
+
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            response_cache.put(key, response.get_data(), response.mimetype)
+        return response
+    return decorated_function
+
+
+def current_etag(version):
+    """Weak ETag shared by every versioned endpoint; the URL already identifies the resource"""
+    return f"{BOOT_ID}-{version}-{current_hour()}"
+
+
+def conditional_response(f):
+    """Answer GETs whose If-None-Match carries the current ETag with 304 before the view runs.
+
+    Responses are tagged with the data version read before the view runs and marked no-cache,
+    so browsers revalidate on every load and only re-download after a write.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.method != 'GET':
+            return f(*args, **kwargs)
+
+        etag = current_etag(get_data_version())
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.cache_control.no_cache = True
+        return response
+    return decorated_function
@@ -0,0 +1,6 @@
+"""Performance benchmarks for the financial data pipeline.
+
+Run against a dedicated local Postgres database, never the application database:
+
+    BENCH_DB_NAME=plaid_bench python -m benchmarks.ingest --scales 1000 10000 100000
+"""
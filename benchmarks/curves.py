@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+
+from benchmarks.explain import load_dataset
+from benchmarks.ingest import reset_database
+
+# The daily curve routes before the shared engine: one daily_rollups query per curve
+LEGACY_CURVE_SQL = """
+WITH dates AS (
+    SELECT generate_series(
+        %s::timestamp,
+        (%s::timestamp + INTERVAL '1 month - 1 day'),
+        '1 day'::interval
+    )::date AS date
+),
+daily_totals AS (
+    SELECT
+        EXTRACT(DAY FROM day) as day_of_month,
+        SUM(total) / %s as daily_amount
+    FROM daily_rollups
+    WHERE flow = 'expense'
+    AND day >= %s
+    AND day < %s
+    AND NOT {transfer_column}
+    {value_filter}
+    GROUP BY EXTRACT(DAY FROM day)
+)
+SELECT
+    d.date,
+    COALESCE(SUM(dt.daily_amount) OVER (ORDER BY d.date), 0) as cumulative_amount
+FROM dates d
+LEFT JOIN daily_totals dt ON EXTRACT(DAY FROM d.date) = dt.day_of_month
+ORDER BY d.date
+"""
+
+
+def legacy_curves(cur, month_start, avg_months, column, value):
+    """Current, prior and average curves the way the routes computed them: three queries"""
+    transfer_column = 'is_transfer' if column == 'category' else 'is_group_transfer'
+    value_filter = f"AND {column} = %s" if value != 'all' else ""
+    sql = LEGACY_CURVE_SQL.format(transfer_column=transfer_column, value_filter=value_filter)
+    extra = (value,) if value != 'all' else ()
+
+    next_start = month_start + relativedelta(months=1)
+    windows = [
+        (month_start, next_start, 1),
+        (month_start - relativedelta(months=1), month_start, 1),
+        (month_start - relativedelta(months=avg_months), month_start, avg_months),
+    ]
+    curves = []
+    for data_start, data_end, divisor in windows:
+        cur.execute(sql, (month_start, month_start, divisor, data_start, data_end) + extra)
+        curves.append([float(row[1]) for row in cur.fetchall()])
+    return curves
+
+
+def time_call(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def compare_curves(conn, months, avg_months, repeats):
+    """Median latency of the legacy three-query curves against the single-pass engine"""
+    from app.routes.analytics import cumulative_curves
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT category FROM daily_rollups
+        WHERE flow = 'expense' AND NOT is_transfer
+        GROUP BY category ORDER BY SUM(total) DESC LIMIT 1
+    """)
+    top_category = cur.fetchone()[0]
+
+    cases = [
+        ('category=all', 'category', 'all'),
+        (f'category={top_category}', 'category', top_category),
+        ('group=all', 'group_name', 'all'),
+    ]
+    this_month = date.today().replace(day=1)
+    results = {}
+    try:
+        for name, column, value in cases:
+            legacy_ms = []
+            engine_ms = []
+            for offset in range(months):
+                month_start = this_month - relativedelta(months=offset)
+                legacy = legacy_curves(cur, month_start, avg_months, column, value)
+                engine = cumulative_curves(cur, month_start, avg_months, {column: value})
+                for old, new in zip(legacy, (engine['amounts'], engine['prior_amounts'], engine['avg_amounts'])):
+                    if any(abs(a - b) > 0.005 for a, b in zip(old, new)):
+                        raise AssertionError(f"Engine curves differ from the legacy ones for {name} {month_start}")
+
+                legacy_ms.append(time_call(lambda: legacy_curves(cur, month_start, avg_months, column, value), repeats))
+                engine_ms.append(time_call(lambda: cumulative_curves(cur, month_start, avg_months, {column: value}), repeats))
+
+            results[name] = {
+                'legacy_ms': statistics.median(legacy_ms),
+                'engine_ms': statistics.median(engine_ms),
+            }
+            speedup = results[name]['legacy_ms'] / results[name]['engine_ms'] if results[name]['engine_ms'] else 0
+            print(f"  {name:<28} legacy {results[name]['legacy_ms']:>8.2f} ms   "
+                  f"engine {results[name]['engine_ms']:>8.2f} ms   {speedup:>5.2f}x")
+        return results
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the cumulative daily curve engine')
+    parser.add_argument('--scale', type=int, default=100000)
+    parser.add_argument('--months', type=int, default=6, help='Selected months to compute curves for')
+    parser.add_argument('--avg-months', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--db-name', default=os.getenv('BENCH_DB_NAME', 'plaid_bench'))
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.db_name == os.getenv('DB_NAME'):
+        parser.error(f"{args.db_name} is the application database; use a dedicated benchmark database")
+    os.environ['DB_NAME'] = args.db_name
+
+    from app.financial_data.utils.db_connection import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        print(f"\n=== Loading {args.scale} synthetic transactions ===")
+        reset_database(conn)
+        load_dataset(conn, args.scale, snapshots=1)
+        print(f"\n=== Daily curves, {args.months} months, {args.avg_months}-month average ===")
+        results = compare_curves(conn, args.months, args.avg_months, args.repeats)
+    finally:
+        conn.close()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from psycopg2.extras import execute_values
+
+from benchmarks.ingest import reset_database
+from benchmarks.synthetic import INSTITUTION_ID, generate_dataset
+
+
+def _month_start(months_ago=0):
+    today = date.today().replace(day=1)
+    for _ in range(months_ago):
+        today = (today - timedelta(days=1)).replace(day=1)
+    return today
+
+
+def get_queries():
+    """Representative analytics and ingest queries as (name, sql, params)"""
+    year_ago = _month_start(11)
+    this_month = _month_start()
+    return [
+        ('expenses_summary', """
+            SELECT transaction_id, name, category, amount, date
+            FROM stg_transactions t
+            WHERE t.amount > 0
+            AND t.date >= %s AND t.date < %s
+            AND LOWER(COALESCE(t.category, '')) NOT LIKE '%%transfer%%'
+            AND t.category = %s
+        """, (year_ago, this_month + timedelta(days=31), 'Groceries')),
+        ('category_breakdown', """
+            SELECT COALESCE(category, 'Uncategorized'), SUM(amount)
+            FROM stg_transactions
+            WHERE amount > 0
+            AND date >= %s AND date < %s
+            GROUP BY category
+        """, (this_month, this_month + timedelta(days=31))),
+        ('transactions_month', """
+            SELECT account_id, SUM(amount)
+            FROM transactions
+            WHERE date >= %s AND date < %s
+            GROUP BY account_id
+        """, (this_month, (this_month + timedelta(days=32)).replace(day=1))),
+        ('transactions_by_account', """
+            SELECT MAX(date) FROM transactions WHERE account_id = %s
+        """, ('bench_acc_000001',)),
+        ('update_all_by_name', """
+            SELECT transaction_id FROM transactions WHERE name = %s
+        """, ('Costco',)),
+        ('latest_account_snapshot', """
+            SELECT DISTINCT ON (account_id) account_id, balance_current
+            FROM account_history
+            WHERE account_id = %s
+            ORDER BY account_id, pull_date DESC, created_at DESC
+        """, ('bench_acc_000002',)),
+        ('api_calls_by_token', """
+            SELECT COUNT(*) FROM plaid_api_calls WHERE access_token_id = %s
+        """, (1,)),
+    ]
+
+
+def load_dataset(conn, scale, snapshots, seed=0):
+    """Bulk load a synthetic history: transactions, account snapshots and API call logs"""
+    rng = random.Random(seed)
+    dataset = generate_dataset(scale, seed)
+    cur = conn.cursor()
+    try:
+        execute_values(cur, """
+            INSERT INTO transactions (
+                transaction_id, account_id, amount, date, name, merchant_name,
+                category, payment_channel, authorized_datetime, pending
+            ) VALUES %s
+        """, [(
+            t.transaction_id, t.account_id, t.amount, t.date, t.name, t.merchant_name,
+            t.name.split(' #')[0], t.payment_channel, t.authorized_datetime, t.pending
+        ) for t in dataset['transactions']], page_size=5000)
+
+        today = date.today()
+        execute_values(cur, """
+            INSERT INTO account_history (
+                account_id, account_name, institution_id, type, subtype, balance_current, pull_date
+            ) VALUES %s
+        """, [(
+            a.account_id, a.name, INSTITUTION_ID, a.type, a.subtype,
+            round(rng.uniform(100, 25000), 2), today - timedelta(days=day)
+        ) for a in dataset['accounts'] for day in range(snapshots)], page_size=5000)
+
+        now = datetime.now()
+        execute_values(cur, """
+            INSERT INTO plaid_api_calls (
+                access_token_id, product, operation, institution_id,
+                request_timestamp, response_time_ms, success, items_retrieved
+            ) VALUES %s
+        """, [(
+            rng.randint(1, 20), 'transactions', 'sync', INSTITUTION_ID,
+            now - timedelta(minutes=i), rng.randint(50, 3000), rng.random() > 0.05, rng.randint(0, 500)
+        ) for i in range(scale)], page_size=5000)
+
+        cur.execute("ANALYZE")
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def explain_queries(conn):
+    """Run EXPLAIN ANALYZE for each query and summarize the plan"""
+    cur = conn.cursor()
+    results = {}
+    try:
+        for name, sql, params in get_queries():
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0][0]
+            nodes = []
+
+            def walk(node):
+                nodes.append(node['Node Type'] + (f" on {node['Relation Name']}" if 'Relation Name' in node else ''))
+                for child in node.get('Plans', []):
+                    walk(child)
+            walk(plan['Plan'])
+
+            results[name] = {
+                'execution_ms': plan['Execution Time'],
+                'nodes': nodes,
+                'seq_scans': [n for n in nodes if n.startswith('Seq Scan')]
+            }
+            flag = '  (seq scan)' if results[name]['seq_scans'] else ''
+            print(f"  {name:<28} {plan['Execution Time']:>10.2f} ms  {' > '.join(nodes)}{flag}")
+        return results
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EXPLAIN the hot queries on a large synthetic dataset')
+    parser.add_argument('--scale', type=int, default=100000)
+    parser.add_argument('--snapshots', type=int, default=90, help='Account history snapshots per account')
+    parser.add_argument('--db-name', default=os.getenv('BENCH_DB_NAME', 'plaid_bench'))
+    parser.add_argument('--output', help='Write plans before and after migrations to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.db_name == os.getenv('DB_NAME'):
+        parser.error(f"{args.db_name} is the application database; use a dedicated benchmark database")
+    os.environ['DB_NAME'] = args.db_name
+
+    from app.financial_data.utils.db_connection import get_db_connection
+    from app.financial_data.utils.migrations import apply_migrations
+
+    conn = get_db_connection()
+    try:
+        print(f"\n=== Loading {args.scale} synthetic transactions (init.sql schema only) ===")
+        reset_database(conn, migrate=False)
+        load_dataset(conn, args.scale, args.snapshots)
+        before = explain_queries(conn)
+
+        print("\n=== After applying migrations ===")
+        cur = conn.cursor()
+        apply_migrations(conn, cur)
+        cur.close()
+        after = explain_queries(conn)
+    finally:
+        conn.close()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'before': before, 'after': after}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
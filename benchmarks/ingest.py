@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from psycopg2.extras import execute_values
+
+from benchmarks.synthetic import INSTITUTION_ID, generate_category_mappings, generate_dataset
+
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+INIT_SQL = Path(__file__).resolve().parent.parent / 'app' / 'init.sql'
+DEFAULT_SCALES = [1000, 10000, 100000]
+
+# The stg_transactions view that the table replaced, for the NULL-key consistency check
+LEGACY_STG_SQL = """
+    WITH transaction_groups AS (
+        SELECT
+            transaction_id,
+            account_id,
+            amount,
+            name,
+            (MAX("date") OVER (PARTITION BY account_id, amount, name) -
+             MIN("date") OVER (PARTITION BY account_id, amount, name)) as date_diff,
+            ROW_NUMBER() OVER (
+                PARTITION BY account_id, amount, name
+                ORDER BY "date"
+            ) as row_num
+        FROM transactions
+        WHERE pending = FALSE
+        AND (pending_transaction_id IS NULL OR pending_transaction_id = '')
+    )
+    SELECT transaction_id, account_id, amount, name
+    FROM transaction_groups
+    WHERE (date_diff > 3 OR date_diff IS NULL)
+    OR (date_diff <= 3 AND row_num = 1)
+"""
+
+# Rows with a NULL name or amount, duplicates within 3 days included, as
+# (transaction_id, account_id, amount, date offset in days, name)
+NULL_KEY_ROWS = [
+    ('bench_null_1', 'bench_acc_000000', None, 0, 'Cash Deposit'),
+    ('bench_null_2', 'bench_acc_000000', None, 1, 'Cash Deposit'),
+    ('bench_null_3', 'bench_acc_000000', None, 30, 'Cash Deposit'),
+    ('bench_null_4', 'bench_acc_000000', 12.50, 0, None),
+    ('bench_null_5', 'bench_acc_000000', 12.50, 2, None),
+    ('bench_null_6', 'bench_acc_000001', None, 0, None),
+]
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS counter so each stage reports its own peak (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_database(conn, migrate=True):
+    """Recreate the schema from init.sql, apply migrations and seed reference data"""
+    from app.financial_data.utils.migrations import apply_migrations
+
+    cur = conn.cursor()
+    try:
+        cur.execute(INIT_SQL.read_text())
+        conn.commit()
+        if migrate:
+            apply_migrations(conn, cur)
+        cur.execute("""
+            INSERT INTO institutions (id, name) VALUES (%s, 'Benchmark Bank')
+        """, (INSTITUTION_ID,))
+        categories, groups = generate_category_mappings()
+        execute_values(cur, "INSERT INTO category_mappings (transaction_name, category) VALUES %s", categories)
+        execute_values(cur, "INSERT INTO group_mappings (transaction_name, group_name) VALUES %s", groups)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def check_null_group_keys(conn):
+    """Insert rows with NULL names and amounts and check stg_transactions keeps the same of
+    them as the old view did, and that both rollups still add up to stg_transactions.
+    Raises AssertionError on a mismatch."""
+    cur = conn.cursor()
+    try:
+        today = datetime.now().date()
+        execute_values(cur, """
+            INSERT INTO transactions (transaction_id, account_id, amount, date, name)
+            VALUES %s
+        """, [(txn_id, account_id, amount, today - timedelta(days=offset), name)
+              for txn_id, account_id, amount, offset, name in NULL_KEY_ROWS])
+        counts = {}
+        for label, source in (('stg_transactions', 'stg_transactions'), ('legacy view', f"({LEGACY_STG_SQL})")):
+            cur.execute(f"""
+                SELECT
+                    COUNT(*) FILTER (WHERE name IS NULL),
+                    COUNT(*) FILTER (WHERE amount IS NULL)
+                FROM {source} s
+            """)
+            counts[label] = cur.fetchone()
+        rollups = {}
+        for label, sql in (
+            ('stg_transactions', 'SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM stg_transactions WHERE "date" IS NOT NULL'),
+            ('monthly_rollups', 'SELECT SUM(txn_count), SUM(total) FROM monthly_rollups'),
+            ('daily_rollups', 'SELECT SUM(txn_count), SUM(total) FROM daily_rollups'),
+        ):
+            cur.execute(sql)
+            rollups[label] = cur.fetchone()
+        conn.rollback()
+    finally:
+        cur.close()
+
+    print(f"  NULL-key rows (name, amount)  stg_transactions {counts['stg_transactions']}  "
+          f"legacy view {counts['legacy view']}")
+    if counts['stg_transactions'] != counts['legacy view']:
+        raise AssertionError("stg_transactions keeps different NULL-name/NULL-amount rows than the legacy view")
+    print(f"  Rollups (rows, total)         stg_transactions {rollups['stg_transactions']}  "
+          f"monthly {rollups['monthly_rollups']}  daily {rollups['daily_rollups']}")
+    for label in ('monthly_rollups', 'daily_rollups'):
+        if rollups[label] != rollups['stg_transactions']:
+            raise AssertionError(f"{label} does not add up to stg_transactions after the NULL-key rows")
+
+
+def run_stage(results, name, rows, func):
+    """Time a single pipeline stage and record throughput and peak memory"""
+    _reset_peak_rss()
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    results[name] = {
+        'rows': rows,
+        'seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None,
+        'peak_rss_mb': round(_peak_rss_mb(), 1)
+    }
+    print(f"  {name:<32} {rows:>8} rows  {elapsed:>8.3f}s  {results[name]['rows_per_sec'] or 0:>10.1f} rows/s  "
+          f"{results[name]['peak_rss_mb']:>8.1f} MB")
+    return value
+
+
+def run_scale(scale, seed=0):
+    """Run the ingest pipeline once at the given transaction scale"""
+    # Imported here so DB_NAME is already pointing at the benchmark database
+    from app.financial_data.utils.db_connection import get_db_connection
+    from app.financial_data.processors.core.accounts_processor import process_accounts
+    from app.financial_data.processors.core.transactions_processor import process_transactions
+    from app.financial_data.db_operations.core.accounts_db import save_accounts_to_db
+    from app.financial_data.db_operations.core.transactions_db import save_transactions_to_db
+    from app.financial_data.handlers.financial_data_handler import FinancialDataHandler
+
+    print(f"\n=== Ingest benchmark: {scale} transactions ===")
+    dataset = generate_dataset(scale, seed)
+    transactions = dataset['transactions']
+    accounts = dataset['accounts']
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    stages = {}
+
+    try:
+        reset_database(conn)
+
+        transactions_df = run_stage(stages, 'process_transactions', len(transactions),
+                                    lambda: process_transactions(transactions))
+
+        def save_transactions():
+            saved = save_transactions_to_db(transactions_df, conn, cur)
+            conn.commit()
+            return saved
+        run_stage(stages, 'save_transactions_to_db', len(transactions), save_transactions)
+
+        accounts_dfs = run_stage(stages, 'process_accounts', len(accounts),
+                                 lambda: process_accounts(accounts, [], dataset['liabilities'],
+                                                          {'institution_id': INSTITUTION_ID}))
+        run_stage(stages, 'save_accounts_to_db', len(accounts),
+                  lambda: save_accounts_to_db(accounts_dfs, conn, cur))
+
+        # Start the handler from an empty table so it measures the same insert workload
+        cur.execute("TRUNCATE transactions")
+        conn.commit()
+        response = SimpleNamespace(added=transactions, modified=[], removed=[])
+        run_stage(stages, 'FinancialDataHandler.process_transactions', len(transactions),
+                  lambda: FinancialDataHandler().process_transactions(response, None))
+
+        check_null_group_keys(conn)
+    finally:
+        cur.close()
+        conn.close()
+
+    total = sum(stage['seconds'] for stage in stages.values())
+    return {
+        'scale': scale,
+        'seed': seed,
+        'generated_at': datetime.now().isoformat(),
+        'total_seconds': round(total, 4),
+        'peak_rss_mb': round(max(stage['peak_rss_mb'] for stage in stages.values()), 1),
+        'time_split': {
+            name: round(stage['seconds'] / total * 100, 1) if total else 0
+            for name, stage in stages.items()
+        },
+        'stages': stages
+    }
+
+
+def baseline_path(scale):
+    return BASELINE_DIR / f'ingest_{scale}.json'
+
+
+def compare_to_baseline(result):
+    """Print per-stage throughput changes relative to the stored baseline"""
+    path = baseline_path(result['scale'])
+    if not path.exists():
+        print(f"  No baseline at {path}")
+        return
+    baseline = json.loads(path.read_text())
+    print(f"  Compared to baseline from {baseline['generated_at']}:")
+    for name, stage in result['stages'].items():
+        old = baseline['stages'].get(name)
+        if not old or not old.get('rows_per_sec') or not stage.get('rows_per_sec'):
+            continue
+        change = (stage['rows_per_sec'] - old['rows_per_sec']) / old['rows_per_sec'] * 100
+        print(f"    {name:<32} {old['rows_per_sec']:>10.1f} -> {stage['rows_per_sec']:>10.1f} rows/s ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the transaction and account ingest pipeline')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db-name', default=os.getenv('BENCH_DB_NAME', 'plaid_bench'),
+                        help='Benchmark database; its schema is dropped and recreated')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write results to benchmarks/baselines instead of comparing against them')
+    parser.add_argument('--output', help='Also write all results to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.db_name == os.getenv('DB_NAME'):
+        parser.error(f"{args.db_name} is the application database; use a dedicated benchmark database")
+    os.environ['DB_NAME'] = args.db_name
+
+    results = []
+    for scale in args.scales:
+        result = run_scale(scale, args.seed)
+        results.append(result)
+        if args.save_baseline:
+            BASELINE_DIR.mkdir(exist_ok=True)
+            baseline_path(scale).write_text(json.dumps(result, indent=2))
+            print(f"  Saved baseline to {baseline_path(scale)}")
+        else:
+            compare_to_baseline(result)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import random
+from decimal import Decimal
+from pathlib import Path
+
+from app.financial_data.db_operations.query_operations import CustomJSONEncoder
+from app.utils.json_response import columnar, dumps
+from benchmarks.curves import time_call
+from benchmarks.synthetic import MERCHANTS, generate_accounts, generate_transactions
+
+# The columns /transactions/api/transactions returns
+COLUMNS = ['transaction_id', 'date', 'account_name', 'category', 'group_name', 'name', 'amount']
+
+
+def transaction_rows(count, seed=0):
+    """Row tuples shaped like the /transactions/api/transactions query, amounts as Decimal"""
+    rng = random.Random(seed)
+    accounts = generate_accounts(max(5, count // 100), seed)
+    account_names = {account.account_id: account.name for account in accounts}
+    mappings = {merchant: (category, group) for merchant, category, group in MERCHANTS}
+    rows = []
+    for txn in generate_transactions(count, accounts, seed=seed):
+        category, group = mappings[txn.merchant_name]
+        rows.append((
+            txn.transaction_id,
+            txn.date,
+            account_names[txn.account_id],
+            category if rng.random() < 0.9 else None,
+            group if rng.random() < 0.9 else None,
+            txn.name,
+            Decimal(str(txn.amount))
+        ))
+    return rows
+
+
+def encode_rows(rows):
+    """The default response: one object per row through jsonify's encoder"""
+    objects = [dict(zip(COLUMNS, row)) for row in rows]
+    return json.dumps(objects, cls=CustomJSONEncoder, sort_keys=True).encode('utf-8')
+
+
+def encode_columnar(rows):
+    """format=columnar: column arrays through orjson, NUMERIC already read as float"""
+    float_rows = [row[:-1] + (float(row[-1]),) for row in rows]
+    return dumps(columnar(COLUMNS, float_rows))
+
+
+def compare_encoders(count, repeats):
+    rows = transaction_rows(count)
+    float_rows = [row[:-1] + (float(row[-1]),) for row in rows]
+
+    legacy = encode_rows(rows)
+    compact = encode_columnar(rows)
+    results = {
+        'rows': count,
+        'rows_bytes': len(legacy),
+        'columnar_bytes': len(compact),
+        'rows_ms': time_call(lambda: encode_rows(rows), repeats),
+        # The cursor returns floats in columnar mode, so the conversion above is not timed
+        'columnar_ms': time_call(lambda: dumps(columnar(COLUMNS, float_rows)), repeats),
+    }
+    print(f"  rows      {results['rows_bytes'] / 1024:>10.1f} KiB   {results['rows_ms']:>8.2f} ms")
+    print(f"  columnar  {results['columnar_bytes'] / 1024:>10.1f} KiB   {results['columnar_ms']:>8.2f} ms")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark row and columnar JSON encoding of transactions')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    print(f"\n=== Encoding {args.rows} transactions ===")
+    results = compare_encoders(args.rows, args.repeats)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+# Merchant names repeat so category mappings and near-duplicate groups are exercised
+MERCHANTS = [
+    ('Amazon', 'Shopping', 'Misc'),
+    ('Costco', 'Groceries', 'Food'),
+    ('Trader Joes', 'Groceries', 'Food'),
+    ('Shell', 'Gas', 'Transportation'),
+    ('Uber', 'Rideshare', 'Transportation'),
+    ('Netflix', 'Subs', 'Entertainment'),
+    ('Spotify', 'Subs', 'Entertainment'),
+    ('PG&E', 'Utilities', 'Housing'),
+    ('Starbucks', 'Coffee', 'Food'),
+    ('Chipotle', 'Restaurants', 'Food'),
+    ('Target', 'Shopping', 'Misc'),
+    ('Delta Air Lines', 'Travel', 'Travel'),
+    ('Payroll Deposit', 'Income', 'Income'),
+    ('Online Transfer', 'Transfer', 'Transfer'),
+    ('Zelle To ZIQI', 'Rent', 'Housing'),
+    ('External Withdrawal', 'Investing', 'Savings'),
+]
+
+ACCOUNT_TYPES = [
+    ('depository', 'checking'),
+    ('depository', 'savings'),
+    ('credit', 'credit card'),
+    ('investment', 'brokerage'),
+    ('loan', 'auto'),
+]
+
+INSTITUTION_ID = 'ins_bench'
+
+
+def generate_accounts(count, seed=0):
+    """Generate Plaid-shaped account objects"""
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        account_type, subtype = ACCOUNT_TYPES[i % len(ACCOUNT_TYPES)]
+        current = round(rng.uniform(100, 25000), 2)
+        accounts.append(SimpleNamespace(
+            account_id=f'bench_acc_{i:06d}',
+            name=f'Bench {subtype.title()} {i}',
+            type=account_type,
+            subtype=subtype,
+            mask=f'{i % 10000:04d}',
+            balances=SimpleNamespace(
+                current=current,
+                available=round(current * rng.uniform(0.5, 1.0), 2),
+                limit=round(rng.uniform(5000, 30000), 2) if account_type == 'credit' else None,
+                iso_currency_code='USD'
+            )
+        ))
+    return accounts
+
+
+def generate_liabilities(accounts, seed=0):
+    """Generate Plaid-shaped credit card liabilities for the credit accounts"""
+    rng = random.Random(seed)
+    today = date.today()
+    credit = []
+    for account in accounts:
+        if account.type != 'credit':
+            continue
+        credit.append(SimpleNamespace(
+            account_id=account.account_id,
+            last_statement_issue_date=today - timedelta(days=rng.randint(1, 28)),
+            last_statement_balance=round(rng.uniform(50, 5000), 2),
+            last_payment_amount=round(rng.uniform(50, 5000), 2),
+            last_payment_date=today - timedelta(days=rng.randint(1, 28)),
+            minimum_payment_amount=round(rng.uniform(25, 200), 2),
+            next_payment_due_date=today + timedelta(days=rng.randint(1, 28)),
+            aprs=[SimpleNamespace(
+                apr_percentage=round(rng.uniform(15, 30), 2),
+                apr_type='purchase_apr',
+                balance_subject_to_apr=round(rng.uniform(0, 5000), 2),
+                interest_charge_amount=round(rng.uniform(0, 100), 2)
+            )]
+        ))
+    return credit
+
+
+def generate_transactions(count, accounts, days=730, seed=0, id_prefix='bench_txn'):
+    """Generate Plaid-shaped transaction objects spread over the last `days` days"""
+    rng = random.Random(seed)
+    today = date.today()
+    transactions = []
+    for i in range(count):
+        account = accounts[i % len(accounts)]
+        merchant, category, _ = MERCHANTS[rng.randrange(len(MERCHANTS))]
+        txn_date = today - timedelta(days=rng.randrange(days))
+        if category == 'Income':
+            amount = -round(rng.uniform(1000, 5000), 2)
+        elif category == 'Transfer':
+            amount = round(rng.uniform(-2000, 2000), 2)
+        else:
+            amount = round(rng.uniform(2, 400), 2)
+        transactions.append(SimpleNamespace(
+            transaction_id=f'{id_prefix}_{i:08d}',
+            account_id=account.account_id,
+            amount=amount,
+            date=txn_date,
+            name=f'{merchant} #{rng.randint(1, 50)}' if rng.random() < 0.3 else merchant,
+            merchant_name=merchant,
+            category=None,
+            payment_channel=rng.choice(['online', 'in store', 'other']),
+            authorized_datetime=datetime.combine(txn_date, datetime.min.time()),
+            pending=False,
+            pending_transaction_id=None
+        ))
+    return transactions
+
+
+def generate_category_mappings():
+    """Category and group mappings for the synthetic merchant names"""
+    categories = [(merchant, category) for merchant, category, _ in MERCHANTS]
+    groups = [(merchant, group) for merchant, _, group in MERCHANTS]
+    return categories, groups
+
+
+def generate_dataset(scale, seed=0):
+    """Generate a full synthetic refresh at the given transaction scale"""
+    accounts = generate_accounts(max(len(ACCOUNT_TYPES), scale // 100), seed)
+    return {
+        'accounts': accounts,
+        'liabilities': generate_liabilities(accounts, seed),
+        'transactions': generate_transactions(scale, accounts, seed=seed)
+    }